@@ -1,28 +1,119 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
 from .models import CustomUser, DossierDemande, SuiviDossier, Notification
+from .services import changer_statut_en_masse
+
+# en dessous, le COUNT(*) exact reste bon marché
+SEUIL_ESTIMATION = 100000
+# plus grand identifiant (bigint) : au-delà, le terme est cherché comme du texte
+ID_MAX = 2 ** 63 - 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Liste non filtrée d'une grosse table PostgreSQL : nombre de lignes estimé
+    (pg_class.reltuples, tenu à jour par ANALYZE / autovacuum) au lieu d'un COUNT(*).
+    Compte exact sinon (filtres, recherche, petites tables, SQLite).
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                ligne = cursor.fetchone()
+            if ligne is not None and ligne[0] >= SEUIL_ESTIMATION:
+                return ligne[0]
+        return super().count
+
+
+class ASDMModelAdmin(admin.ModelAdmin):
+    """
+    Listes à coût constant par page : FK jointes (list_select_related), pas de
+    COUNT(*) de la table entière, recherche limitée aux accès indexés : un nombre
+    cherche dans `recherche_ids` (égalité), le reste dans `search_fields` (préfixes
+    __startswith, servis par les index *_like des colonnes uniques sous PostgreSQL).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    recherche_ids = ("pk",)
+
+    def get_search_results(self, request, queryset, search_term):
+        terme = search_term.strip()
+        # isdecimal et non isdigit : "²" est un chiffre, mais int() le refuse
+        if terme.isdecimal() and int(terme) <= ID_MAX:
+            conditions = Q.create([(champ, int(terme)) for champ in self.recherche_ids], connector=Q.OR)
+            return queryset.filter(conditions), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+def action_statut(statut):
+    """Action de changement de statut en masse (changer_statut_en_masse : UPDATE par lot, suivis, notifications)."""
+    libelle = dict(DossierDemande.Statut)[statut]
+
+    @admin.action(description=f"Passer au statut « {libelle} »")
+    def action(modeladmin, request, queryset):
+        resultats = changer_statut_en_masse(queryset, statut, commentaire="Statut modifié depuis l'administration.")
+        modifies = sum(1 for _, resultat in resultats.values() if resultat == "modifie")
+        modeladmin.message_user(request, f"{modifies} dossier(s) passé(s) au statut « {libelle} ».")
+
+    action.__name__ = f"passer_{statut}"
+    return action
+
 
 @admin.register(CustomUser)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(ASDMModelAdmin):
     list_display = ("id", "email", "username", "role", "is_active", "date_joined", "last_login")
     list_filter = ("role", "is_active", "date_joined")
-    search_fields = ("email", "username", "first_name", "last_name", "phone")
+    search_fields = ("email__startswith", "username__startswith")
     ordering = ("-date_joined",)
 
 @admin.register(DossierDemande)
-class DossierDemandeAdmin(admin.ModelAdmin):
+class DossierDemandeAdmin(ASDMModelAdmin):
     list_display = ("id", "utilisateur", "type_subvention", "montant_demande", "statut", "date_depot")
+    list_select_related = ("utilisateur",)
     list_filter = ("type_subvention", "statut", "date_depot")
-    search_fields = ("description_projet", "utilisateur__email")
-    date_hierarchy = "date_depot"
+    search_fields = ("utilisateur__email__startswith",)
+    autocomplete_fields = ("utilisateur",)
+    actions = [action_statut(statut) for statut, _ in DossierDemande.Statut]
 
 @admin.register(SuiviDossier)
-class SuiviDossierAdmin(admin.ModelAdmin):
+class SuiviDossierAdmin(ASDMModelAdmin):
     list_display = ("id", "dossier", "statut", "date_update")
+    # Dossier.__str__ affiche le username du demandeur
+    list_select_related = ("dossier__utilisateur",)
     list_filter = ("statut", "date_update")
-    search_fields = ("commentaire",)
+    search_fields = ("dossier__utilisateur__email__startswith",)
+    recherche_ids = ("pk", "dossier_id")
+    raw_id_fields = ("dossier",)
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ASDMModelAdmin):
     list_display = ("id", "utilisateur", "type", "statut", "date_envoi")
+    list_select_related = ("utilisateur",)
     list_filter = ("type", "statut", "date_envoi")
-    search_fields = ("message",)
+    search_fields = ("utilisateur__email__startswith",)
+    recherche_ids = ("pk", "dossier_id")
+    autocomplete_fields = ("utilisateur",)
+    raw_id_fields = ("dossier",)
+    actions = ["marquer_lues", "marquer_non_lues"]
+
+    @admin.action(description="Marquer comme lues")
+    def marquer_lues(self, request, queryset):
+        # un seul UPDATE ; les compteurs de non lues suivent (triggers)
+        n = queryset.filter(statut=False).update(statut=True, updated_at=timezone.now())
+        self.message_user(request, f"{n} notification(s) marquée(s) comme lue(s).")
+
+    @admin.action(description="Marquer comme non lues")
+    def marquer_non_lues(self, request, queryset):
+        n = queryset.filter(statut=True).update(statut=False, updated_at=timezone.now())
+        self.message_user(request, f"{n} notification(s) marquée(s) comme non lue(s).")
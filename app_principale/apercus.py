@@ -0,0 +1,75 @@
+"""
+File de génération des aperçus des pièces jointes : une pièce jointe créée est
+"en_attente" ; la commande generer_apercus réclame des lots (FOR UPDATE SKIP LOCKED,
+passage à "en_cours" avec un bail), confie le travail d'image à un pool de processus
+(imagerie.py) hors transaction, puis enregistre les résultats. Une pièce "en_cours"
+dont le bail a expiré (worker arrêté) est réclamée à nouveau.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .imagerie import generer_apercus
+from .models import PieceJointe
+
+TAILLES_APERCUS = (256, 1024)
+# secondes ; pdftoppm est limité à 120 s par fichier
+BAIL = 900
+
+
+def reclamer_lot(taille, bail):
+    """Réserve jusqu'à `taille` pièces à traiter ; retourne (pièces, fin du bail)."""
+    maintenant = timezone.now()
+    fin_bail = maintenant + timedelta(seconds=bail)
+    with transaction.atomic():
+        ids = list(
+            PieceJointe.objects.filter(
+                Q(etat_apercus="en_attente") | Q(etat_apercus="en_cours", bail_apercus__lt=maintenant)
+            )
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:taille]
+        )
+        PieceJointe.objects.filter(pk__in=ids).update(etat_apercus="en_cours", bail_apercus=fin_bail)
+    return list(PieceJointe.objects.filter(pk__in=ids).order_by("id")), fin_bail
+
+
+def traiter_lot(pool, taille=20, bail=BAIL):
+    """Génère les aperçus d'un lot de pièces jointes. Retourne le nombre de pièces traitées."""
+    pieces, fin_bail = reclamer_lot(taille, bail)
+    if not pieces:
+        return 0
+    futures = [
+        pool.submit(
+            generer_apercus, piece.fichier.path, piece.nom.lower().endswith(".pdf"),
+            piece.sha256, str(settings.MEDIA_ROOT), TAILLES_APERCUS,
+        )
+        for piece in pieces
+    ]
+    for piece, future in zip(pieces, futures):
+        try:
+            piece.apercus = future.result()
+        except Exception:
+            piece.apercus, piece.etat_apercus = {}, "echec"
+            continue
+        piece.etat_apercus = "genere" if piece.apercus else "sans_apercu"
+
+    with transaction.atomic():
+        # bail expiré : la pièce a pu être réclamée par un autre worker, qui l'enregistrera
+        encore_a_nous = set(
+            PieceJointe.objects.filter(
+                pk__in=[piece.pk for piece in pieces], etat_apercus="en_cours", bail_apercus=fin_bail
+            ).select_for_update().values_list("pk", flat=True)
+        )
+        PieceJointe.objects.bulk_update(
+            [piece for piece in pieces if piece.pk in encore_a_nous], ["apercus", "etat_apercus"]
+        )
+    return len(pieces)
+
+
+def nouveau_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers)
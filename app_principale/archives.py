@@ -0,0 +1,118 @@
+"""
+Archivage des lignes anciennes des tables en ajout seul (commande `archiver`) :
+- notifications lues, envoyées (ou en échec définitif), plus vieilles que NOTIFICATIONS_JOURS ;
+- suivis des dossiers clos (accepté / refusé) plus vieux que SUIVIS_JOURS.
+
+Les lignes sont déplacées par lots (INSERT ... SELECT puis DELETE, une transaction
+par lot, mêmes ids) avec une pause entre les lots pour tourner en journée. Seules des
+notifications lues sont archivées : le compteur de non lues (triggers) est inchangé.
+Les lectures ?include_archived=true passent par les vues SQL *_historique.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive, SuiviDossier, SuiviDossierArchive
+
+DEFAULTS = {
+    "NOTIFICATIONS_JOURS": 365,
+    "SUIVIS_JOURS": 365,
+    "BATCH_SIZE": 1000,
+    # pause entre deux lots (secondes)
+    "PAUSE": 0.5,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "ARCHIVAGE", {})}
+
+
+# ---- Sélection ----
+def notifications_archivables(avant):
+    return Notification.objects.filter(statut=True, etat_envoi__in=("envoye", "echec"), date_envoi__lt=avant)
+
+
+def suivis_archivables(avant):
+    return SuiviDossier.objects.filter(dossier__statut__in=("accepte", "refuse"), date_update__lt=avant)
+
+
+# (table courante, table d'archive, lignes archivables avant une date)
+TABLES = {
+    "notifications": (Notification, NotificationArchive, notifications_archivables),
+    "suivis": (SuiviDossier, SuiviDossierArchive, suivis_archivables),
+}
+
+
+# ---- Déplacement ----
+def archiver_lot(modele, modele_archive, queryset, taille):
+    """Déplace les `taille` plus anciennes lignes de `queryset`. Retourne leur nombre."""
+    connection = connections[router.db_for_write(modele)]
+    colonnes = [f.column for f in modele_archive._meta.concrete_fields if f.name != "date_archivage"]
+    if connection.vendor == "postgresql":
+        # vecteur plein texte recopié tel quel (voir migration 0013)
+        colonnes.append("search_vector")
+    colonnes = ", ".join(colonnes)
+    table, archive = modele._meta.db_table, modele_archive._meta.db_table
+
+    with transaction.atomic(using=connection.alias):
+        ids = list(
+            queryset.select_for_update(skip_locked=True, of=("self",))
+            .order_by("id").values_list("id", flat=True)[:taille]
+        )
+        if not ids:
+            return 0
+        marqueurs = ", ".join(["%s"] * len(ids))
+        maintenant = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {archive} ({colonnes}, date_archivage) "
+                f"SELECT {colonnes}, %s FROM {table} WHERE id IN ({marqueurs})",
+                [maintenant, *ids],
+            )
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({marqueurs})", ids)
+    return len(ids)
+
+
+def archiver(nom, jours, taille, pause, fin=None, rapport=None):
+    """
+    Archive par lots les lignes de `nom` ("notifications" / "suivis") plus vieilles
+    que `jours`, jusqu'à épuisement ou l'instant `fin` (time.monotonic()).
+    Retourne le nombre de lignes déplacées.
+    """
+    modele, modele_archive, archivables = TABLES[nom]
+    queryset = archivables(timezone.now() - timedelta(days=jours))
+    total = 0
+    while fin is None or time.monotonic() < fin:
+        n = archiver_lot(modele, modele_archive, queryset, taille)
+        total += n
+        if rapport is not None and n:
+            rapport(nom, total)
+        if n < taille:
+            break
+        time.sleep(pause)
+    return total
+
+
+# ---- Lecture ----
+class ArchivesMixin:
+    """
+    ?include_archived=true sur les lectures (GET) : le viewset lit la vue
+    `archive_queryset` (table courante + archive) au lieu de son queryset.
+    À placer après RoleScopedQuerysetMixin, qui filtre le résultat.
+    """
+    archive_queryset = None
+
+    def inclure_archives(self):
+        return (
+            self.request.method in ("GET", "HEAD", "OPTIONS")
+            and self.request.query_params.get("include_archived", "").lower() in ("1", "true")
+        )
+
+    def get_queryset(self):
+        if self.inclure_archives():
+            return self.archive_queryset.all()
+        return super().get_queryset()
+
@@ -0,0 +1,121 @@
+"""
+Lectures async des points d'entrée les plus sollicités (liste et compteur des
+notifications, liste des dossiers, users/me), activées par ASYNC_READ_VIEWS sous ASGI.
+
+Les réponses sont celles des viewsets : filtres, tri, pagination par curseur et GET
+conditionnel viennent du viewset, seules les requêtes SQL sont évaluées en async
+(aaggregate, itération async). Ce que ce chemin ne couvre pas est délégué à la vue
+DRF synchrone : autre méthode que GET, session, rendu HTML (API navigable),
+?search=, ?page=, ?format=, filtres sur clé étrangère.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.urls import path
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .authentication import aauthentifier
+from .cache import aget_user_payload
+from .services import anombre_non_lues
+
+PARAMETRES_LISTE = {"cursor", "page_size", "ordering"}
+
+
+def accepte_json(request):
+    accept = request.headers.get("Accept", "")
+    return accept in ("", "*/*") or accept.startswith("application/json")
+
+
+def reponse_json(vue, data, status=200):
+    # même rendu et mêmes en-têtes qu'une Response DRF (JSONRenderer)
+    contenu = JSONRenderer().render(data) if data is not None else b""
+    response = HttpResponse(contenu, status=status, content_type="application/json")
+    if not contenu:
+        del response["Content-Type"]
+    for nom, valeur in vue.default_response_headers.items():
+        response[nom] = valeur
+    return response
+
+
+def instancier(vue_sync, request, user):
+    """Instance du viewset de `vue_sync`, initialisée comme le fait ViewSetMixin.as_view."""
+    vue = vue_sync.cls(**vue_sync.initkwargs)
+    vue.action_map = vue_sync.actions
+    for methode, action in vue_sync.actions.items():
+        setattr(vue, methode, getattr(vue, action))
+    if "get" in vue_sync.actions and "head" not in vue_sync.actions:
+        vue.head = vue.get
+    vue.action = vue_sync.actions.get("get")
+    vue.args, vue.kwargs, vue.format_kwarg = (), {}, None
+    vue.request = Request(request, parsers=vue.get_parsers(), authenticators=())
+    vue.request.user = user
+    return vue
+
+
+async def liste(vue_sync, request, user):
+    """ConditionalGetMixin.list + ListModelMixin.list, requêtes en async."""
+    vue = instancier(vue_sync, request, user)
+    queryset = vue.filter_queryset(vue.get_queryset())
+    lignes = queryset.values(*vue.colonnes_validateurs(queryset))
+    paginateur = vue.pagination_class()
+    page = await paginateur.apaginate_queryset(lignes, vue.request, view=vue)
+    if page is None:
+        etag, date = vue.validateurs_liste(vue.request, [ligne async for ligne in lignes])
+    else:
+        etag, date = vue.validateurs_liste(vue.request, page, paginateur)
+    if vue.is_not_modified(vue.request, etag, date):
+        response = reponse_json(vue, None, status=304)
+    else:
+        page = await vue.paginator.apaginate_queryset(queryset, vue.request, view=vue)
+        if page is None:
+            data = vue.get_serializer([obj async for obj in queryset], many=True).data
+        else:
+            data = vue.paginator.get_paginated_response(vue.get_serializer(page, many=True).data).data
+        response = reponse_json(vue, data)
+    response["ETag"] = etag
+    if date is not None:
+        response["Last-Modified"] = http_date(date.timestamp())
+    return response
+
+
+async def me(vue_sync, request, user):
+    return reponse_json(instancier(vue_sync, request, user), await aget_user_payload(user))
+
+
+async def non_lues(vue_sync, request, user):
+    return reponse_json(instancier(vue_sync, request, user), {"non_lues": await anombre_non_lues(user.pk)})
+
+
+def vue_lecture_async(vue_sync, lecture, parametres=frozenset()):
+    vue_sync_async = sync_to_async(vue_sync)
+
+    @csrf_exempt
+    async def vue(request, *args, **kwargs):
+        if request.method == "GET" and accepte_json(request) and set(request.GET) <= parametres:
+            user = await aauthentifier(request)
+            if user is not None:
+                return await lecture(vue_sync, request, user)
+        return await vue_sync_async(request, *args, **kwargs)
+
+    return vue
+
+
+def urls_async(router):
+    """Routes async, à placer devant celles du routeur."""
+    vues = {url.name: url.callback for url in router.urls}
+    return [
+        # mêmes noms que les routes du routeur (reverse() et métriques inchangés)
+        path("notifications/", vue_lecture_async(
+            vues["notifications-list"], liste, PARAMETRES_LISTE | {"type", "statut"}
+        ), name="notifications-list"),
+        path("notifications/unread-count/", vue_lecture_async(
+            vues["notifications-unread-count"], non_lues
+        ), name="notifications-unread-count"),
+        path("dossiers/", vue_lecture_async(
+            vues["dossiers-list"], liste,
+            PARAMETRES_LISTE | {"type_subvention", "statut", "date_depot_after", "date_depot_before"},
+        ), name="dossiers-list"),
+        path("users/me/", vue_lecture_async(vues["users-me"], me), name="users-me"),
+    ]
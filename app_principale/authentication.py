@@ -0,0 +1,148 @@
+"""
+Authentification JWT sans lecture de l'utilisateur en base.
+
+Les jetons portent les claims utiles aux contrôles d'accès (role, email) : la vue
+reçoit un ClaimsUser construit depuis le jeton au lieu d'un CustomUser.
+Révocation : chaque jeton porte la version de jeton de l'utilisateur (claim "ver").
+Incrémenter CustomUser.token_version (changement de mot de passe, de rôle, d'email,
+désactivation, ou revoquer_tokens) invalide tous les jetons déjà émis ; la version
+courante est lue dans le cache, pas en base.
+"""
+import secrets
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import aget_token_version, get_token_version, invalider_user
+from .models import CustomUser
+
+
+class ClaimsUser(TokenUser):
+    """Utilisateur authentifié, lu depuis les claims du jeton (id, role, email)."""
+
+    @cached_property
+    def id(self):
+        # SimpleJWT sérialise l'identifiant en chaîne ; les comparaisons avec les *_id se font en entier
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def role(self):
+        return self.token.get("role")
+
+    @property
+    def email(self):
+        return self.token.get("email", "")
+
+
+def ajouter_claims(token, user):
+    token["role"] = user.role
+    token["email"] = user.email
+    token["ver"] = user.token_version
+    return token
+
+
+def revoquer_tokens(user_id):
+    CustomUser.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    invalider_user(user_id)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or "role" not in validated_token:
+            raise InvalidToken("Jeton sans identification utilisateur.")
+        if validated_token.get("ver") != get_token_version(user_id):
+            raise InvalidToken("Jeton révoqué.")
+        return ClaimsUser(validated_token)
+
+
+class ASDMTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return ajouter_claims(super().get_token(user), user)
+
+
+class ASDMTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        # le jeton d'accès reprend les claims du jeton de rafraîchissement :
+        # ceux-ci doivent être à jour
+        refresh = self.token_class(attrs["refresh"])
+        if refresh.get("ver") != get_token_version(refresh.get(api_settings.USER_ID_CLAIM)):
+            raise InvalidToken("Jeton révoqué.")
+        return super().validate(attrs)
+
+
+def utilisateur_depuis_requete(request):
+    """
+    Pour les vues hors DRF (flux SSE) : jeton de l'en-tête Authorization.
+    None si absent ou invalide.
+    """
+    authentification = ClaimsJWTAuthentication()
+    try:
+        brut = authentification.get_raw_token(authentification.get_header(request) or b"")
+        if brut is None:
+            return None
+        return authentification.get_user(authentification.get_validated_token(brut))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def aauthentifier(request):
+    """
+    Variante async de ClaimsJWTAuthentication pour les vues de lecture async
+    (en-tête Authorization uniquement). None si absent ou invalide.
+    """
+    authentification = ClaimsJWTAuthentication()
+    try:
+        brut = authentification.get_raw_token(authentification.get_header(request) or b"")
+        if brut is None:
+            return None
+        jeton = authentification.get_validated_token(brut)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    user_id = jeton.get(api_settings.USER_ID_CLAIM)
+    if user_id is None or "role" not in jeton or jeton.get("ver") != await aget_token_version(user_id):
+        return None
+    return ClaimsUser(jeton)
+
+
+# ---- Tickets du flux SSE ----
+# EventSource ne permet pas d'en-têtes : le client échange son jeton contre un ticket
+# (POST /api/evenements/ticket/) à usage unique et de courte durée, passé dans l'URL du
+# flux à la place du JWT (journaux d'accès des proxies, historique du navigateur).
+TICKET_SSE_DUREE = 60
+
+
+def ticket_sse_key(ticket):
+    return f"ticket-sse:{ticket}"
+
+
+def creer_ticket_sse(user):
+    ticket = secrets.token_urlsafe(32)
+    cache.set(ticket_sse_key(ticket), (user.pk, get_token_version(user.pk)), TICKET_SSE_DUREE)
+    return ticket
+
+
+def consommer_ticket_sse(ticket):
+    """
+    (identifiant, version de jeton) de l'utilisateur du ticket, qui est supprimé.
+    None si inconnu, expiré ou révoqué.
+    """
+    if not ticket:
+        return None
+    cle = ticket_sse_key(ticket)
+    valeur = cache.get(cle)
+    # delete() est faux si une autre requête vient de consommer le ticket
+    if valeur is None or not cache.delete(cle):
+        return None
+    user_id, version = valeur
+    if version is None or version != get_token_version(user_id):
+        return None
+    return user_id, version
@@ -0,0 +1,137 @@
+"""
+Cache de lecture (CACHES["default"]) : profils utilisateurs sérialisés et métadonnées
+des listes de choix. Les profils sont invalidés par signaux (voir signals.py).
+"""
+import hashlib
+import json
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CustomUser, DossierDemande, Notification
+
+# à incrémenter quand la forme de UserPublicSerializer change
+USER_PAYLOAD_VERSION = 1
+META_CACHE_TIMEOUT = 3600
+
+_compteurs = Counter()
+_compteurs_lock = threading.Lock()
+
+
+def compter(nom, resultat):
+    with _compteurs_lock:
+        _compteurs[(nom, resultat)] += 1
+
+
+def get_compteurs():
+    with _compteurs_lock:
+        return dict(_compteurs)
+
+
+def get_or_set(nom, key, default, timeout=None, version=None):
+    valeur = cache.get(key, version=version)
+    if valeur is not None:
+        compter(nom, "hit")
+        return valeur
+    compter(nom, "miss")
+    valeur = default()
+    cache.set(key, valeur, timeout, version=version)
+    return valeur
+
+
+async def aget_or_set(nom, key, default, timeout=None, version=None):
+    """Variante async de get_or_set ; `default` est une coroutine."""
+    valeur = await cache.aget(key, version=version)
+    if valeur is not None:
+        compter(nom, "hit")
+        return valeur
+    compter(nom, "miss")
+    valeur = await default()
+    await cache.aset(key, valeur, timeout, version=version)
+    return valeur
+
+
+# ---- Utilisateurs ----
+def user_cache_timeout():
+    # lu à chaque appel (override_settings, réglage modifié sans redémarrage)
+    return getattr(settings, "USER_CACHE_TIMEOUT", 300)
+
+
+def user_key(user_id):
+    return f"user-payload:{user_id}"
+
+
+def get_user_payload(user):
+    from .serializers import UserPublicSerializer
+
+    def charger():
+        # utilisateur issu des claims JWT (ClaimsUser) : profil complet lu en base
+        instance = user if isinstance(user, CustomUser) else CustomUser.objects.get(pk=user.pk)
+        return dict(UserPublicSerializer(instance).data)
+
+    return get_or_set(
+        "user", user_key(user.pk), charger,
+        timeout=user_cache_timeout(), version=USER_PAYLOAD_VERSION,
+    )
+
+
+async def aget_user_payload(user):
+    from .serializers import UserPublicSerializer
+
+    async def charger():
+        return dict(UserPublicSerializer(await CustomUser.objects.aget(pk=user.pk)).data)
+
+    return await aget_or_set(
+        "user", user_key(user.pk), charger,
+        timeout=user_cache_timeout(), version=USER_PAYLOAD_VERSION,
+    )
+
+
+def token_version_key(user_id):
+    return f"token-version:{user_id}"
+
+
+def get_token_version(user_id):
+    """Version de jeton courante d'un utilisateur actif, None sinon."""
+    return get_or_set(
+        "token_version", token_version_key(user_id),
+        lambda: CustomUser.objects.filter(pk=user_id, is_active=True).values_list("token_version", flat=True).first(),
+        timeout=user_cache_timeout(),
+    )
+
+
+async def aget_token_version(user_id):
+    async def charger():
+        return await (
+            CustomUser.objects.filter(pk=user_id, is_active=True).values_list("token_version", flat=True).afirst()
+        )
+
+    return await aget_or_set("token_version", token_version_key(user_id), charger, timeout=user_cache_timeout())
+
+
+def invalider_user(user_id):
+    cache.delete(user_key(user_id), version=USER_PAYLOAD_VERSION)
+    cache.delete(token_version_key(user_id))
+
+
+# ---- Métadonnées ----
+def choix(liste):
+    return [{"value": value, "label": str(label)} for value, label in liste]
+
+
+def construire_meta():
+    payload = {
+        "types_subvention": choix(DossierDemande.type),
+        "statuts": choix(DossierDemande.Statut),
+        "types_notification": choix(Notification.Types),
+        "roles": choix(CustomUser.ROLES),
+    }
+    contenu = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    return {"payload": payload, "etag": '"%s"' % hashlib.sha1(contenu).hexdigest()}
+
+
+def get_meta():
+    # les choix ne changent qu'au déploiement
+    return get_or_set("meta", "meta-choix", construire_meta, timeout=META_CACHE_TIMEOUT)
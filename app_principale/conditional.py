@@ -0,0 +1,102 @@
+import hashlib
+
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    GET conditionnel (ETag / Last-Modified) pour list et retrieve.
+    Les validateurs sont calculés sans sérialiser :
+    - liste : id et dates (`updated_at`, `related_last_modified_fields`) des lignes de la
+      page servie, lues par la pagination de la vue sur ces seules colonnes, plus les liens
+      de pagination. Jamais d'agrégat sur tout le queryset filtré : le coût reste celui
+      d'une page, quelle que soit la taille de la table ;
+    - détail : les mêmes dates pour la ligne (champs minimaux + contrôle des permissions objet).
+    Si le client est à jour, 304 sans passer par le serializer.
+    """
+    last_modified_field = "updated_at"
+    # dates de modification des objets imbriqués par le serializer (utilisateur : nom, email...)
+    related_last_modified_fields = ("utilisateur__updated_at",)
+    # champs nécessaires aux permissions objet (ex. IsOwnerOrReadOnly)
+    conditional_only_fields = ("utilisateur",)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lignes = queryset.values(*self.colonnes_validateurs(queryset))
+        # paginateur à part : celui de la vue sert ensuite à la réponse
+        paginateur = self.pagination_class() if self.pagination_class is not None else None
+        page = paginateur.paginate_queryset(lignes, request, view=self) if paginateur is not None else None
+        if page is None:
+            # sans pagination, la liste entière est servie de toute façon
+            etag, date = self.validateurs_liste(request, list(lignes))
+        else:
+            etag, date = self.validateurs_liste(request, page, paginateur)
+        return self.conditional_response(request, etag, date, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None).prefetch_related(None)
+            .only("pk", self.last_modified_field, *self.conditional_only_fields)
+            .annotate(**{f"derniere_{i}": F(champ) for i, champ in enumerate(self.related_last_modified_fields)})
+        )
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, obj)
+        dates = self.dates_modification({"derniere": getattr(obj, self.last_modified_field), **vars(obj)})
+        etag = self.make_etag(request, "detail", obj.pk, *dates)
+        return self.conditional_response(request, etag, derniere(dates), super().retrieve, *args, **kwargs)
+
+    def colonnes_validateurs(self, queryset):
+        # id, dates, et champs lus par la pagination par curseur (position de la dernière ligne)
+        tri = [*(c for c in getattr(self, "ordering_fields", ()) if c != "__all__"), *queryset.query.annotations]
+        return list(dict.fromkeys(["id", self.last_modified_field, *self.related_last_modified_fields, *tri]))
+
+    def validateurs_liste(self, request, lignes, paginateur=None):
+        """ETag et Last-Modified d'une page (ou de la liste non paginée) lue par `colonnes_validateurs`."""
+        champs = [self.last_modified_field, *self.related_last_modified_fields]
+        parts = [(ligne["id"], *(ligne[champ] for champ in champs)) for ligne in lignes]
+        if paginateur is not None:
+            # liens suivant / précédent, nombre total en mode ?page=N
+            meta = paginateur.get_paginated_response([]).data
+            parts.append(sorted((cle, valeur) for cle, valeur in meta.items() if cle != "results"))
+        date = derniere(ligne[champ] for ligne in lignes for champ in champs)
+        return self.make_etag(request, "liste", *parts), date
+
+    def dates_modification(self, valeurs):
+        """Dates de la ligne puis des objets imbriqués, lues dans les annotations du détail."""
+        return [valeurs["derniere"]] + [
+            valeurs[f"derniere_{i}"] for i in range(len(self.related_last_modified_fields))
+        ]
+
+    def make_etag(self, request, *parts):
+        # la représentation dépend aussi de l'utilisateur et des paramètres (filtres, curseur...)
+        cle = "|".join(str(p) for p in (request.user.pk, request.get_full_path(), *parts))
+        return 'W/"%s"' % hashlib.sha1(cle.encode()).hexdigest()
+
+    def is_not_modified(self, request, etag, derniere):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        if if_modified_since is not None and derniere is not None:
+            return int(derniere.timestamp()) <= if_modified_since
+        return False
+
+    def conditional_response(self, request, etag, derniere, handler, *args, **kwargs):
+        if self.is_not_modified(request, etag, derniere):
+            response = Response(status=304)
+        else:
+            response = handler(request, *args, **kwargs)
+        response["ETag"] = etag
+        if derniere is not None:
+            response["Last-Modified"] = http_date(derniere.timestamp())
+        return response
+
+
+def derniere(dates):
+    return max((d for d in dates if d is not None), default=None)
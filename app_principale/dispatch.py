@@ -0,0 +1,142 @@
+"""
+Envoi asynchrone des notifications (outbox).
+
+Les notifications sont créées en base avec etat_envoi="en_attente" ; la requête API
+ne fait rien d'autre. La commande `envoyer_notifications` réclame des lots
+(SELECT ... FOR UPDATE SKIP LOCKED), les envoie via le backend du canal dans un
+pool de threads, puis enregistre le résultat (envoyé, nouvel essai différé, échec).
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+
+DEFAULTS = {
+    "BACKENDS": {
+        "email": "app_principale.dispatch.EmailBackend",
+        "sms": "app_principale.dispatch.FichierSMSBackend",
+        "in_app": "app_principale.dispatch.InAppBackend",
+    },
+    "BATCH_SIZE": 100,
+    "MAX_WORKERS": 8,
+    "MAX_TENTATIVES": 5,
+    # délai avant le 1er nouvel essai, doublé à chaque échec (secondes)
+    "DELAI_RETRY": 30,
+    # durée pendant laquelle un lot réclamé reste réservé à un worker (secondes)
+    "BAIL": 300,
+    # fichier des SMS simulés ; None = sortie standard
+    "SMS_FICHIER": None,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "NOTIFICATIONS_DISPATCH", {})}
+
+
+# ---- Backends ----
+class EmailBackend:
+    def envoyer(self, notification):
+        send_mail(
+            subject="ASDM - Notification",
+            message=notification.message,
+            from_email=None,
+            recipient_list=[notification.utilisateur.email],
+        )
+
+
+class FichierSMSBackend:
+    """Bouchon SMS : écrit le message dans un fichier (ou sur la sortie standard)."""
+    def envoyer(self, notification):
+        if not notification.utilisateur.phone:
+            raise ValueError("Aucun numéro de téléphone.")
+        ligne = f"{timezone.now().isoformat()} {notification.utilisateur.phone} {notification.message}\n"
+        chemin = get_config()["SMS_FICHIER"]
+        if chemin is None:
+            sys.stdout.write(ligne)
+        else:
+            with open(chemin, "a", encoding="utf-8") as f:
+                f.write(ligne)
+
+
+class InAppBackend:
+    """La notification in-app est livrée dès qu'elle est en base."""
+    def envoyer(self, notification):
+        pass
+
+
+def get_backends(config):
+    return {canal: import_string(chemin)() for canal, chemin in config["BACKENDS"].items()}
+
+
+# ---- Worker ----
+def reclamer_lot(taille, bail):
+    """
+    Réserve jusqu'à `taille` notifications dues, sans attendre celles verrouillées
+    par un autre worker. Un lot "en_cours" dont le bail a expiré est repris.
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.filter(
+                Q(etat_envoi__in=["en_attente", "en_cours"]), prochain_essai__lte=maintenant
+            )
+            .order_by("prochain_essai")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:taille]
+        )
+        Notification.objects.filter(pk__in=ids).update(
+            etat_envoi="en_cours", prochain_essai=maintenant + timedelta(seconds=bail), updated_at=maintenant
+        )
+    return list(Notification.objects.filter(pk__in=ids).select_related("utilisateur"))
+
+
+def envoyer_une(backends, notification):
+    backend = backends.get(notification.type)
+    if backend is None:
+        return ValueError(f"Aucun backend pour le canal {notification.type!r}.")
+    try:
+        backend.envoyer(notification)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def traiter_lot(config=None, backends=None):
+    """Réclame, envoie et enregistre un lot. Retourne le nombre de notifications traitées."""
+    config = config or get_config()
+    backends = backends or get_backends(config)
+    lot = reclamer_lot(config["BATCH_SIZE"], config["BAIL"])
+    if not lot:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=config["MAX_WORKERS"]) as pool:
+        erreurs = list(pool.map(lambda n: envoyer_une(backends, n), lot))
+
+    maintenant = timezone.now()
+    for notification, erreur in zip(lot, erreurs):
+        notification.updated_at = maintenant
+        notification.tentatives += 1
+        if erreur is None:
+            notification.etat_envoi = "envoye"
+            notification.date_livraison = maintenant
+            notification.erreur_envoi = ""
+        elif notification.tentatives >= config["MAX_TENTATIVES"]:
+            notification.etat_envoi = "echec"
+            notification.erreur_envoi = str(erreur)
+        else:
+            notification.etat_envoi = "en_attente"
+            notification.erreur_envoi = str(erreur)
+            delai = config["DELAI_RETRY"] * 2 ** (notification.tentatives - 1)
+            notification.prochain_essai = maintenant + timedelta(seconds=delai)
+    Notification.objects.bulk_update(
+        lot, ["etat_envoi", "tentatives", "prochain_essai", "date_livraison", "erreur_envoi", "updated_at"]
+    )
+    return len(lot)
@@ -0,0 +1,77 @@
+"""
+Export CSV en flux : lecture par curseur serveur (`iterator`) sur des tuples
+(`values_list`), sans instancier de modèles ; la mémoire reste constante
+quel que soit le nombre de lignes.
+
+Sous ASGI, Django lit un itérateur synchrone en entier (sync_to_async(list)) avant
+d'envoyer le premier octet : les variantes async (`alignes`, `acsv_stream`, lecture
+par `aiterator`) sont utilisées à la place.
+"""
+import csv
+
+CHUNK_SIZE = 2000
+# cellules qu'Excel / LibreOffice évaluent comme formules (injection CSV)
+DEBUTS_FORMULE = ("=", "+", "-", "@", "\t", "\r")
+
+COLONNES_DOSSIERS = [
+    ("id", "id"),
+    ("date_depot", "date_depot"),
+    ("type_subvention", "type_subvention"),
+    ("statut", "statut"),
+    ("montant_demande", "montant_demande"),
+    ("utilisateur_id", "utilisateur_id"),
+    ("email", "utilisateur__email"),
+    ("nom", "utilisateur__last_name"),
+    ("prenom", "utilisateur__first_name"),
+]
+
+COLONNES_SUIVIS = [
+    ("id", "id"),
+    ("dossier_id", "dossier_id"),
+    ("date_update", "date_update"),
+    ("statut", "statut"),
+    ("commentaire", "commentaire"),
+]
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire."""
+    def write(self, value):
+        return value
+
+
+def cellule(valeur):
+    if hasattr(valeur, "isoformat"):
+        return valeur.isoformat()
+    if isinstance(valeur, str) and valeur.startswith(DEBUTS_FORMULE):
+        # texte libre (commentaire, description, nom) : jamais interprété comme formule par le tableur
+        return "'" + valeur
+    return valeur
+
+
+def lignes(queryset, colonnes):
+    yield [entete for entete, _ in colonnes]
+    champs = [champ for _, champ in colonnes]
+    for ligne in queryset.values_list(*champs).iterator(chunk_size=CHUNK_SIZE):
+        yield [cellule(v) for v in ligne]
+
+
+async def alignes(queryset, colonnes):
+    yield [entete for entete, _ in colonnes]
+    champs = [champ for _, champ in colonnes]
+    # values() et non values_list() : ValuesListIterable exécute la requête dès
+    # __iter__, dans la boucle d'événements (SynchronousOnlyOperation avec aiterator)
+    async for ligne in queryset.values(*champs).aiterator(chunk_size=CHUNK_SIZE):
+        yield [cellule(ligne[champ]) for champ in champs]
+
+
+def csv_stream(lignes):
+    writer = csv.writer(Echo())
+    for ligne in lignes:
+        yield writer.writerow(ligne)
+
+
+async def acsv_stream(lignes):
+    writer = csv.writer(Echo())
+    async for ligne in lignes:
+        yield writer.writerow(ligne)
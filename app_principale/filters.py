@@ -0,0 +1,26 @@
+from django_filters import rest_framework as django_filters
+
+from .models import DossierDemande, SuiviDossier, SuiviDossierHistorique
+
+
+class DossierDemandeFilter(django_filters.FilterSet):
+    # ?date_depot_after=2025-01-01&date_depot_before=2025-01-31
+    date_depot = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = DossierDemande
+        fields = ["type_subvention", "statut", "utilisateur", "date_depot"]
+
+
+class SuiviDossierFilter(django_filters.FilterSet):
+    date_update = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = SuiviDossier
+        fields = ["dossier", "statut", "date_update"]
+
+
+class SuiviDossierHistoriqueFilter(SuiviDossierFilter):
+    """Mêmes filtres sur la vue des suivis courants et archivés (?include_archived=true)."""
+    class Meta(SuiviDossierFilter.Meta):
+        model = SuiviDossierHistorique
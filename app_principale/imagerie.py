@@ -0,0 +1,57 @@
+"""
+Génération des aperçus réduits d'un fichier (image, ou 1re page d'un PDF si
+`pdftoppm` est installé). Exécuté dans un pool de processus : ce module ne
+dépend pas de Django.
+
+Les aperçus sont rangés sous une clé dérivée du contenu (sha256) : un fichier
+inchangé, ou déposé deux fois, n'est traité qu'une seule fois.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from PIL import Image, UnidentifiedImageError
+
+
+def nom_apercu(sha256, taille):
+    return f"apercus/{sha256[:2]}/{sha256}/{taille}.jpg"
+
+
+def generer_apercus(source, est_pdf, sha256, racine, tailles):
+    """
+    Retourne {"taille": nom relatif à `racine`}, ou {} si le fichier n'a pas d'aperçu possible.
+    """
+    noms = {str(t): nom_apercu(sha256, t) for t in tailles}
+    a_faire = [t for t in tailles if not os.path.exists(os.path.join(racine, noms[str(t)]))]
+    if not a_faire:
+        return noms
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if est_pdf:
+            if shutil.which("pdftoppm") is None:
+                return {}
+            page = os.path.join(tmp, "page")
+            subprocess.run(
+                ["pdftoppm", "-png", "-singlefile", "-f", "1", "-l", "1",
+                 "-scale-to", str(max(tailles)), source, page],
+                check=True, timeout=120, capture_output=True,
+            )
+            source = page + ".png"
+        try:
+            image = Image.open(source)
+        except UnidentifiedImageError:
+            return {}
+        with image:
+            # décodage JPEG directement à taille réduite
+            image.draft("RGB", (max(a_faire), max(a_faire)))
+            image = image.convert("RGB")
+            for taille in sorted(a_faire, reverse=True):
+                image.thumbnail((taille, taille))
+                destination = os.path.join(racine, noms[str(taille)])
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                fd, temporaire = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".jpg")
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, "JPEG", quality=85, optimize=True)
+                os.replace(temporaire, destination)
+    return noms
@@ -0,0 +1,157 @@
+"""
+Listes en lecture rapide (opt-in : LECTURE_RAPIDE = True) pour les dossiers, suivis
+et notifications.
+
+Au lieu d'instancier un modèle puis de passer chaque ligne par les champs DRF, la
+liste lit des dictionnaires (.values(), colonnes de l'utilisateur jointes) et les
+convertit avec des fonctions préparées une fois par requête à partir du serializer
+de la vue : même forme, mêmes valeurs, donc même JSON à l'octet près. L'utilisateur
+imbriqué est lu dans la jointure, comme par le serializer.
+
+Le rendu reste celui du JSONRenderer DRF : les données ne contiennent que des types
+natifs, l'encodeur C de json ne repasse jamais par JSONEncoder.default.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .serializers import ProtectedFileField
+
+
+# ---- Convertisseurs ----
+def identite(valeur):
+    return valeur
+
+
+def convertir_datetime(champ):
+    format_sortie = getattr(champ, "format", api_settings.DATETIME_FORMAT)
+    fuseau = champ.timezone if hasattr(champ, "timezone") else champ.default_timezone()
+    if format_sortie is None or format_sortie.lower() != ISO_8601 or fuseau is None:
+        return champ.to_representation
+
+    # DateTimeField.to_representation pour une date aware lue en base
+    def convertir(valeur):
+        texte = valeur.astimezone(fuseau).isoformat()
+        return texte[:-6] + "Z" if texte.endswith("+00:00") else texte
+
+    return convertir
+
+
+def convertir_decimal(champ):
+    if (not getattr(champ, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+            or champ.localize or champ.normalize_output):
+        return champ.to_representation
+    quantize = champ.quantize
+    return lambda valeur: f"{quantize(valeur):f}"
+
+
+def convertir_choix(champ):
+    choix = champ.choice_strings_to_values
+    return lambda valeur: choix.get(str(valeur), valeur)
+
+
+class LigneUrl:
+    """Ce que `url_kwargs` d'un ProtectedFileField lit sur l'instance, servi depuis la ligne."""
+    __slots__ = ("ligne", "prefixe")
+
+    def __init__(self, ligne, prefixe):
+        self.ligne, self.prefixe = ligne, prefixe
+
+    def __getattr__(self, nom):
+        return self.ligne[self.prefixe + ("id" if nom == "pk" else nom)]
+
+
+def convertir_fichier(champ, prefixe):
+    request = champ.context.get("request")
+    absolue = request.build_absolute_uri if request is not None else identite
+
+    def convertir(ligne, valeur):
+        if not valeur:
+            return None
+        return absolue(reverse(champ.view_name, kwargs=champ.url_kwargs(LigneUrl(ligne, prefixe))))
+
+    return convertir
+
+
+# ---- Compilation d'un serializer ----
+class ListeCompilee:
+    """
+    Colonnes à lire et conversion ligne -> dict pour un ModelSerializer : champs
+    simples, ForeignKey en clé primaire, serializer imbriqué (jointure) et
+    ProtectedFileField. Tout autre champ lisible est refusé.
+    """
+
+    def __init__(self, serializer):
+        self.colonnes = []
+        self.champs = self.compiler(serializer, "")
+
+    def compiler(self, serializer, prefixe):
+        # (nom, colonne, conversion, conversion de la ligne entière plutôt que de la valeur)
+        champs = []
+        for champ in serializer._readable_fields:
+            cle = prefixe + champ.source.replace(".", "__")
+            if isinstance(champ, serializers.BaseSerializer):
+                sous_champs = self.compiler(champ, cle + "__")
+                champs.append((champ.field_name, cle + "__id", lambda ligne, _, c=sous_champs: self.ligne(ligne, c), True))
+                continue
+            if isinstance(champ, ProtectedFileField):
+                champs.append((champ.field_name, cle, convertir_fichier(champ, prefixe), True))
+            else:
+                champs.append((champ.field_name, cle, self.convertisseur(champ), False))
+            self.colonnes.append(cle)
+        if prefixe:
+            self.colonnes.append(prefixe + "id")
+        return champs
+
+    def convertisseur(self, champ):
+        if isinstance(champ, serializers.DateTimeField):
+            return convertir_datetime(champ)
+        if isinstance(champ, serializers.DecimalField):
+            return convertir_decimal(champ)
+        if isinstance(champ, serializers.ChoiceField):
+            return convertir_choix(champ)
+        if isinstance(champ, serializers.CharField):
+            return str
+        if isinstance(champ, (serializers.IntegerField, serializers.BooleanField, serializers.PrimaryKeyRelatedField)):
+            # valeurs déjà du bon type en sortie de base (clé primaire pour une FK)
+            return identite
+        raise ImproperlyConfigured(f"Champ {champ.field_name!r} ({type(champ).__name__}) sans lecture rapide.")
+
+    def convertir(self, lignes):
+        return [self.ligne(ligne, self.champs) for ligne in lignes]
+
+    def ligne(self, ligne, champs):
+        resultat = {}
+        for nom, cle, conversion, par_ligne in champs:
+            valeur = ligne[cle]
+            if valeur is None:
+                resultat[nom] = None
+            elif par_ligne:
+                resultat[nom] = conversion(ligne, valeur)
+            else:
+                resultat[nom] = conversion(valeur)
+        return resultat
+
+
+# ---- Viewsets ----
+class ListeRapideMixin:
+    """
+    `list` en lecture rapide quand LECTURE_RAPIDE est actif et la réponse rendue
+    en JSON ; filtres, recherche, tri et pagination restent ceux de la vue.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not (getattr(settings, "LECTURE_RAPIDE", False) and request.accepted_renderer.format == "json"):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        liste = ListeCompilee(self.get_serializer())
+        # champs lus par la pagination par curseur (position de la dernière ligne)
+        tri = ["id", *(c for c in getattr(self, "ordering_fields", ()) if c != "__all__"), *queryset.query.annotations]
+        lignes = queryset.values(*dict.fromkeys([*liste.colonnes, *tri]))
+        page = self.paginate_queryset(lignes)
+        if page is not None:
+            return self.get_paginated_response(liste.convertir(page))
+        return Response(liste.convertir(lignes))
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app_principale.archives import TABLES, archiver, get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace par lots les notifications lues et les suivis des dossiers clos anciens vers "
+        "les tables d'archive (lisibles avec ?include_archived=true). Une pause entre les lots "
+        "et --duree-max permettent de le lancer en journée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--table", choices=sorted(TABLES), action="append", help="défaut : toutes")
+        parser.add_argument("--notifications-jours", dest="notifications_jours", type=int)
+        parser.add_argument("--suivis-jours", dest="suivis_jours", type=int)
+        parser.add_argument("--batch-size", type=int, help="lignes déplacées par transaction")
+        parser.add_argument("--pause", type=float, help="attente (s) entre deux lots")
+        parser.add_argument("--duree-max", dest="duree_max", type=float, help="arrêt après N secondes")
+        parser.add_argument("--dry-run", action="store_true", help="compte les lignes archivables")
+
+    def handle(self, *args, **options):
+        config = get_config()
+        jours = {
+            "notifications": options["notifications_jours"] or config["NOTIFICATIONS_JOURS"],
+            "suivis": options["suivis_jours"] or config["SUIVIS_JOURS"],
+        }
+        taille = options["batch_size"] or config["BATCH_SIZE"]
+        pause = config["PAUSE"] if options["pause"] is None else options["pause"]
+        fin = time.monotonic() + options["duree_max"] if options["duree_max"] else None
+
+        for nom in options["table"] or sorted(TABLES):
+            if options["dry_run"]:
+                archivables = TABLES[nom][2](timezone.now() - timedelta(days=jours[nom]))
+                self.stdout.write(f"{nom} : {archivables.count()} ligne(s) archivable(s)")
+                continue
+            total = archiver(
+                nom, jours[nom], taille, pause, fin=fin,
+                rapport=lambda nom, total: self.stdout.write(f"{nom} : {total} ligne(s) archivée(s)"),
+            )
+            self.stdout.write(self.style.SUCCESS(f"Terminé : {total} {nom} archivé(e)s"))
@@ -0,0 +1,183 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app_principale.authentication import ajouter_claims
+from app_principale.models import CustomUser, DossierDemande, Notification, SuiviDossier
+
+# (nom, rôle, méthode, chemin, corps) ; {dossier}, {suivi}, {notification}, {demandeur} : ids lus en base
+SCENARIOS = [
+    ("dossiers-liste", "agent", "get", "/api/dossiers/", None),
+    ("dossiers-liste-demandeur", "demandeur", "get", "/api/dossiers/", None),
+    ("dossiers-filtre", "agent", "get", "/api/dossiers/?statut=en_etude&type_subvention=formation", None),
+    ("dossiers-recherche", "agent", "get", "/api/dossiers/?search=formation", None),
+    ("dossiers-tri", "agent", "get", "/api/dossiers/?ordering=-montant_demande", None),
+    ("dossiers-detail", "demandeur", "get", "/api/dossiers/{dossier}/", None),
+    ("dossiers-timeline", "demandeur", "get", "/api/dossiers/{dossier}/timeline/", None),
+    ("suivis-liste", "agent", "get", "/api/suivis/", None),
+    ("suivis-filtre", "agent", "get", "/api/suivis/?statut=accepte", None),
+    ("suivis-recherche", "agent", "get", "/api/suivis/?search=formation", None),
+    ("suivis-tri", "agent", "get", "/api/suivis/?ordering=date_update", None),
+    ("suivis-detail", "agent", "get", "/api/suivis/{suivi}/", None),
+    ("notifications-liste", "demandeur", "get", "/api/notifications/", None),
+    ("notifications-filtre", "demandeur", "get", "/api/notifications/?statut=false", None),
+    ("notifications-recherche", "demandeur", "get", "/api/notifications/?search=formation", None),
+    ("notifications-tri", "demandeur", "get", "/api/notifications/?ordering=date_envoi", None),
+    ("notifications-detail", "demandeur", "get", "/api/notifications/{notification}/", None),
+    ("notifications-non-lues", "demandeur", "get", "/api/notifications/unread-count/", None),
+    ("users-liste", "admin", "get", "/api/users/", None),
+    ("users-recherche", "admin", "get", "/api/users/?search=synth", None),
+    ("users-tri", "admin", "get", "/api/users/?ordering=-last_login", None),
+    ("users-detail", "admin", "get", "/api/users/{demandeur}/", None),
+    ("users-me", "demandeur", "get", "/api/users/me/", None),
+    ("meta", "demandeur", "get", "/api/meta/", None),
+    ("stats", "agent", "get", "/api/stats/", None),
+    # écriture en dernier : les lectures ne voient pas ses suivis et notifications
+    ("dossiers-statut", "agent", "patch", "/api/dossiers/{dossier}/statut/", {"statut": "en_etude"}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Banc d'essai des points d'entrée de l'API, en processus (client de test DRF, jetons "
+        "JWT) sur la base courante, par ex. remplie par generer_donnees : latences p50/p95/p99, "
+        "requêtes SQL et pic mémoire (tracemalloc) par scénario. Les écritures sont annulées. "
+        "--baseline compare à un résultat précédent (--sortie) et échoue au-delà du seuil."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repetitions", type=int, default=30)
+        parser.add_argument("--echauffement", type=int, default=2, help="requêtes non mesurées (caches)")
+        parser.add_argument("--scenario", action="append", help="nom de scénario, répétable (défaut : tous)")
+        parser.add_argument("--sortie", help="fichier JSON des résultats")
+        parser.add_argument("--baseline", help="fichier JSON de référence")
+        parser.add_argument("--seuil", type=float, default=0.25, help="hausse relative tolérée (p50, mémoire)")
+        parser.add_argument("--marge-ms", dest="marge_ms", type=float, default=1.0,
+                            help="hausse absolue de p50 toujours tolérée (bruit)")
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in SCENARIOS if not options["scenario"] or s[0] in options["scenario"]]
+        if not scenarios:
+            raise CommandError(f"Scénario inconnu ; disponibles : {', '.join(s[0] for s in SCENARIOS)}")
+
+        resultats = {
+            "date": timezone.now().isoformat(),
+            "base": connection.vendor,
+            "volumes": {
+                modele.__name__: modele.objects.count()
+                for modele in (CustomUser, DossierDemande, SuiviDossier, Notification)
+            },
+            "repetitions": options["repetitions"],
+            "scenarios": {},
+        }
+        with transaction.atomic():
+            clients, ids = self.preparer()
+            for nom, role, methode, chemin, corps in scenarios:
+                resultats["scenarios"][nom] = self.mesurer(
+                    clients[role], methode, chemin.format(**ids), corps, options
+                )
+            transaction.set_rollback(True)
+
+        self.afficher(resultats["scenarios"])
+        if options["sortie"]:
+            with open(options["sortie"], "w", encoding="utf-8") as f:
+                json.dump(resultats, f, indent=2)
+        echecs = [nom for nom, r in resultats["scenarios"].items() if r["statut"] >= 400]
+        if echecs:
+            raise CommandError(f"Réponses en erreur : {', '.join(echecs)}")
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                reference = json.load(f)
+            regressions = comparer(reference["scenarios"], resultats["scenarios"], options["seuil"], options["marge_ms"])
+            for ligne in regressions:
+                self.stdout.write(self.style.ERROR(ligne))
+            if regressions:
+                raise CommandError(f"{len(regressions)} régression(s) par rapport à {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la référence."))
+
+    def preparer(self):
+        """Un client authentifié (jeton JWT) par rôle et les ids utilisés dans les chemins."""
+        dossier = DossierDemande.objects.select_related("utilisateur").order_by("-id").first()
+        suivi = SuiviDossier.objects.order_by("-id").first()
+        if dossier is None or suivi is None:
+            raise CommandError("Base vide : lancer d'abord generer_donnees.")
+        demandeur = dossier.utilisateur
+        notification = Notification.objects.filter(utilisateur=demandeur).order_by("-id").first()
+        users = {"demandeur": demandeur}
+        for role in ("agent", "admin"):
+            users[role] = CustomUser.objects.filter(role=role, is_active=True).order_by("id").first()
+            if users[role] is None:
+                raise CommandError(f"Aucun utilisateur {role} : lancer d'abord generer_donnees.")
+        clients = {}
+        for role, user in users.items():
+            clients[role] = APIClient(SERVER_NAME="localhost")
+            jeton = ajouter_claims(AccessToken.for_user(user), user)
+            clients[role].credentials(HTTP_AUTHORIZATION=f"Bearer {jeton}")
+        ids = {
+            "dossier": dossier.pk, "suivi": suivi.pk, "demandeur": demandeur.pk,
+            "notification": notification.pk if notification is not None else 0,
+        }
+        return clients, ids
+
+    def mesurer(self, client, methode, chemin, corps, options):
+        requete = getattr(client, methode)
+        kwargs = {"format": "json"} if corps is not None else {}
+        for _ in range(options["echauffement"]):
+            requete(chemin, corps, **kwargs)
+
+        durees = []
+        for _ in range(options["repetitions"]):
+            debut = time.perf_counter()
+            requete(chemin, corps, **kwargs)
+            durees.append((time.perf_counter() - debut) * 1000)
+
+        # passe séparée : tracemalloc et la capture SQL faussent les latences
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as requetes:
+                response = requete(chemin, corps, **kwargs)
+            _, pic = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        quantiles = statistics.quantiles(durees, n=100) if len(durees) > 1 else durees * 99
+        return {
+            "statut": response.status_code,
+            "p50_ms": quantiles[49], "p95_ms": quantiles[94], "p99_ms": quantiles[98], "max_ms": max(durees),
+            "requetes_sql": len(requetes), "memoire_pic_ko": pic / 1024,
+        }
+
+    def afficher(self, scenarios):
+        self.stdout.write(
+            f"{'scénario':<26} {'statut':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL':>5} {'mém. ko':>9}"
+        )
+        for nom, r in scenarios.items():
+            self.stdout.write(
+                f"{nom:<26} {r['statut']:>6} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                f"{r['requetes_sql']:>5} {r['memoire_pic_ko']:>9.1f}"
+            )
+
+
+def comparer(reference, resultats, seuil, marge_ms):
+    """Régressions de `resultats` par rapport à `reference` : p50, nombre de requêtes SQL, pic mémoire."""
+    regressions = []
+    for nom, r in resultats.items():
+        ref = reference.get(nom)
+        if ref is None:
+            continue
+        if r["p50_ms"] > ref["p50_ms"] * (1 + seuil) + marge_ms:
+            regressions.append(f"{nom} : p50 {ref['p50_ms']:.2f} -> {r['p50_ms']:.2f} ms")
+        # déterministe : toute requête en plus est une régression (N+1)
+        if r["requetes_sql"] > ref["requetes_sql"]:
+            regressions.append(f"{nom} : {ref['requetes_sql']} -> {r['requetes_sql']} requêtes SQL")
+        if r["memoire_pic_ko"] > ref["memoire_pic_ko"] * (1 + seuil):
+            regressions.append(f"{nom} : pic mémoire {ref['memoire_pic_ko']:.0f} -> {r['memoire_pic_ko']:.0f} ko")
+    return regressions
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app_principale.authentication import ajouter_claims
+from app_principale.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge HTTP : N clients concurrents (connexions keep-alive) sur une ou plusieurs "
+        "cibles ; débit, latences p50/p95/p99 et erreurs par cible. Comparaison WSGI / ASGI :\n"
+        "  gunicorn asdmbackend.wsgi -w 4 --threads 8 -b 127.0.0.1:8001\n"
+        "  ASYNC_READ_VIEWS=1 gunicorn asdmbackend.asgi:application -k uvicorn_worker.UvicornWorker "
+        "-w 4 -b 127.0.0.1:8002\n"
+        "  python manage.py bench_charge --cible wsgi=http://127.0.0.1:8001 "
+        "--cible asgi=http://127.0.0.1:8002 --utilisateur demandeur@asdm.test --clients 200"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cible", action="append", required=True, help="nom=http://hote:port (répétable)")
+        parser.add_argument("--chemin", action="append", help="chemin interrogé, répétable (défaut : les lectures async)")
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--duree", type=float, default=20, help="secondes par cible")
+        parser.add_argument("--jeton", help="jeton d'accès JWT")
+        parser.add_argument("--utilisateur", help="email : jeton généré depuis la base (même base que les serveurs)")
+        parser.add_argument("--sortie", help="fichier JSON des résultats")
+
+    def handle(self, *args, **options):
+        chemins = options["chemin"] or ["/api/notifications/", "/api/dossiers/", "/api/users/me/"]
+        jeton = options["jeton"]
+        if jeton is None and options["utilisateur"]:
+            user = CustomUser.objects.get(email=options["utilisateur"])
+            jeton = str(ajouter_claims(AccessToken.for_user(user), user))
+        if jeton is None:
+            raise CommandError("Fournir --jeton ou --utilisateur.")
+
+        resultats = {}
+        self.stdout.write(
+            f"{'cible':<10} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'erreurs':>8}"
+        )
+        for cible in options["cible"]:
+            nom, _, url = cible.partition("=")
+            r = asyncio.run(charger(url, chemins, jeton, options["clients"], options["duree"]))
+            resultats[nom] = r
+            self.stdout.write(
+                f"{nom:<10} {r['req_s']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+                f"{r['p99_ms']:>9.1f} {sum(r['erreurs'].values()):>8}"
+            )
+            for erreur, nombre in sorted(r["erreurs"].items()):
+                self.stdout.write(f"{'':<10} {erreur}: {nombre}")
+        if options["sortie"]:
+            with open(options["sortie"], "w", encoding="utf-8") as f:
+                json.dump(resultats, f, indent=2)
+
+
+async def charger(url, chemins, jeton, clients, duree):
+    parts = urlsplit(url)
+    hote, port = parts.hostname, parts.port or 80
+    entetes = (
+        f"Host: {parts.netloc}\r\nAuthorization: Bearer {jeton}\r\n"
+        "Accept: application/json\r\nConnection: keep-alive\r\n\r\n"
+    )
+    latences, erreurs = [], Counter()
+    debut = time.monotonic()
+    fin = debut + duree
+    await asyncio.gather(*(
+        client(hote, port, chemins, entetes, fin, latences, erreurs, decalage=i)
+        for i in range(clients)
+    ))
+    ecoule = time.monotonic() - debut
+    quantiles = statistics.quantiles(latences, n=100) if len(latences) > 1 else [0.0] * 99
+    return {
+        "clients": clients, "requetes": len(latences), "req_s": len(latences) / ecoule,
+        "p50_ms": quantiles[49] * 1000, "p95_ms": quantiles[94] * 1000, "p99_ms": quantiles[98] * 1000,
+        "erreurs": dict(erreurs),
+    }
+
+
+async def client(hote, port, chemins, entetes, fin, latences, erreurs, decalage=0):
+    reader = writer = None
+    i = decalage
+    while time.monotonic() < fin:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(hote, port)
+            chemin = chemins[i % len(chemins)]
+            i += 1
+            debut = time.perf_counter()
+            writer.write(f"GET {chemin} HTTP/1.1\r\n{entetes}".encode())
+            await writer.drain()
+            statut, fermer = await lire_reponse(reader)
+            latences.append(time.perf_counter() - debut)
+            if statut >= 400:
+                erreurs[f"HTTP {statut}"] += 1
+            if fermer:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            erreurs[type(exc).__name__] += 1
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def lire_reponse(reader):
+    """Lit une réponse HTTP/1.1 complète ; retourne (statut, connexion à fermer)."""
+    statut = int((await reader.readuntil(b"\r\n")).split()[1])
+    entetes = {}
+    while (ligne := await reader.readuntil(b"\r\n")) != b"\r\n":
+        nom, _, valeur = ligne.decode("latin-1").partition(":")
+        entetes[nom.strip().lower()] = valeur.strip()
+    if entetes.get("transfer-encoding", "").lower() == "chunked":
+        while (taille := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)) > 0:
+            await reader.readexactly(taille + 2)
+        await reader.readuntil(b"\r\n")
+    elif "content-length" in entetes:
+        await reader.readexactly(int(entetes["content-length"]))
+    return statut, entetes.get("connection", "").lower() == "close"
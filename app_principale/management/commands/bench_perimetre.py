@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+
+from app_principale.models import CustomUser, DossierDemande, Notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la latence des listes d'un demandeur (dossiers, notifications) quand le reste "
+        "de la table grossit. Les données sont créées dans une transaction annulée à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lignes-demandeur", type=int, default=20)
+        parser.add_argument("--volumes", default="1000,10000,100000", help="lignes des autres utilisateurs")
+        parser.add_argument("--repetitions", type=int, default=20)
+
+    def handle(self, *args, **options):
+        volumes = [int(v) for v in options["volumes"].split(",")]
+        with transaction.atomic():
+            demandeur = CustomUser.objects.create_user(
+                email="bench-demandeur@asdm.test", username="bench-demandeur", password="x", role="demandeur"
+            )
+            autre = CustomUser.objects.create_user(
+                email="bench-autre@asdm.test", username="bench-autre", password="x", role="demandeur"
+            )
+            self.creer(demandeur, options["lignes_demandeur"])
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(demandeur)
+
+            deja = 0
+            self.stdout.write(f"{'autres lignes':>14} {'dossiers p50 (ms)':>18} {'notifications p50 (ms)':>23}")
+            for volume in volumes:
+                self.creer(autre, volume - deja)
+                deja = volume
+                resultats = [self.mesurer(client, url, options["repetitions"])
+                             for url in ("/api/dossiers/", "/api/notifications/")]
+                self.stdout.write(f"{volume:>14} {resultats[0]:>18.2f} {resultats[1]:>23.2f}")
+            transaction.set_rollback(True)
+
+    def creer(self, user, n):
+        DossierDemande.objects.bulk_create(
+            [DossierDemande(utilisateur=user, type_subvention="formation", montant_demande="1.00",
+                            description_projet="bench") for _ in range(n)],
+            batch_size=5000,
+        )
+        Notification.objects.bulk_create(
+            [Notification(utilisateur=user, message="bench", type="in_app") for _ in range(n)],
+            batch_size=5000,
+        )
+
+    def mesurer(self, client, url, repetitions):
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            client.get(url)
+            durees.append((time.perf_counter() - debut) * 1000)
+        return statistics.median(durees)
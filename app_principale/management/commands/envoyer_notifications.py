@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_principale.dispatch import get_backends, get_config, traiter_lot
+
+
+class Command(BaseCommand):
+    help = "Worker d'envoi des notifications en attente (email, SMS, in-app), sans broker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="vide la file puis s'arrête")
+        parser.add_argument("--batch-size", type=int, help="taille des lots réclamés")
+        parser.add_argument("--workers", type=int, help="nombre de threads d'envoi")
+        parser.add_argument("--interval", type=float, default=2.0, help="attente (s) quand la file est vide")
+
+    def handle(self, *args, **options):
+        config = get_config()
+        if options["batch_size"]:
+            config["BATCH_SIZE"] = options["batch_size"]
+        if options["workers"]:
+            config["MAX_WORKERS"] = options["workers"]
+        backends = get_backends(config)
+
+        total = 0
+        while True:
+            traitees = traiter_lot(config, backends)
+            total += traitees
+            if traitees:
+                self.stdout.write(f"{traitees} notification(s) traitée(s)")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Terminé : {total} notification(s) traitée(s)"))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+
+from app_principale.models import CustomUser, DossierDemande, SuiviDossier, Notification
+
+
+class Command(BaseCommand):
+    help = "Lance EXPLAIN sur les requêtes par défaut des viewsets et indique si l'index attendu est utilisé."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--utilisateur", type=int, default=1, help="id utilisé dans les filtres par utilisateur")
+        parser.add_argument("--dossier", type=int, default=1, help="id utilisé dans les filtres par dossier")
+        parser.add_argument("--limit", type=int, default=50, help="taille de page simulée")
+
+    def get_requetes(self, utilisateur, dossier, limit):
+        # (libellé, queryset, index attendus)
+        return [
+            (
+                "dossiers ?statut=en_attente",
+                DossierDemande.objects.filter(statut="en_attente").order_by("-date_depot", "-id")[:limit],
+                ["dossier_statut_depot_idx", "dossier_ouvert_depot_idx"],
+            ),
+            (
+                "dossiers ?utilisateur=",
+                DossierDemande.objects.filter(utilisateur_id=utilisateur).order_by("-date_depot", "-id")[:limit],
+                ["dossier_user_depot_idx"],
+            ),
+            (
+                "suivis ?dossier=",
+                SuiviDossier.objects.filter(dossier_id=dossier).order_by("-date_update", "-id")[:limit],
+                ["suivi_dossier_update_idx"],
+            ),
+            (
+                "notifications ?utilisateur=&statut=false",
+                Notification.objects.filter(utilisateur_id=utilisateur, statut=False).order_by("-date_envoi", "-id")[:limit],
+                ["notif_non_lue_idx", "notif_user_envoi_idx"],
+            ),
+            (
+                "notifications ?utilisateur=&type=",
+                Notification.objects.filter(utilisateur_id=utilisateur, type="in_app").order_by("-date_envoi", "-id")[:limit],
+                ["notif_user_envoi_idx"],
+            ),
+            (
+                "suivis d'un demandeur",
+                SuiviDossier.objects.filter(dossier__utilisateur_id=utilisateur).order_by("-date_update", "-id")[:limit],
+                ["dossier_user_depot_idx", "utilisateur_id"],
+            ),
+            (
+                "users",
+                CustomUser.objects.order_by("-date_joined", "-id")[:limit],
+                [],
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        requetes = self.get_requetes(options["utilisateur"], options["dossier"], options["limit"])
+        for libelle, queryset, index_attendus in requetes:
+            plan = queryset.explain()
+            utilises = [nom for nom in index_attendus if nom in plan]
+            self.stdout.write(self.style.MIGRATE_HEADING(libelle))
+            self.stdout.write(plan)
+            if not index_attendus:
+                self.stdout.write("-> pas d'index attendu")
+            elif utilises:
+                self.stdout.write(self.style.SUCCESS(f"-> index utilisé : {', '.join(utilises)}"))
+            else:
+                self.stdout.write(self.style.WARNING("-> aucun index attendu dans le plan"))
+            self.stdout.write("")
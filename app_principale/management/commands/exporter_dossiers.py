@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_principale.export import COLONNES_DOSSIERS, COLONNES_SUIVIS, csv_stream, lignes
+from app_principale.filters import DossierDemandeFilter, SuiviDossierFilter
+from app_principale.models import DossierDemande, SuiviDossier
+
+
+class Command(BaseCommand):
+    help = "Exporte les dossiers (ou l'historique des suivis) en CSV, en flux."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--suivis", action="store_true", help="exporte l'historique des suivis")
+        parser.add_argument("--statut")
+        parser.add_argument("--type-subvention")
+        parser.add_argument("--depuis", help="date de début incluse (AAAA-MM-JJ)")
+        parser.add_argument("--jusqu-a", dest="jusqu_a", help="date de fin incluse (AAAA-MM-JJ)")
+        parser.add_argument("--output", "-o", help="fichier de sortie (défaut : sortie standard)")
+
+    def handle(self, *args, **options):
+        if options["suivis"]:
+            filterset_class, colonnes, champ_date = SuiviDossierFilter, COLONNES_SUIVIS, "date_update"
+            queryset = SuiviDossier.objects.order_by("date_update", "id")
+            data = {}
+        else:
+            filterset_class, colonnes, champ_date = DossierDemandeFilter, COLONNES_DOSSIERS, "date_depot"
+            queryset = DossierDemande.objects.order_by("date_depot", "id")
+            data = {"type_subvention": options["type_subvention"]}
+        data.update({
+            "statut": options["statut"],
+            f"{champ_date}_after": options["depuis"],
+            f"{champ_date}_before": options["jusqu_a"],
+        })
+        filterset = filterset_class(data={k: v for k, v in data.items() if v}, queryset=queryset)
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        sortie = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else sys.stdout
+        try:
+            for ligne in csv_stream(lignes(filterset.qs, colonnes)):
+                sortie.write(ligne)
+        finally:
+            if sortie is not sys.stdout:
+                sortie.close()
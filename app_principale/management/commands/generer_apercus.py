@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_principale.apercus import BAIL, nouveau_pool, traiter_lot
+
+
+class Command(BaseCommand):
+    help = "Worker de génération des aperçus des pièces jointes (pool de processus)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="vide la file puis s'arrête")
+        parser.add_argument("--workers", type=int, help="nombre de processus")
+        parser.add_argument("--batch-size", type=int, default=20, help="taille des lots réclamés")
+        parser.add_argument("--bail", type=int, default=BAIL, help="secondes avant reprise d'un lot non terminé")
+        parser.add_argument("--interval", type=float, default=5.0, help="attente (s) quand la file est vide")
+
+    def handle(self, *args, **options):
+        total = 0
+        with nouveau_pool(options["workers"]) as pool:
+            while True:
+                traitees = traiter_lot(pool, options["batch_size"], options["bail"])
+                total += traitees
+                if traitees:
+                    self.stdout.write(f"{traitees} pièce(s) jointe(s) traitée(s)")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Terminé : {total} pièce(s) jointe(s) traitée(s)"))
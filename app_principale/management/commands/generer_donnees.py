@@ -0,0 +1,175 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app_principale.models import CustomUser, DossierDemande, Notification, SuiviDossier
+from app_principale.stats import marquer_jours
+
+MOTS = (
+    "formation atelier couture menuiserie soudure informatique agriculture élevage semences "
+    "irrigation tracteur moto boutique coopérative jeunes femmes artisanat transformation "
+    "riz maraîchage poulailler pêche filets séchoir moulin commerce équipement local "
+    "marché village quartier association groupement projet extension création relance"
+).split()
+TYPES_SUBVENTION = [c for c, _ in DossierDemande.type]
+STATUTS = [c for c, _ in DossierDemande.Statut]
+TYPES_NOTIFICATION = [c for c, _ in Notification.Types]
+
+
+@contextmanager
+def dates_explicites(*champs):
+    """Coupe auto_now / auto_now_add le temps de la génération : les dates sont étalées dans le passé."""
+    sauvegarde = [(champ, champ.auto_now, champ.auto_now_add) for champ in champs]
+    for champ in champs:
+        champ.auto_now = champ.auto_now_add = False
+    try:
+        yield
+    finally:
+        for champ, auto_now, auto_now_add in sauvegarde:
+            champ.auto_now, champ.auto_now_add = auto_now, auto_now_add
+
+
+def champ(modele, nom):
+    return modele._meta.get_field(nom)
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère des données synthétiques (utilisateurs, dossiers, suivis, notifications) par "
+        "bulk_create, avec une graine fixe : mêmes données d'une exécution à l'autre. Les "
+        "notifications sont créées déjà envoyées (hors file d'envoi) ; mot de passe commun : "
+        "celui de --mot-de-passe. Ensuite : rafraichir_statistiques --tout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--utilisateurs", type=int, default=1000, help="demandeurs")
+        parser.add_argument("--agents", type=int, default=10)
+        parser.add_argument("--admins", type=int, default=2)
+        parser.add_argument("--dossiers", type=int, default=10000)
+        parser.add_argument("--suivis", type=int, default=30000)
+        parser.add_argument("--notifications", type=int, default=100000)
+        parser.add_argument("--jours", type=int, default=365, help="période couverte par les dates")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--lot", type=int, default=5000, help="lignes par bulk_create")
+        parser.add_argument("--prefixe", default="synth", help="préfixe des emails et usernames")
+        parser.add_argument("--mot-de-passe", dest="mot_de_passe", default="asdm-synth")
+
+    def handle(self, *args, **options):
+        if options["utilisateurs"] < 1:
+            raise CommandError("Il faut au moins un demandeur.")
+        if options["dossiers"] < 1 and options["suivis"] + options["notifications"] > 0:
+            raise CommandError("Suivis et notifications sont rattachés à des dossiers : --dossiers >= 1.")
+        self.rng = random.Random(options["seed"])
+        self.lot = options["lot"]
+        self.maintenant = timezone.now()
+        self.periode = timedelta(days=options["jours"])
+
+        users = self.etape("utilisateurs", lambda: self.creer_utilisateurs(options))
+        demandeurs = [u.pk for u in users if u.role == "demandeur"]
+        dossiers = self.etape("dossiers", lambda: self.creer_dossiers(demandeurs, options["dossiers"]))
+        self.etape("suivis", lambda: self.creer_suivis(dossiers, options["suivis"]))
+        self.etape("notifications", lambda: self.creer_notifications(dossiers, demandeurs, options["notifications"]))
+        marquer_jours(d for _, _, d in dossiers)
+
+    def etape(self, nom, creer):
+        debut = time.monotonic()
+        resultat = creer()
+        n = resultat if isinstance(resultat, int) else len(resultat)
+        self.stdout.write(f"{nom:<14} {n:>9} ligne(s) en {time.monotonic() - debut:.1f} s")
+        return resultat
+
+    def date(self):
+        return self.maintenant - self.periode * self.rng.random()
+
+    def texte(self, n):
+        return " ".join(self.rng.choices(MOTS, k=n))
+
+    def par_lots(self, modele, total, fabriquer):
+        """bulk_create de `total` objets, construits lot par lot (mémoire bornée)."""
+        fait = 0
+        while fait < total:
+            n = min(self.lot, total - fait)
+            modele.objects.bulk_create([fabriquer(fait + i) for i in range(n)], batch_size=self.lot)
+            fait += n
+        return fait
+
+    # ---- Tables ----
+    def creer_utilisateurs(self, options):
+        prefixe, seed = options["prefixe"], options["seed"]
+        if CustomUser.objects.filter(email__startswith=f"{prefixe}-{seed}-").exists():
+            raise CommandError(f"Données déjà générées pour {prefixe}-{seed} : changer --prefixe ou --seed.")
+        mot_de_passe = make_password(options["mot_de_passe"])
+        roles = (
+            ["admin"] * options["admins"] + ["agent"] * options["agents"] + ["demandeur"] * options["utilisateurs"]
+        )
+        users = []
+        for i, role in enumerate(roles):
+            nom = f"{prefixe}-{seed}-{i}"
+            users.append(CustomUser(
+                email=f"{nom}@asdm.test", username=nom, password=mot_de_passe, role=role,
+                first_name=self.rng.choice(MOTS).capitalize(), last_name=self.rng.choice(MOTS).capitalize(),
+                phone=f"+224 6{self.rng.randrange(10 ** 8):08d}", is_staff=role == "admin",
+                date_joined=self.date(),
+            ))
+        return CustomUser.objects.bulk_create(users, batch_size=self.lot)
+
+    def creer_dossiers(self, demandeurs, total):
+        # (id, utilisateur_id, date_depot) : de quoi rattacher suivis et notifications
+        dossiers = []
+        with dates_explicites(champ(DossierDemande, "date_depot"), champ(DossierDemande, "updated_at")):
+            fait = 0
+            while fait < total:
+                lot = []
+                for _ in range(min(self.lot, total - fait)):
+                    date_depot = self.date()
+                    lot.append(DossierDemande(
+                        utilisateur_id=self.rng.choice(demandeurs),
+                        type_subvention=self.rng.choice(TYPES_SUBVENTION),
+                        montant_demande=Decimal(self.rng.randrange(10000, 5000000)) / 100,
+                        description_projet=self.texte(self.rng.randint(8, 40)),
+                        statut=self.rng.choices(STATUTS, weights=(4, 3, 2, 1))[0],
+                        date_depot=date_depot, updated_at=date_depot,
+                    ))
+                DossierDemande.objects.bulk_create(lot, batch_size=self.lot)
+                dossiers.extend((d.pk, d.utilisateur_id, d.date_depot) for d in lot)
+                fait += len(lot)
+        return dossiers
+
+    def creer_suivis(self, dossiers, total):
+        def fabriquer(i):
+            # un premier suivi par dossier, puis au hasard
+            dossier_id, _, date_depot = dossiers[i] if i < len(dossiers) else self.rng.choice(dossiers)
+            return SuiviDossier(
+                dossier_id=dossier_id,
+                commentaire=self.texte(self.rng.randint(4, 20)),
+                statut=self.rng.choice(STATUTS),
+                date_update=min(date_depot + timedelta(hours=self.rng.randint(1, 24 * 30)), self.maintenant),
+            )
+
+        with dates_explicites(champ(SuiviDossier, "date_update")):
+            return self.par_lots(SuiviDossier, total, fabriquer)
+
+    def creer_notifications(self, dossiers, demandeurs, total):
+        def fabriquer(i):
+            if self.rng.random() < 0.8:
+                dossier_id, utilisateur_id, depuis = self.rng.choice(dossiers)
+            else:
+                dossier_id, utilisateur_id, depuis = None, self.rng.choice(demandeurs), None
+            date_envoi = self.date() if depuis is None else depuis + (self.maintenant - depuis) * self.rng.random()
+            return Notification(
+                utilisateur_id=utilisateur_id, dossier_id=dossier_id,
+                message=self.texte(self.rng.randint(5, 15)),
+                type=self.rng.choice(TYPES_NOTIFICATION),
+                statut=self.rng.random() < 0.7,
+                date_envoi=date_envoi, updated_at=date_envoi,
+                etat_envoi="envoye", prochain_essai=date_envoi, date_livraison=date_envoi,
+            )
+
+        with dates_explicites(champ(Notification, "date_envoi"), champ(Notification, "updated_at")):
+            return self.par_lots(Notification, total, fabriquer)
@@ -0,0 +1,64 @@
+import json
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app_principale.authentication import ajouter_claims
+from app_principale.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Rapport de profilage d'un serveur lancé avec PROFILAGE_API=1 : vues les plus lentes "
+        "(p95) et SQL dupliqué (N+1), lus sur /api/metrics/profil/ (compte admin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="adresse du serveur")
+        parser.add_argument("--jeton", help="jeton d'accès JWT d'un admin")
+        parser.add_argument("--utilisateur", help="email d'un admin : jeton généré depuis la base")
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--json", action="store_true", help="sortie JSON brute")
+
+    def handle(self, *args, **options):
+        jeton = options["jeton"]
+        if jeton is None and options["utilisateur"]:
+            user = CustomUser.objects.get(email=options["utilisateur"])
+            jeton = str(ajouter_claims(AccessToken.for_user(user), user))
+        if jeton is None:
+            raise CommandError("Fournir --jeton ou --utilisateur.")
+
+        requete = Request(
+            options["url"].rstrip("/") + "/api/metrics/profil/",
+            headers={"Authorization": f"Bearer {jeton}", "Accept": "application/json"},
+        )
+        with urlopen(requete, timeout=30) as reponse:
+            profil = json.load(reponse)
+        if options["json"]:
+            self.stdout.write(json.dumps(profil, indent=2, ensure_ascii=False))
+            return
+
+        top = options["top"]
+        self.stdout.write(
+            f"{'vue':<40} {'méthode':<7} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+            f"{'SQL moy':>8} {'SQL ms':>8} {'sér. ms':>8}"
+        )
+        for v in profil["vues"][:top]:
+            self.stdout.write(
+                f"{v['vue'][:40]:<40} {v['methode']:<7} {v['echantillons']:>6} {v['p50_ms']:>8.1f} "
+                f"{v['p95_ms']:>8.1f} {v['max_ms']:>8.1f} {v['requetes_sql_moy']:>8.1f} "
+                f"{v['sql_ms_moy']:>8.1f} {v['serialisation_ms_moy']:>8.1f}"
+            )
+
+        doublons = sorted(
+            ((d["max_par_requete"], v["vue"], d["sql"]) for v in profil["vues"] for d in v["sql_dupliques"]),
+            reverse=True,
+        )[:top]
+        self.stdout.write("")
+        self.stdout.write("SQL dupliqué (exécutions max par requête HTTP) :")
+        if not doublons:
+            self.stdout.write("  aucun")
+        for n, vue, sql in doublons:
+            self.stdout.write(f"  {n:>5}x  {vue}")
+            self.stdout.write(f"         {sql}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app_principale.uploads import purger_expires
+
+
+class Command(BaseCommand):
+    help = "Supprime les téléversements abandonnés (UPLOAD_EXPIRATION_HEURES) et leurs fichiers temporaires."
+
+    def handle(self, *args, **options):
+        n = purger_expires()
+        self.stdout.write(self.style.SUCCESS(f"{n} téléversement(s) supprimé(s)"))
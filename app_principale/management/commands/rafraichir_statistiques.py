@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from app_principale.models import DossierDemande
+from app_principale.stats import rafraichir_jours, rafraichir_jours_marques
+
+
+class Command(BaseCommand):
+    help = "Recalcule les statistiques des jours modifiés (ou d'une période avec --depuis)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--depuis", help="recalcule tous les jours depuis cette date (AAAA-MM-JJ)")
+        parser.add_argument("--tout", action="store_true", help="recalcule depuis le premier dépôt")
+
+    def handle(self, *args, **options):
+        depuis = None
+        if options["tout"]:
+            premier = DossierDemande.objects.order_by("date_depot").values_list("date_depot", flat=True).first()
+            depuis = timezone.localdate(premier) if premier else None
+        elif options["depuis"]:
+            depuis = parse_date(options["depuis"])
+            if depuis is None:
+                raise CommandError("Date invalide (AAAA-MM-JJ).")
+
+        if depuis is None and not options["tout"]:
+            n = rafraichir_jours_marques()
+        else:
+            aujourdhui = timezone.localdate()
+            jours = [depuis + timedelta(days=i) for i in range((aujourdhui - depuis).days)] if depuis else []
+            rafraichir_jours(jours)
+            n = len(jours)
+        self.stdout.write(self.style.SUCCESS(f"{n} jour(s) recalculé(s)"))
@@ -0,0 +1,112 @@
+"""
+Téléchargement des fichiers protégés.
+
+Django ne fait que le contrôle d'accès ; le transfert est délégué au serveur web
+frontal via X-Accel-Redirect (nginx) ou X-Sendfile (Apache, lighttpd), selon
+MEDIA_SERVE_MODE. Exemple nginx pour MEDIA_ACCEL_PREFIX = "/protected-media/" :
+
+    location /protected-media/ {
+        internal;
+        alias /chemin/vers/media/;
+    }
+
+Sans serveur frontal (MEDIA_SERVE_MODE = None), repli sur une réponse en flux
+depuis Python, avec prise en charge des requêtes Range (reprise, lecture partielle).
+Sous ASGI, le flux est un itérateur async (lectures du fichier dans un thread) :
+Django lirait sinon tout le fichier en mémoire avant d'envoyer le premier octet.
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+BLOC = 64 * 1024
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(valeur, taille):
+    """Retourne (debut, fin) inclus, None sans Range exploitable, ou False si la plage est hors fichier."""
+    m = RANGE.match(valeur or "")
+    if not m or m.groups() == ("", ""):
+        return None
+    debut, fin = m.groups()
+    if debut == "":
+        # suffixe : les N derniers octets
+        debut, fin = max(taille - int(fin), 0), taille - 1
+    else:
+        debut, fin = int(debut), min(int(fin), taille - 1) if fin else taille - 1
+    if debut >= taille or debut > fin:
+        return False
+    return debut, fin
+
+
+def lire_plage(f, debut, longueur):
+    try:
+        f.seek(debut)
+        while longueur > 0:
+            bloc = f.read(min(BLOC, longueur))
+            if not bloc:
+                break
+            longueur -= len(bloc)
+            yield bloc
+    finally:
+        f.close()
+
+
+async def alire_plage(f, debut, longueur):
+    # lectures bloquantes hors de la boucle d'événements
+    lire = sync_to_async(f.read, thread_sensitive=False)
+    try:
+        await sync_to_async(f.seek, thread_sensitive=False)(debut)
+        while longueur > 0:
+            bloc = await lire(min(BLOC, longueur))
+            if not bloc:
+                break
+            longueur -= len(bloc)
+            yield bloc
+    finally:
+        await sync_to_async(f.close, thread_sensitive=False)()
+
+
+def reponse_python(request, fieldfile, content_type):
+    taille = fieldfile.size
+    plage = parse_range(request.headers.get("Range"), taille)
+    if plage is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{taille}"
+        return response
+    asgi = isinstance(getattr(request, "_request", request), ASGIRequest)
+    f = fieldfile.open("rb")
+    if plage is None and not asgi:
+        response = FileResponse(f, content_type=content_type)
+    else:
+        debut, fin = plage or (0, taille - 1)
+        lecture = alire_plage if asgi else lire_plage
+        response = StreamingHttpResponse(
+            lecture(f, debut, fin - debut + 1), status=206 if plage else 200, content_type=content_type
+        )
+        response["Content-Length"] = fin - debut + 1
+        if plage:
+            response["Content-Range"] = f"bytes {debut}-{fin}/{taille}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def servir_fichier(request, fieldfile, nom):
+    content_type = mimetypes.guess_type(nom)[0] or "application/octet-stream"
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == "x-accel":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(fieldfile.name)
+    elif mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = fieldfile.path
+    else:
+        response = reponse_python(request, fieldfile, content_type)
+    response["Content-Disposition"] = content_disposition_header(as_attachment=True, filename=nom)
+    return response
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dossierdemande',
+            index=models.Index(fields=['statut', '-date_depot', '-id'], name='dossier_statut_depot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dossierdemande',
+            index=models.Index(condition=models.Q(('statut__in', ['en_attente', 'en_etude'])), fields=['-date_depot', '-id'], name='dossier_ouvert_depot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['utilisateur', 'statut', '-date_envoi', '-id'], name='notif_user_statut_envoi_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('statut', False)), fields=['utilisateur', '-date_envoi', '-id'], name='notif_non_lue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suividossier',
+            index=models.Index(fields=['dossier', '-date_update', '-id'], name='suivi_dossier_update_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# (table, colonne indexée en plein texte)
+TABLES_PLEIN_TEXTE = [
+    ("app_principale_dossierdemande", "description_projet"),
+    ("app_principale_suividossier", "commentaire"),
+    ("app_principale_notification", "message"),
+]
+
+USER_TABLE = "app_principale_customuser"
+
+
+def creer_recherche(apps, schema_editor):
+    # PostgreSQL uniquement : en local (SQLite) la recherche se replie sur LIKE
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, colonne in TABLES_PLEIN_TEXTE:
+        schema_editor.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+        schema_editor.execute(f"""
+            CREATE FUNCTION {table}_search_trigger() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := to_tsvector('french', coalesce(NEW.{colonne}, ''));
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_update
+            BEFORE INSERT OR UPDATE OF {colonne} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_trigger()
+        """)
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = to_tsvector('french', coalesce({colonne}, ''))"
+        )
+        schema_editor.execute(f"CREATE INDEX {table}_search_gin ON {table} USING gin (search_vector)")
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(f"""
+        CREATE INDEX {USER_TABLE}_search_trgm ON {USER_TABLE}
+        USING gin ((username || ' ' || email || ' ' || first_name || ' ' || last_name) gin_trgm_ops)
+    """)
+
+
+def supprimer_recherche(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {USER_TABLE}_search_trgm")
+    for table, colonne in TABLES_PLEIN_TEXTE:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_update ON {table}")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_trigger()")
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0002_indexes_acces'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_recherche, supprimer_recherche),
+    ]
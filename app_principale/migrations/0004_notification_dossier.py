@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0003_recherche_plein_texte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dossier',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='app_principale.dossierdemande'),
+        ),
+    ]
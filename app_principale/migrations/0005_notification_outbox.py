@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0004_notification_dossier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='date_livraison',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='erreur_envoi',
+            field=models.TextField(blank=True),
+        ),
+        # les notifications existantes ne doivent pas repartir au déploiement
+        migrations.AddField(
+            model_name='notification',
+            name='etat_envoi',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echec', 'Echec')], default='envoye', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='etat_envoi',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echec', 'Echec')], default='en_attente', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='prochain_essai',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='tentatives',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('etat_envoi__in', ['en_attente', 'en_cours'])), fields=['prochain_essai'], name='notif_outbox_idx'),
+        ),
+    ]
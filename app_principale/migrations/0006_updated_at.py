@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0005_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dossierdemande',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # lignes existantes : dernière modification connue = date de création
+        migrations.RunSQL(
+            "UPDATE app_principale_dossierdemande SET updated_at = date_depot",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "UPDATE app_principale_notification SET updated_at = date_envoi",
+            migrations.RunSQL.noop,
+        ),
+    ]
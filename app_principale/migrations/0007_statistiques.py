@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JourARecalculer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatistiqueDossier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField()),
+                ('type_subvention', models.CharField(choices=[('formation', 'Formation'), ('equipement', 'Equipement'), ('soutien', 'Soutien fiancier')], max_length=50)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_etude', "En cours d'etude"), ('accepte', 'Accepté'), ('refuse', 'Refusé')], max_length=20)),
+                ('nombre', models.PositiveIntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('nombre_decides', models.PositiveIntegerField(default=0)),
+                ('delai_decision_total', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('jour', 'type_subvention', 'statut'), name='stat_jour_type_statut_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:35
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0007_statistiques'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PieceJointe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fichier', models.FileField(upload_to='dossiers/')),
+                ('nom', models.CharField(max_length=255)),
+                ('taille', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('date_ajout', models.DateTimeField(auto_now_add=True)),
+                ('dossier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pieces_jointes', to='app_principale.dossierdemande')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Televersement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=255)),
+                ('taille', models.PositiveBigIntegerField()),
+                ('recu', models.PositiveBigIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('dossier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='televersements', to='app_principale.dossierdemande')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
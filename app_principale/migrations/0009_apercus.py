@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0008_pieces_jointes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='piecejointe',
+            name='apercus',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='piecejointe',
+            name='etat_apercus',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('genere', 'Généré'), ('sans_apercu', 'Sans aperçu'), ('echec', 'Echec')], default='en_attente', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='piecejointe',
+            index=models.Index(condition=models.Q(('etat_apercus', 'en_attente')), fields=['id'], name='piece_apercu_attente_idx'),
+        ),
+    ]
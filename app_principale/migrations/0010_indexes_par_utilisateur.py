@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0009_apercus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dossierdemande',
+            index=models.Index(fields=['utilisateur', '-date_depot', '-id'], name='dossier_user_depot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['utilisateur', '-date_envoi', '-id'], name='notif_user_envoi_idx'),
+        ),
+        # remplacé par notif_user_envoi_idx (toutes les listes) et notif_non_lue_idx (non lues) :
+        # un index de moins à maintenir à chaque notification écrite
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_user_statut_envoi_idx',
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+NOTIFICATION = "app_principale_notification"
+COMPTEUR = "app_principale_compteurnotifications"
+
+# PostgreSQL : triggers par instruction avec tables de transition (un seul UPDATE du
+# compteur par utilisateur, même pour un UPDATE de 10 000 notifications)
+FONCTION_POSTGRES = f"""
+CREATE FUNCTION {NOTIFICATION}_compteur() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO {COMPTEUR} (utilisateur_id, non_lues)
+        SELECT utilisateur_id, count(*) FROM nouvelles WHERE NOT statut GROUP BY utilisateur_id
+        ON CONFLICT (utilisateur_id) DO UPDATE SET non_lues = {COMPTEUR}.non_lues + EXCLUDED.non_lues;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE {COMPTEUR} c SET non_lues = c.non_lues - d.n
+        FROM (SELECT utilisateur_id, count(*) AS n FROM anciennes WHERE NOT statut GROUP BY utilisateur_id) d
+        WHERE c.utilisateur_id = d.utilisateur_id;
+    ELSE
+        INSERT INTO {COMPTEUR} (utilisateur_id, non_lues)
+        SELECT utilisateur_id, sum(n) FROM (
+            SELECT utilisateur_id, -1 AS n FROM anciennes WHERE NOT statut
+            UNION ALL
+            SELECT utilisateur_id, 1 FROM nouvelles WHERE NOT statut
+        ) delta
+        GROUP BY utilisateur_id HAVING sum(n) <> 0
+        ON CONFLICT (utilisateur_id) DO UPDATE SET non_lues = {COMPTEUR}.non_lues + EXCLUDED.non_lues;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+TRIGGERS_POSTGRES = [
+    ("insert", "INSERT", "REFERENCING NEW TABLE AS nouvelles"),
+    ("update", "UPDATE", "REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles"),
+    ("delete", "DELETE", "REFERENCING OLD TABLE AS anciennes"),
+]
+
+# SQLite : triggers par ligne
+TRIGGERS_SQLITE = {
+    "insert": f"""
+        CREATE TRIGGER {NOTIFICATION}_compteur_insert AFTER INSERT ON {NOTIFICATION}
+        WHEN NOT NEW.statut
+        BEGIN
+            INSERT INTO {COMPTEUR} (utilisateur_id, non_lues) VALUES (NEW.utilisateur_id, 1)
+            ON CONFLICT (utilisateur_id) DO UPDATE SET non_lues = non_lues + 1;
+        END
+    """,
+    "update": f"""
+        CREATE TRIGGER {NOTIFICATION}_compteur_update AFTER UPDATE OF statut, utilisateur_id ON {NOTIFICATION}
+        BEGIN
+            UPDATE {COMPTEUR} SET non_lues = non_lues - 1
+            WHERE utilisateur_id = OLD.utilisateur_id AND NOT OLD.statut;
+            INSERT INTO {COMPTEUR} (utilisateur_id, non_lues) SELECT NEW.utilisateur_id, 1 WHERE NOT NEW.statut
+            ON CONFLICT (utilisateur_id) DO UPDATE SET non_lues = non_lues + 1;
+        END
+    """,
+    "delete": f"""
+        CREATE TRIGGER {NOTIFICATION}_compteur_delete AFTER DELETE ON {NOTIFICATION}
+        WHEN NOT OLD.statut
+        BEGIN
+            UPDATE {COMPTEUR} SET non_lues = non_lues - 1 WHERE utilisateur_id = OLD.utilisateur_id;
+        END
+    """,
+}
+
+
+def creer_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(FONCTION_POSTGRES)
+        for nom, operation, transition in TRIGGERS_POSTGRES:
+            schema_editor.execute(
+                f"CREATE TRIGGER {NOTIFICATION}_compteur_{nom} AFTER {operation} ON {NOTIFICATION} "
+                f"{transition} FOR EACH STATEMENT EXECUTE FUNCTION {NOTIFICATION}_compteur()"
+            )
+    elif vendor == "sqlite":
+        for sql in TRIGGERS_SQLITE.values():
+            schema_editor.execute(sql)
+    else:
+        return
+    schema_editor.execute(
+        f"INSERT INTO {COMPTEUR} (utilisateur_id, non_lues) "
+        f"SELECT utilisateur_id, count(*) FROM {NOTIFICATION} WHERE NOT statut GROUP BY utilisateur_id"
+    )
+
+
+def supprimer_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for nom in TRIGGERS_SQLITE:
+        if vendor == "postgresql":
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {NOTIFICATION}_compteur_{nom} ON {NOTIFICATION}")
+        elif vendor == "sqlite":
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {NOTIFICATION}_compteur_{nom}")
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {NOTIFICATION}_compteur()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0011_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompteurNotifications',
+            fields=[
+                ('utilisateur', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('non_lues', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(creer_triggers, supprimer_triggers),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# vue -> (table courante, table d'archive, colonnes communes)
+VUES = {
+    "app_principale_notification_historique": (
+        "app_principale_notification", "app_principale_notificationarchive",
+        "id, utilisateur_id, dossier_id, message, type, statut, date_envoi, updated_at, etat_envoi, date_livraison",
+    ),
+    "app_principale_suividossier_historique": (
+        "app_principale_suividossier", "app_principale_suividossierarchive",
+        "id, dossier_id, date_update, commentaire, statut",
+    ),
+}
+
+
+def creer_vues(apps, schema_editor):
+    colonnes_pg = ""
+    if schema_editor.connection.vendor == "postgresql":
+        # recherche plein texte (0003) : le vecteur est recopié à l'archivage, sans trigger
+        for _, archive, _ in VUES.values():
+            schema_editor.execute(f"ALTER TABLE {archive} ADD COLUMN search_vector tsvector")
+        colonnes_pg = ", search_vector"
+    for vue, (table, archive, colonnes) in VUES.items():
+        schema_editor.execute(
+            f"CREATE VIEW {vue} AS SELECT {colonnes}{colonnes_pg} FROM {table} "
+            f"UNION ALL SELECT {colonnes}{colonnes_pg} FROM {archive}"
+        )
+
+
+def supprimer_vues(apps, schema_editor):
+    for vue in VUES:
+        schema_editor.execute(f"DROP VIEW IF EXISTS {vue}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0012_compteur_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationHistorique',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('type', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('in_app', 'Notification in-app')], max_length=20)),
+                ('statut', models.BooleanField()),
+                ('date_envoi', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('etat_envoi', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echec', 'Echec')], max_length=20)),
+                ('date_livraison', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'app_principale_notification_historique',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SuiviDossierHistorique',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_update', models.DateTimeField()),
+                ('commentaire', models.TextField()),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_etude', "En cours d'etude"), ('accepte', 'Accepté'), ('refuse', 'Refusé')], max_length=20)),
+            ],
+            options={
+                'db_table': 'app_principale_suividossier_historique',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('type', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('in_app', 'Notification in-app')], max_length=20)),
+                ('statut', models.BooleanField(default=False)),
+                ('date_envoi', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('etat_envoi', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echec', 'Echec')], max_length=20)),
+                ('date_livraison', models.DateTimeField(blank=True, null=True)),
+                ('date_archivage', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dossier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app_principale.dossierdemande')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['utilisateur', '-date_envoi', '-id'], name='notif_archive_user_envoi_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SuiviDossierArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_update', models.DateTimeField()),
+                ('commentaire', models.TextField()),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_etude', "En cours d'etude"), ('accepte', 'Accepté'), ('refuse', 'Refusé')], max_length=20)),
+                ('date_archivage', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dossier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app_principale.dossierdemande')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dossier', '-date_update', '-id'], name='suivi_archive_dossier_idx')],
+            },
+        ),
+        migrations.RunPython(creer_vues, supprimer_vues),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0014_customuser_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='televersement',
+            name='derniere_activite',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_principale', '0015_televersement_derniere_activite'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='piecejointe',
+            name='piece_apercu_attente_idx',
+        ),
+        migrations.AddField(
+            model_name='piecejointe',
+            name='bail_apercus',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='piecejointe',
+            name='etat_apercus',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('genere', 'Généré'), ('sans_apercu', 'Sans aperçu'), ('echec', 'Echec')], default='en_attente', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='piecejointe',
+            index=models.Index(condition=models.Q(('etat_apercus__in', ['en_attente', 'en_cours'])), fields=['id'], name='piece_apercu_a_faire_idx'),
+        ),
+    ]
@@ -1,4 +1,8 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 # Create your models here.
 class CustomUser(AbstractUser):
@@ -11,10 +15,21 @@ class CustomUser(AbstractUser):
     email= models.EmailField(unique=True)
     phone=models.CharField(max_length=20, blank=True)
     role= models.CharField(max_length=20, choices=ROLES, default='demandeur')
+    # portée par les jetons JWT (claim "ver") : l'incrémenter révoque tous les jetons émis
+    token_version = models.PositiveIntegerField(default=0)
+    # validateur des GET conditionnels des lignes qui imbriquent l'utilisateur (voir conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
     USERNAME_FIELD='email'
     REQUIRED_FIELDS=['username']
     def __str__(self):
         return f"{self.username} - {self.role}"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "updated_at" not in update_fields:
+            # écritures partielles comprises (ex. last_login à la connexion)
+            kwargs["update_fields"] = [*update_fields, "updated_at"]
+        super().save(*args, **kwargs)
     
 
 class DossierDemande(models.Model):
@@ -39,7 +54,20 @@ class DossierDemande(models.Model):
     fichiers= models.FileField(upload_to='dossiers/', blank=True, null=True)
     date_depot= models.DateTimeField(auto_now_add=True)
     statut= models.CharField(max_length=20, choices=Statut, default='en_attente')
+    updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # file d'attente des agents : dossiers d'un statut, plus récents d'abord
+            models.Index(fields=["statut", "-date_depot", "-id"], name="dossier_statut_depot_idx"),
+            # liste d'un demandeur (RoleScopedQuerysetMixin)
+            models.Index(fields=["utilisateur", "-date_depot", "-id"], name="dossier_user_depot_idx"),
+            models.Index(
+                fields=["-date_depot", "-id"], name="dossier_ouvert_depot_idx",
+                condition=models.Q(statut__in=["en_attente", "en_etude"]),
+            ),
+        ]
+
     def __str__(self):
         return f"Dossier  {self.id} - {self.utilisateur.username} "
     
@@ -50,8 +78,14 @@ class SuiviDossier(models.Model):
     commentaire = models.TextField()
     statut= models.CharField(max_length=20, choices=DossierDemande.Statut, default='en_attente') 
     
+    class Meta:
+        indexes = [
+            # historique d'un dossier
+            models.Index(fields=["dossier", "-date_update", "-id"], name="suivi_dossier_update_idx"),
+        ]
+
     def __str__(self):
-        return f"Suivi Dossier {self.dossier.id}"
+        return f"Suivi Dossier {self.dossier_id}"
 
 
 
@@ -62,12 +96,227 @@ class Notification (models.Model):
         ('in_app', 'Notification in-app'),
         
     ]
+    EtatsEnvoi = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('envoye', 'Envoyé'),
+        ('echec', 'Echec'),
+    ]
     utilisateur = models.ForeignKey(CustomUser, on_delete=models.CASCADE)   
+    dossier = models.ForeignKey(
+        DossierDemande, on_delete=models.SET_NULL, null=True, blank=True, related_name="notifications"
+    )
     message= models.TextField()
     type= models.CharField(max_length=20, choices=Types)
     statut= models.BooleanField(default= False)
     date_envoi= models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # file d'envoi (outbox) traitée par la commande envoyer_notifications
+    etat_envoi = models.CharField(max_length=20, choices=EtatsEnvoi, default='en_attente')
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    prochain_essai = models.DateTimeField(default=timezone.now)
+    date_livraison = models.DateTimeField(null=True, blank=True)
+    erreur_envoi = models.TextField(blank=True)
     
+    class Meta:
+        indexes = [
+            # notifications à réclamer par le worker
+            models.Index(
+                fields=["prochain_essai"], name="notif_outbox_idx",
+                condition=models.Q(etat_envoi__in=["en_attente", "en_cours"]),
+            ),
+            # liste d'un utilisateur (tous filtres confondus, y compris ?statut=true)
+            models.Index(fields=["utilisateur", "-date_envoi", "-id"], name="notif_user_envoi_idx"),
+            # non lues d'un utilisateur (?statut=false)
+            models.Index(
+                fields=["utilisateur", "-date_envoi", "-id"], name="notif_non_lue_idx",
+                condition=models.Q(statut=False),
+            ),
+        ]
+
     def __str__(self):
         return f"Notification {self.id} à {self.utilisateur.username}"
-    
\ No newline at end of file
+
+
+class CompteurNotifications(models.Model):
+    """
+    Nombre de notifications non lues par utilisateur (badge), tenu à jour par des
+    triggers sur la table des notifications (migration 0012) : insertions, UPDATE
+    en masse et suppressions en cascade compris.
+    """
+    # pas de contrainte : les triggers peuvent écrire pendant la suppression de l'utilisateur
+    utilisateur = models.OneToOneField(
+        CustomUser, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name="+"
+    )
+    non_lues = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.non_lues} notification(s) non lue(s) pour {self.utilisateur_id}"
+
+
+# ---- Archives ----
+# Lignes anciennes déplacées par la commande archiver (mêmes ids) : notifications lues
+# et envoyées, suivis des dossiers clos. Les vues SQL *_historique réunissent table
+# courante et archive pour les lectures ?include_archived=true (migration 0013).
+class NotificationArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    utilisateur = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+    dossier = models.ForeignKey(DossierDemande, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    message = models.TextField()
+    type = models.CharField(max_length=20, choices=Notification.Types)
+    statut = models.BooleanField(default=False)
+    date_envoi = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    etat_envoi = models.CharField(max_length=20, choices=Notification.EtatsEnvoi)
+    date_livraison = models.DateTimeField(null=True, blank=True)
+    date_archivage = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["utilisateur", "-date_envoi", "-id"], name="notif_archive_user_envoi_idx"),
+        ]
+
+    def __str__(self):
+        return f"Notification archivée {self.id}"
+
+
+class SuiviDossierArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    dossier = models.ForeignKey(DossierDemande, on_delete=models.CASCADE, related_name="+")
+    date_update = models.DateTimeField()
+    commentaire = models.TextField()
+    statut = models.CharField(max_length=20, choices=DossierDemande.Statut)
+    date_archivage = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["dossier", "-date_update", "-id"], name="suivi_archive_dossier_idx"),
+        ]
+
+    def __str__(self):
+        return f"Suivi archivé {self.id} du dossier {self.dossier_id}"
+
+
+class NotificationHistorique(models.Model):
+    """Vue SQL : notifications courantes + archivées (lecture seule)."""
+    id = models.BigIntegerField(primary_key=True)
+    utilisateur = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING, related_name="+")
+    dossier = models.ForeignKey(
+        DossierDemande, on_delete=models.DO_NOTHING, null=True, related_name="notifications_historique"
+    )
+    message = models.TextField()
+    type = models.CharField(max_length=20, choices=Notification.Types)
+    statut = models.BooleanField()
+    date_envoi = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    etat_envoi = models.CharField(max_length=20, choices=Notification.EtatsEnvoi)
+    date_livraison = models.DateTimeField(null=True)
+
+    class Meta:
+        managed = False
+        db_table = "app_principale_notification_historique"
+
+    def __str__(self):
+        return f"Notification {self.id}"
+
+
+class SuiviDossierHistorique(models.Model):
+    """Vue SQL : suivis courants + archivés (lecture seule)."""
+    id = models.BigIntegerField(primary_key=True)
+    dossier = models.ForeignKey(DossierDemande, on_delete=models.DO_NOTHING, related_name="suivis_historique")
+    date_update = models.DateTimeField()
+    commentaire = models.TextField()
+    statut = models.CharField(max_length=20, choices=DossierDemande.Statut)
+
+    class Meta:
+        managed = False
+        db_table = "app_principale_suividossier_historique"
+
+    def __str__(self):
+        return f"Suivi Dossier {self.dossier_id}"
+
+
+class PieceJointe(models.Model):
+    EtatsApercus = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('genere', 'Généré'),
+        ('sans_apercu', 'Sans aperçu'),
+        ('echec', 'Echec'),
+    ]
+    dossier = models.ForeignKey(DossierDemande, on_delete=models.CASCADE, related_name="pieces_jointes")
+    fichier = models.FileField(upload_to="dossiers/")
+    nom = models.CharField(max_length=255)
+    taille = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    date_ajout = models.DateTimeField(auto_now_add=True)
+    # aperçus générés par la commande generer_apercus : {"256": "apercus/..../256.jpg", ...}
+    etat_apercus = models.CharField(max_length=20, choices=EtatsApercus, default='en_attente')
+    # "en_cours" : réclamée par un worker jusqu'à cette date, reprise ensuite
+    bail_apercus = models.DateTimeField(null=True, blank=True)
+    apercus = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"], name="piece_apercu_a_faire_idx",
+                condition=models.Q(etat_apercus__in=["en_attente", "en_cours"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Pièce jointe {self.id} du dossier {self.dossier_id}"
+
+
+class Televersement(models.Model):
+    """
+    Téléversement par morceaux en cours : les parties sont écrites dans un fichier
+    temporaire jusqu'à la finalisation, qui crée la PieceJointe.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    dossier = models.ForeignKey(DossierDemande, on_delete=models.CASCADE, related_name="televersements")
+    utilisateur = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    nom = models.CharField(max_length=255)
+    taille = models.PositiveBigIntegerField()
+    recu = models.PositiveBigIntegerField(default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    # dernière partie reçue : les téléversements inactifs sont purgés (purger_televersements)
+    derniere_activite = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def chemin_temporaire(self):
+        return settings.UPLOAD_TMP_DIR / f"{self.id}.part"
+
+    def __str__(self):
+        return f"Téléversement {self.id} ({self.recu}/{self.taille})"
+
+
+class StatistiqueDossier(models.Model):
+    """
+    Agrégat journalier des dossiers (jour de dépôt x type x statut),
+    recalculé par jour modifié (voir stats.py / rafraichir_statistiques).
+    """
+    jour = models.DateField()
+    type_subvention = models.CharField(max_length=50, choices=DossierDemande.type)
+    statut = models.CharField(max_length=20, choices=DossierDemande.Statut)
+    nombre = models.PositiveIntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # dossiers ayant reçu un 1er suivi accepte/refuse, et somme des délais (secondes)
+    nombre_decides = models.PositiveIntegerField(default=0)
+    delai_decision_total = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["jour", "type_subvention", "statut"], name="stat_jour_type_statut_uniq"),
+        ]
+
+    def __str__(self):
+        return f"Stats {self.jour} {self.type_subvention} {self.statut}"
+
+
+class JourARecalculer(models.Model):
+    """Jours de dépôt dont les statistiques sont à recalculer."""
+    jour = models.DateField(unique=True)
+
+    def __str__(self):
+        return f"{self.jour}"
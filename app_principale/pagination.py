@@ -0,0 +1,199 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination, _reverse_ordering
+
+
+class BoundedPageNumberPagination(PageNumberPagination):
+    """
+    Pagination numérotée (?page=N) pour l'interface d'administration.
+    Coûte un COUNT(*) par page : à réserver aux écrans qui en ont besoin.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Pagination par curseur sur l'ordre de la vue (`ordering` / ?ordering=),
+    avec l'id en départage pour un ordre total.
+    Le curseur porte la position complète de la dernière ligne (valeur de chaque
+    champ du tri, id compris) : la page suivante est `WHERE (tri) > position`,
+    sans OFFSET même quand plusieurs lignes ont la même date.
+    Pas de COUNT(*) : le coût d'une page ne dépend pas de sa profondeur.
+    Le mode numéroté reste disponible en passant ?page=N.
+    """
+    ordering = ("-id",)
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    page_number_query_param = "page"
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations and not request.query_params.get("ordering"):
+            # recherche plein texte : on pagine dans l'ordre de pertinence
+            return ("-search_rank", "-id")
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            tie_breaker = "-id" if ordering[0].startswith("-") else "id"
+            ordering = ordering + (tie_breaker,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_number_query_param in request.query_params:
+            self.page_number_paginator = BoundedPageNumberPagination()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+        self.page_number_paginator = None
+        tranche = self.preparer_page(queryset, request, view)
+        if tranche is None:
+            return None
+        return self.terminer_page(list(tranche))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Variante async (vues de lecture async), mode curseur uniquement."""
+        self.page_number_paginator = None
+        tranche = self.preparer_page(queryset, request, view)
+        if tranche is None:
+            return None
+        return self.terminer_page([obj async for obj in tranche])
+
+    # CursorPagination.paginate_queryset, découpée autour de l'évaluation du queryset
+    # pour être partagée entre les chemins sync et async.
+    def preparer_page(self, queryset, request, view=None):
+        """Retourne la tranche à évaluer (page + 1 ligne), ou None sans pagination."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+        self._offset, self._reverse, self._current_position = offset, reverse, current_position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        nullables = [champ_nullable(queryset, champ.lstrip("-")) for champ in ordering]
+        queryset = queryset.order_by(*(ordre_sql(champ, nullable) for champ, nullable in zip(ordering, nullables)))
+
+        if current_position is not None:
+            try:
+                valeurs = json.loads(current_position)
+                if not isinstance(valeurs, list) or len(valeurs) != len(ordering):
+                    raise ValueError(current_position)
+                queryset = queryset.filter(apres_position(ordering, valeurs, nullables))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _get_position_from_instance(self, instance, ordering):
+        # position complète (tous les champs du tri), pas seulement le premier
+        valeurs = []
+        for champ in ordering:
+            nom = champ.lstrip("-")
+            valeur = instance[nom] if isinstance(instance, dict) else getattr(instance, nom)
+            valeurs.append(None if valeur is None else str(valeur))
+        return json.dumps(valeurs)
+
+    def terminer_page(self, results):
+        offset, reverse, current_position = self._offset, self._reverse, self._current_position
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_html_context()
+        return super().get_html_context()
+
+
+# ---- Position du curseur ----
+def champ_nullable(queryset, nom):
+    try:
+        return queryset.model._meta.get_field(nom).null
+    except FieldDoesNotExist:
+        # annotation (search_rank)
+        return False
+
+
+def ordre_sql(champ, nullable):
+    """
+    Tri SQL d'un champ ; NULL explicitement en fin de tri croissant et en tête de
+    tri décroissant (ordre par défaut de PostgreSQL, index utilisables), quelle que
+    soit la base, pour que `apres_position` en soit le complément exact.
+    """
+    if not nullable:
+        return champ
+    if champ.startswith("-"):
+        return F(champ[1:]).desc(nulls_first=True)
+    return F(champ).asc(nulls_last=True)
+
+
+def apres_position(ordering, valeurs, nullables):
+    """
+    Lignes strictement après `valeurs` dans l'ordre `ordering` (comparaison
+    lexicographique) : (a > x) OR (a = x AND b > y) OR ...
+    """
+    conditions = []
+    egalite = Q()
+    for champ, valeur, nullable in zip(ordering, valeurs, nullables):
+        nom, decroissant = champ.lstrip("-"), champ.startswith("-")
+        if valeur is None:
+            # NULL est le plus grand en croissant (en fin), le plus petit en décroissant (en tête)
+            suivant = Q(**{f"{nom}__isnull": False}) if decroissant else None
+            egal = Q(**{f"{nom}__isnull": True})
+        else:
+            suivant = Q(**{f"{nom}__lt" if decroissant else f"{nom}__gt": valeur})
+            if nullable and not decroissant:
+                suivant |= Q(**{f"{nom}__isnull": True})
+            egal = Q(**{nom: valeur})
+        if suivant is not None:
+            conditions.append(egalite & suivant)
+        egalite &= egal
+    if not conditions:
+        return Q(pk__in=[])
+    condition = reduce(or_, conditions)
+    champ, valeur = ordering[0], valeurs[0]
+    if valeur is not None and not nullables[0]:
+        # borne sur le 1er champ seul : parcours de l'index par plage
+        condition &= Q(**{champ.lstrip("-") + ("__lte" if champ.startswith("-") else "__gte"): valeur})
+    return condition
@@ -1,3 +1,6 @@
+import ipaddress
+
+from django.conf import settings
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 class IsAdmin(BasePermission):
@@ -12,6 +15,24 @@ class IsDemandeur(BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_authenticated and request.user.role == "demandeur")
 
+class IsAdminOrMetricsClient(BasePermission):
+    """
+    Métriques (/api/metrics/...) : admins, ou collecteur (Prometheus, sans jeton) dont
+    l'adresse est dans METRICS_ALLOWED_IPS (adresses ou réseaux). Seul REMOTE_ADDR
+    est lu : X-Forwarded-For peut être fourni par n'importe quel client.
+    """
+    def has_permission(self, request, view):
+        if adresse_autorisee(request.META.get("REMOTE_ADDR"), getattr(settings, "METRICS_ALLOWED_IPS", ())):
+            return True
+        return IsAdmin().has_permission(request, view)
+
+def adresse_autorisee(adresse, reseaux):
+    try:
+        adresse = ipaddress.ip_address(adresse or "")
+    except ValueError:
+        return False
+    return any(adresse in ipaddress.ip_network(reseau, strict=False) for reseau in reseaux)
+
 class IsOwnerOrReadOnly(BasePermission):
     """
     Pour DossierDemande : le demandeur voit/édite uniquement ses dossiers
@@ -27,3 +48,19 @@ class IsOwnerOrReadOnly(BasePermission):
             obj.utilisateur_id == request.user.id
             or request.user.role in ("agent", "admin")
         )
+
+
+class RoleScopedQuerysetMixin:
+    """
+    Restreint le queryset d'un viewset aux lignes du demandeur connecté
+    (filtre SQL sur `owner_field`, servi par l'index utilisateur).
+    Les agents/admins voient tout.
+    """
+    owner_field = "utilisateur"
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = self.request.user
+        if getattr(user, "role", None) in ("agent", "admin"):
+            return qs
+        return qs.filter(**{self.owner_field: user.pk})
@@ -0,0 +1,208 @@
+"""
+Profilage des requêtes API (opt-in : PROFILAGE_API = True).
+
+Pour chaque requête : nombre de requêtes SQL, temps SQL, temps de sérialisation DRF
+et latence totale, renvoyés dans l'en-tête Server-Timing. Les mesures sont agrégées
+par vue (compteurs cumulés) et les dernières gardées dans un tampon circulaire
+(quantiles, SQL dupliqué : même requête paramétrée exécutée plusieurs fois, signe
+d'un N+1). Exposition : /api/metrics/ (texte Prometheus) et /api/metrics/profil/
+(JSON, admins), lu par la commande profil_api.
+"""
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+TAILLE_TAMPON = 2000
+# au-delà, le texte SQL est tronqué dans les rapports
+LONGUEUR_SQL = 500
+
+_mesure = ContextVar("mesure_profilage", default=None)
+
+
+class Mesure:
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.requetes = 0
+        self.duree_sql = 0.0
+        self.duree_serialisation = 0.0
+        self.profondeur_serialisation = 0
+        self.sql = Counter()
+
+
+# ---- Collecte ----
+def enregistrer_sql(execute, sql, params, many, context):
+    mesure = _mesure.get()
+    if mesure is None:
+        return execute(sql, params, many, context)
+    debut = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        mesure.requetes += 1
+        mesure.duree_sql += time.perf_counter() - debut
+        mesure.sql[sql] += 1
+
+
+def brancher_connexion(connection, **kwargs):
+    if enregistrer_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(enregistrer_sql)
+
+
+def to_representation_mesure(to_representation):
+    # seul l'appel le plus externe est compté (pas les serializers imbriqués)
+    def wrapper(self, instance):
+        mesure = _mesure.get()
+        if mesure is None or mesure.profondeur_serialisation:
+            return to_representation(self, instance)
+        mesure.profondeur_serialisation += 1
+        debut = time.perf_counter()
+        try:
+            return to_representation(self, instance)
+        finally:
+            mesure.duree_serialisation += time.perf_counter() - debut
+            mesure.profondeur_serialisation -= 1
+
+    wrapper.mesure = True
+    return wrapper
+
+
+def installer():
+    """Branche la collecte : connexions SQL (existantes et futures) et serializers DRF."""
+    connection_created.connect(brancher_connexion, dispatch_uid="profilage")
+    for connection in connections.all(initialized_only=True):
+        brancher_connexion(connection)
+    if not getattr(serializers.Serializer.to_representation, "mesure", False):
+        serializers.Serializer.to_representation = to_representation_mesure(
+            serializers.Serializer.to_representation
+        )
+
+
+# ---- Agrégats ----
+class Registre:
+    def __init__(self, taille=TAILLE_TAMPON):
+        self._lock = threading.Lock()
+        self.tampon = deque(maxlen=taille)
+        self.cumuls = defaultdict(lambda: {"requetes_http": 0, "duree": 0.0, "requetes_sql": 0, "duree_sql": 0.0,
+                                           "duree_serialisation": 0.0})
+
+    def ajouter(self, vue, methode, statut, mesure, duree):
+        doublons = [
+            (sql[:LONGUEUR_SQL], n) for sql, n in mesure.sql.most_common() if n > 1
+        ]
+        entree = {
+            "vue": vue, "methode": methode, "statut": statut, "duree": duree,
+            "requetes_sql": mesure.requetes, "duree_sql": mesure.duree_sql,
+            "duree_serialisation": mesure.duree_serialisation, "sql_dupliques": doublons,
+        }
+        with self._lock:
+            self.tampon.append(entree)
+            cumul = self.cumuls[(vue, methode)]
+            cumul["requetes_http"] += 1
+            cumul["duree"] += duree
+            cumul["requetes_sql"] += mesure.requetes
+            cumul["duree_sql"] += mesure.duree_sql
+            cumul["duree_serialisation"] += mesure.duree_serialisation
+
+    def instantane(self):
+        with self._lock:
+            return list(self.tampon), {cle: dict(valeur) for cle, valeur in self.cumuls.items()}
+
+    def vider(self):
+        with self._lock:
+            self.tampon.clear()
+            self.cumuls.clear()
+
+
+registre = Registre()
+
+
+def quantile(valeurs, q):
+    valeurs = sorted(valeurs)
+    return valeurs[min(int(q * len(valeurs)), len(valeurs) - 1)] if valeurs else 0.0
+
+
+def resume():
+    """Par vue, sur le tampon : latences p50/p95/max, requêtes SQL moyennes, SQL dupliqué."""
+    tampon, cumuls = registre.instantane()
+    par_vue = defaultdict(list)
+    for entree in tampon:
+        par_vue[(entree["vue"], entree["methode"])].append(entree)
+    vues = []
+    for (vue, methode), entrees in par_vue.items():
+        durees = [e["duree"] for e in entrees]
+        doublons = Counter()
+        for e in entrees:
+            for sql, n in e["sql_dupliques"]:
+                doublons[sql] = max(doublons[sql], n)
+        vues.append({
+            "vue": vue, "methode": methode, "echantillons": len(entrees),
+            "p50_ms": quantile(durees, 0.5) * 1000, "p95_ms": quantile(durees, 0.95) * 1000,
+            "max_ms": max(durees) * 1000,
+            "requetes_sql_moy": sum(e["requetes_sql"] for e in entrees) / len(entrees),
+            "sql_ms_moy": sum(e["duree_sql"] for e in entrees) / len(entrees) * 1000,
+            "serialisation_ms_moy": sum(e["duree_serialisation"] for e in entrees) / len(entrees) * 1000,
+            "sql_dupliques": [{"sql": sql, "max_par_requete": n} for sql, n in doublons.most_common(10)],
+        })
+    return {
+        "vues": sorted(vues, key=lambda v: v["p95_ms"], reverse=True),
+        "cumuls": [{"vue": vue, "methode": methode, **c} for (vue, methode), c in sorted(cumuls.items())],
+    }
+
+
+# ---- Middleware ----
+class ProfilageMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILAGE_API", False):
+            raise MiddlewareNotUsed
+        installer()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mesure, token = self.commencer()
+        try:
+            response = self.get_response(request)
+        finally:
+            _mesure.reset(token)
+        return self.terminer(request, response, mesure)
+
+    async def __acall__(self, request):
+        mesure, token = self.commencer()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _mesure.reset(token)
+        return self.terminer(request, response, mesure)
+
+    def commencer(self):
+        # connexions du thread courant ouvertes avant l'installation
+        for connection in connections.all(initialized_only=True):
+            brancher_connexion(connection)
+        mesure = Mesure()
+        return mesure, _mesure.set(mesure)
+
+    def terminer(self, request, response, mesure):
+        duree = time.perf_counter() - mesure.debut
+        match = getattr(request, "resolver_match", None)
+        vue = match.view_name if match is not None and match.view_name else "non_resolue"
+        registre.ajouter(vue, request.method, response.status_code, mesure, duree)
+        response["Server-Timing"] = (
+            f'db;dur={mesure.duree_sql * 1000:.1f};desc="{mesure.requetes} requetes", '
+            f"ser;dur={mesure.duree_serialisation * 1000:.1f}, "
+            f"total;dur={duree * 1000:.1f}"
+        )
+        return response
@@ -0,0 +1,172 @@
+"""
+Diffusion en temps réel des événements d'un utilisateur (notifications in-app,
+changements de statut de ses dossiers) vers le flux SSE /api/evenements/.
+
+Les événements sont publiés après commit via le backend PUSH_BACKEND :
+- MemoireBackend : distribution dans le processus courant (un seul worker ASGI) ;
+- PostgresBackend : NOTIFY sur le canal CANAL ; chaque processus écoute (LISTEN)
+  dans un thread et distribue aux abonnés locaux.
+Pas de rejeu : à la (re)connexion, le client relit la liste des notifications.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CANAL = "asdm_evenements"
+# limite de la charge d'un NOTIFY (octets)
+TAILLE_MAX_NOTIFY = 8000
+# événements en attente par abonné ; au-delà, les plus récents sont perdus
+TAILLE_FILE = 100
+
+
+# ---- Abonnés locaux ----
+class Abonnements:
+    """Files asyncio des flux ouverts dans ce processus, par utilisateur."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}
+
+    def abonner(self, user_id):
+        file = asyncio.Queue(maxsize=TAILLE_FILE)
+        with self._lock:
+            self._files.setdefault(user_id, {})[file] = asyncio.get_running_loop()
+        return file
+
+    def desabonner(self, user_id, file):
+        with self._lock:
+            files = self._files.get(user_id, {})
+            files.pop(file, None)
+            if not files:
+                self._files.pop(user_id, None)
+
+    def distribuer(self, user_id, evenement):
+        # appelé depuis n'importe quel thread : on passe par la boucle de chaque abonné
+        with self._lock:
+            files = list(self._files.get(user_id, {}).items())
+        for file, loop in files:
+            try:
+                loop.call_soon_threadsafe(ajouter, file, evenement)
+            except RuntimeError:
+                # boucle fermée
+                pass
+
+
+def ajouter(file, evenement):
+    try:
+        file.put_nowait(evenement)
+    except asyncio.QueueFull:
+        pass
+
+
+abonnements = Abonnements()
+
+
+# ---- Backends ----
+class MemoireBackend:
+    def publier(self, evenements):
+        for user_id, evenement in evenements:
+            abonnements.distribuer(user_id, evenement)
+
+    def demarrer(self):
+        pass
+
+
+class PostgresBackend:
+    """Fan-out entre processus par LISTEN/NOTIFY (psycopg2)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def publier(self, evenements):
+        charges = []
+        for u, e in evenements:
+            charge = json.dumps({"u": u, "e": e}, default=str)
+            if len(charge.encode()) >= TAILLE_MAX_NOTIFY:
+                # refusée par PostgreSQL avec tout le lot : seul cet événement est perdu
+                logger.warning("Événement %s trop volumineux pour NOTIFY, non diffusé.", e.get("type"))
+                continue
+            charges.append(charge)
+        if not charges:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, x) FROM unnest(%s::text[]) AS x", [CANAL, charges])
+
+    def demarrer(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.ecouter, name="push-listen", daemon=True)
+                self._thread.start()
+
+    def ecouter(self):
+        while True:
+            try:
+                self.boucle()
+            except Exception:
+                logger.exception("Écoute %s interrompue, reconnexion.", CANAL)
+                threading.Event().wait(5)
+
+    def boucle(self):
+        wrapper = connections.create_connection("default")
+        wrapper.ensure_connection()
+        try:
+            conn = wrapper.connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CANAL}")
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    charge = json.loads(conn.notifies.pop(0).payload)
+                    abonnements.distribuer(charge["u"], charge["e"])
+        finally:
+            wrapper.close()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.PUSH_BACKEND)()
+    return _backend
+
+
+# ---- Publication ----
+def publier(evenements):
+    """Publie [(user_id, evenement), ...] au commit de la transaction en cours."""
+    evenements = list(evenements)
+    if evenements:
+        transaction.on_commit(lambda: diffuser(evenements))
+
+
+def diffuser(evenements):
+    # après commit : une erreur de diffusion ne doit pas transformer une écriture
+    # enregistrée en erreur 500 (le client relit ses notifications à la reconnexion)
+    try:
+        get_backend().publier(evenements)
+    except Exception:
+        logger.exception("Diffusion de %d événement(s) impossible.", len(evenements))
+
+
+def evenement_notification(notification):
+    return {
+        "type": "notification", "id": notification.id, "message": notification.message,
+        "dossier_id": notification.dossier_id, "date_envoi": notification.date_envoi.isoformat(),
+    }
+
+
+def evenement_statut(dossier_id, statut):
+    return {"type": "statut", "dossier_id": dossier_id, "statut": statut}
@@ -0,0 +1,66 @@
+"""
+Lectures sur la réplique pour les requêtes GET/HEAD.
+
+Le middleware marque la requête en cours (contextvar, compatible ASGI) ; le routeur
+n'envoie les lectures vers l'alias "replica" que dans ce cas. Les écritures, et les
+lectures des requêtes qui écrivent, restent sur la base principale.
+
+Les lectures de sécurité restent aussi sur la base principale : utilisateurs (jetons
+révoqués par token_version, comptes désactivés, remplissage du cache des profils et
+des versions de jetons), sessions et permissions. Une réplique en retard rendrait
+sinon valide un jeton révoqué, et le remettrait en cache.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REPLICA = "replica"
+APPS_PRINCIPALE = ("auth", "sessions")
+_lecture_replica = ContextVar("lecture_replica", default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _lecture_replica.get() or REPLICA not in settings.DATABASES:
+            return None
+        if model._meta.app_label in APPS_PRINCIPALE or model._meta.label == settings.AUTH_USER_MODEL:
+            return "default"
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaMiddleware:
+    # sync et async : sous ASGI, un middleware uniquement sync ferait repasser
+    # les vues async par un thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _lecture_replica.set(request.method in ("GET", "HEAD"))
+        try:
+            return self.get_response(request)
+        finally:
+            _lecture_replica.reset(token)
+
+    async def __acall__(self, request):
+        token = _lecture_replica.set(request.method in ("GET", "HEAD"))
+        try:
+            return await self.get_response(request)
+        finally:
+            _lecture_replica.reset(token)
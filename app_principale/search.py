@@ -0,0 +1,81 @@
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Configuration plein texte utilisée par les triggers (migration 0003)
+SEARCH_CONFIG = "french"
+# Expression indexée en trigrammes sur CustomUser (migration 0003)
+USER_TRIGRAM_EXPR = "({table}.username || ' ' || {table}.email || ' ' || {table}.first_name || ' ' || {table}.last_name)"
+USER_TRIGRAM_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def is_postgresql(queryset):
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Recherche plein texte PostgreSQL sur la colonne `search_vector`
+    (tsvector entretenu par trigger + index GIN), résultats classés par pertinence
+    sauf si ?ordering= est fourni.
+    Hors PostgreSQL (SQLite en local) : repli sur le SearchFilter de DRF (LIKE).
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = " ".join(self.get_search_terms(request))
+        if not terms or not is_postgresql(queryset):
+            return super().filter_queryset(request, queryset, view)
+
+        vector = '"%s"."search_vector"' % queryset.model._meta.db_table
+        query = "websearch_to_tsquery(%s::regconfig, %s)"
+        params = (SEARCH_CONFIG, terms)
+        queryset = queryset.filter(
+            RawSQL(f"{vector} @@ {query}", params, output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"ts_rank({vector}, {query})::float8", params, output_field=FloatField())
+        )
+        if not request.query_params.get("ordering"):
+            queryset = queryset.order_by("-search_rank", "-id")
+        return queryset
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    Recherche approximative des utilisateurs (pg_trgm), mêmes règles que le SearchFilter
+    de DRF : chaque mot doit correspondre à l'un des `search_fields`. Pour les champs de
+    l'expression indexée (USER_TRIGRAM_FIELDS), sous-chaîne ou mot proche ; pour les
+    autres (téléphone, rôle), sous-chaîne. Résultats classés par word_similarity.
+    Repli LIKE hors PostgreSQL.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        search_fields = self.get_search_fields(view, request)
+        if not terms or not search_fields or not is_postgresql(queryset):
+            return super().filter_queryset(request, queryset, view)
+
+        expr = USER_TRIGRAM_EXPR.format(table='"%s"' % queryset.model._meta.db_table)
+        autres = [
+            self.construct_search(str(champ), queryset)
+            for champ in search_fields if champ not in USER_TRIGRAM_FIELDS
+        ]
+        conditions = []
+        for term in terms:
+            trigramme = RawSQL(
+                f"({expr} ILIKE %s OR %s <%% {expr})",
+                ("%" + escape_like(term) + "%", term),
+                output_field=BooleanField(),
+            )
+            conditions.append(reduce(or_, [Q(trigramme), *(Q(**{lookup: term}) for lookup in autres)]))
+        queryset = queryset.filter(*conditions).annotate(
+            search_rank=RawSQL(f"word_similarity(%s, {expr})::float8", (" ".join(terms),), output_field=FloatField())
+        )
+        if not request.query_params.get("ordering"):
+            queryset = queryset.order_by("-search_rank", "-id")
+        return queryset
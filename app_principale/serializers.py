@@ -1,6 +1,28 @@
+from django.core.validators import EMPTY_VALUES
 from rest_framework import serializers
-from .models import CustomUser, DossierDemande, SuiviDossier, Notification
+from .filters import DossierDemandeFilter
+from .models import CustomUser, DossierDemande, SuiviDossier, Notification, PieceJointe, Televersement
 from django.contrib.auth.password_validation import validate_password
+from django.urls import reverse
+
+class ProtectedFileField(serializers.FileField):
+    """
+    Fichier servi par une action protégée (droits du dossier) plutôt que par MEDIA_URL.
+    `url_kwargs(fichier)` donne les paramètres de l'URL `view_name`.
+    """
+    def __init__(self, view_name, url_kwargs, **kwargs):
+        self.view_name = view_name
+        self.url_kwargs = url_kwargs
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = reverse(self.view_name, kwargs=self.url_kwargs(value.instance))
+        request = self.context.get("request", None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -22,10 +44,14 @@ class UserPublicSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 class DossierDemandeSerializer(serializers.ModelSerializer):
+    # utilisateur lu dans la jointure (select_related) : pas d'aller-retour au cache par ligne
     utilisateur = UserPublicSerializer(read_only=True)
     utilisateur_id = serializers.PrimaryKeyRelatedField(
         queryset=CustomUser.objects.all(), write_only=True, source='utilisateur'
     )
+    fichiers = ProtectedFileField(
+        "dossiers-fichier", lambda dossier: {"pk": dossier.pk}, required=False, allow_null=True
+    )
     class Meta:
         model = DossierDemande
         fields = (
@@ -39,6 +65,45 @@ class DossierDemandeUpdateStatutSerializer(serializers.ModelSerializer):
         model = DossierDemande
         fields = ("statut",)
 
+class DossierBulkStatutSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
+    filtre = serializers.DictField(required=False)
+    statut = serializers.ChoiceField(choices=DossierDemande.Statut)
+    commentaire = serializers.CharField(required=False, allow_blank=True, default="")
+    dry_run = serializers.BooleanField(default=False)
+    batch_size = serializers.IntegerField(default=1000, min_value=1, max_value=10000)
+
+    def validate_filtre(self, filtre):
+        # un filtre vide, ou dont les clés sont ignorées par le FilterSet, viserait toute la table
+        filterset = DossierDemandeFilter(data=filtre, queryset=DossierDemande.objects.none())
+        cles = cles_filterset(filterset)
+        inconnues = sorted(set(filtre) - cles)
+        if inconnues:
+            raise serializers.ValidationError(
+                f"Clé(s) inconnue(s) : {', '.join(inconnues)}. Clés possibles : {', '.join(sorted(cles))}."
+            )
+        if not filterset.is_bound or not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        if all(valeur in EMPTY_VALUES for valeur in filterset.form.cleaned_data.values()):
+            raise serializers.ValidationError("Filtre vide : au moins un critère est requis.")
+        return filtre
+
+    def validate(self, data):
+        if ("ids" in data) == ("filtre" in data):
+            raise serializers.ValidationError("Fournir soit 'ids', soit 'filtre'.")
+        return data
+
+def cles_filterset(filterset):
+    """Paramètres acceptés par un FilterSet (ex. date_depot_after / date_depot_before pour un intervalle)."""
+    cles = set()
+    for nom, champ in filterset.form.fields.items():
+        suffixes = getattr(champ.widget, "suffixes", None)
+        if suffixes:
+            cles.update(f"{nom}_{suffixe}" if suffixe else nom for suffixe in suffixes)
+        else:
+            cles.add(nom)
+    return cles
+
 class SuiviDossierSerializer(serializers.ModelSerializer):
     dossier_id = serializers.PrimaryKeyRelatedField(
         queryset=DossierDemande.objects.all(), write_only=True, source="dossier"
@@ -53,7 +118,54 @@ class NotificationSerializer(serializers.ModelSerializer):
     utilisateur_id = serializers.PrimaryKeyRelatedField(
         queryset=CustomUser.objects.all(), write_only=True, source='utilisateur'
     )
+    dossier_id = serializers.PrimaryKeyRelatedField(
+        queryset=DossierDemande.objects.all(), source="dossier", required=False, allow_null=True
+    )
     class Meta:
         model = Notification
-        fields = ("id", "utilisateur", "utilisateur_id", "message", "type", "statut", "date_envoi")
-        read_only_fields = ("id", "utilisateur", "date_envoi")
+        fields = (
+            "id", "utilisateur", "utilisateur_id", "dossier_id", "message", "type", "statut", "date_envoi",
+            "etat_envoi",
+        )
+        read_only_fields = ("id", "utilisateur", "date_envoi", "etat_envoi")
+
+class NotificationMarquerLuesSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
+    avant = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if ("ids" in data) == ("avant" in data):
+            raise serializers.ValidationError("Fournir soit 'ids', soit 'avant'.")
+        return data
+
+class DossierTimelineSerializer(serializers.Serializer):
+    dossier = DossierDemandeSerializer(source="*")
+    suivis = SuiviDossierSerializer(source="historique", many=True)
+    notifications = NotificationSerializer(source="notifications_liees", many=True)
+
+class PieceJointeSerializer(serializers.ModelSerializer):
+    fichier = ProtectedFileField(
+        "dossiers-piece-jointe", lambda piece: {"pk": piece.dossier_id, "piece_id": piece.pk}, read_only=True
+    )
+    apercus = serializers.SerializerMethodField()
+    class Meta:
+        model = PieceJointe
+        fields = ("id", "dossier_id", "nom", "taille", "sha256", "fichier", "date_ajout", "etat_apercus", "apercus")
+        read_only_fields = fields
+
+    def get_apercus(self, piece):
+        request = self.context.get("request")
+        apercus = {}
+        for taille in piece.apercus:
+            url = reverse(
+                "dossiers-piece-jointe-apercu",
+                kwargs={"pk": piece.dossier_id, "piece_id": piece.pk, "taille": taille},
+            )
+            apercus[taille] = request.build_absolute_uri(url) if request is not None else url
+        return apercus
+
+class TeleversementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Televersement
+        fields = ("id", "dossier_id", "nom", "taille", "recu", "date_creation")
+        read_only_fields = ("id", "dossier_id", "recu", "date_creation")
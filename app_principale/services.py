@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DossierDemande, SuiviDossier, Notification, CompteurNotifications
+from .push import evenement_notification, evenement_statut, publier
+from .stats import marquer_jours
+
+
+def message_changement_statut(dossier_id, statut):
+    libelle = dict(DossierDemande.Statut)[statut]
+    return f"Le statut de votre dossier {dossier_id} est passé à « {libelle} »."
+
+
+def changer_statut_en_masse(queryset, statut, commentaire="", dry_run=False, batch_size=1000):
+    """
+    Passe les dossiers du queryset au `statut` donné :
+    un UPDATE par lot, historique (SuiviDossier) et notifications in-app en bulk_create.
+    Retourne {id: (ancien_statut, resultat)} avec resultat "modifie" ou "inchange".
+    """
+    resultats = {}
+    with transaction.atomic():
+        if not dry_run:
+            queryset = queryset.select_for_update()
+        lignes = list(queryset.order_by("id").values_list("id", "statut", "utilisateur_id", "date_depot"))
+
+        a_modifier = []
+        jours = []
+        for dossier_id, ancien_statut, utilisateur_id, date_depot in lignes:
+            if ancien_statut == statut:
+                resultats[dossier_id] = (ancien_statut, "inchange")
+            else:
+                resultats[dossier_id] = (ancien_statut, "modifie")
+                a_modifier.append((dossier_id, utilisateur_id))
+                jours.append(date_depot)
+        if dry_run:
+            return resultats
+
+        # UPDATE et bulk_create ne déclenchent pas les signaux
+        marquer_jours(jours)
+
+        for debut in range(0, len(a_modifier), batch_size):
+            lot = a_modifier[debut:debut + batch_size]
+            DossierDemande.objects.filter(pk__in=[d for d, _ in lot]).update(
+                statut=statut, updated_at=timezone.now()
+            )
+            SuiviDossier.objects.bulk_create(
+                [SuiviDossier(dossier_id=d, statut=statut, commentaire=commentaire) for d, _ in lot],
+                batch_size=batch_size,
+            )
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        utilisateur_id=u, dossier_id=d, type="in_app",
+                        message=message_changement_statut(d, statut),
+                    )
+                    for d, u in lot
+                ],
+                batch_size=batch_size,
+            )
+            # bulk_create ne déclenche pas post_save : publication explicite
+            publier([(u, evenement_statut(d, statut)) for d, u in lot])
+            publier([(n.utilisateur_id, evenement_notification(n)) for n in notifications])
+    return resultats
+
+
+# ---- Notifications lues ----
+def nombre_non_lues(user_id):
+    """Lecture du compteur tenu par triggers : coût constant quel que soit le volume."""
+    return CompteurNotifications.objects.filter(pk=user_id).values_list("non_lues", flat=True).first() or 0
+
+
+async def anombre_non_lues(user_id):
+    return await CompteurNotifications.objects.filter(pk=user_id).values_list("non_lues", flat=True).afirst() or 0
+
+
+def marquer_lues(user_id, ids=None, avant=None):
+    """
+    Marque comme lues, en un seul UPDATE, les notifications non lues de l'utilisateur
+    d'une liste d'ids ou envoyées jusqu'à `avant`. Retourne le nombre de lignes modifiées.
+    """
+    queryset = Notification.objects.filter(utilisateur_id=user_id, statut=False)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    if avant is not None:
+        queryset = queryset.filter(date_envoi__lte=avant)
+    return queryset.update(statut=True, updated_at=timezone.now())
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalider_user
+from .models import CustomUser, DossierDemande, SuiviDossier, Notification
+from .push import evenement_notification, publier
+from .stats import marquer_jours
+
+
+# claims portés par les jetons JWT (voir authentication.py)
+CHAMPS_CLAIMS = ("role", "email", "is_active")
+# un changement de mot de passe révoque aussi les jetons
+CHAMPS_REVOCATION = (*CHAMPS_CLAIMS, "password")
+
+
+def mot_de_passe_change(instance):
+    # set_password garde le mot de passe en clair jusqu'à l'enregistrement ; la mise à
+    # niveau du hachage à la connexion (check_password) l'efface avant save(update_fields=
+    # ["password"]) : même mot de passe, les jetons restent valides
+    return instance._password is not None or not instance.has_usable_password()
+
+
+@receiver(pre_save, sender=CustomUser)
+def revoquer_si_claims_changent(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None:
+        return
+    champs = [c for c in CHAMPS_REVOCATION if update_fields is None or c in update_fields]
+    if not champs:
+        return
+    avant = CustomUser.objects.filter(pk=instance.pk).values(*champs).first()
+    if avant is None:
+        return
+    changes = {champ for champ in champs if avant[champ] != getattr(instance, champ)}
+    if "password" in changes and not mot_de_passe_change(instance):
+        changes.discard("password")
+    if changes:
+        instance.token_version += 1
+        if update_fields is not None and "token_version" not in update_fields:
+            CustomUser.objects.filter(pk=instance.pk).update(token_version=instance.token_version)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalider_cache_user(sender, instance, **kwargs):
+    invalider_user(instance.pk)
+
+
+# ---- Statistiques : jours de dépôt à recalculer ----
+@receiver([post_save, post_delete], sender=DossierDemande)
+def marquer_jour_dossier(sender, instance, **kwargs):
+    marquer_jours([instance.date_depot])
+
+
+@receiver([post_save, post_delete], sender=SuiviDossier)
+def marquer_jour_suivi(sender, instance, **kwargs):
+    marquer_jours(DossierDemande.objects.filter(pk=instance.dossier_id).values_list("date_depot", flat=True))
+
+
+# ---- Temps réel ----
+@receiver(post_save, sender=Notification)
+def pousser_notification(sender, instance, created, **kwargs):
+    if created and instance.type == "in_app":
+        publier([(instance.utilisateur_id, evenement_notification(instance))])
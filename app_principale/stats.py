@@ -0,0 +1,157 @@
+"""
+Statistiques des dossiers pour le tableau de bord.
+
+Les jours passés sont lus dans la table d'agrégats StatistiqueDossier
+(quelques lignes par jour), le jour courant est calculé en direct : le temps
+de réponse ne dépend pas de la taille des tables.
+Un changement de dossier ou de suivi marque le jour de dépôt du dossier
+comme "à recalculer" ; la commande rafraichir_statistiques ne retraite que ces jours.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import DossierDemande, SuiviDossierHistorique, StatistiqueDossier, JourARecalculer
+
+STATUTS_DECISION = ("accepte", "refuse")
+
+
+def bornes_jour(jour):
+    debut = timezone.make_aware(datetime.combine(jour, time.min))
+    return debut, debut + timedelta(days=1)
+
+
+def marquer_jours(dates_depot):
+    jours = {timezone.localdate(d) for d in dates_depot if d is not None}
+    JourARecalculer.objects.bulk_create(
+        [JourARecalculer(jour=jour) for jour in jours], ignore_conflicts=True
+    )
+
+
+def calculer_jour(jour):
+    """Agrégats d'un jour de dépôt, calculés en direct (non enregistrés)."""
+    debut, fin = bornes_jour(jour)
+    # suivis archivés compris : l'archivage ne change pas les délais de décision
+    premiere_decision = (
+        SuiviDossierHistorique.objects.filter(dossier=OuterRef("pk"), statut__in=STATUTS_DECISION)
+        .order_by().values("dossier").annotate(d=Min("date_update")).values("d")
+    )
+    lignes = (
+        DossierDemande.objects.filter(date_depot__gte=debut, date_depot__lt=fin)
+        .annotate(premiere_decision=Subquery(premiere_decision))
+        .values_list("type_subvention", "statut", "montant_demande", "date_depot", "premiere_decision")
+    )
+    groupes = {}
+    for type_subvention, statut, montant, date_depot, decision in lignes:
+        stat = groupes.get((type_subvention, statut))
+        if stat is None:
+            stat = groupes[(type_subvention, statut)] = StatistiqueDossier(
+                jour=jour, type_subvention=type_subvention, statut=statut, montant_total=Decimal("0")
+            )
+        stat.nombre += 1
+        stat.montant_total += montant
+        if decision is not None:
+            stat.nombre_decides += 1
+            stat.delai_decision_total += (decision - date_depot).total_seconds()
+    return list(groupes.values())
+
+
+def enregistrer_jour(jour):
+    StatistiqueDossier.objects.filter(jour=jour).delete()
+    StatistiqueDossier.objects.bulk_create(calculer_jour(jour))
+
+
+# Le marqueur est supprimé avant le calcul, dans la même transaction : une écriture
+# concurrente recrée son marqueur (l'insertion attend la fin de la transaction),
+# le jour sera recalculé au prochain passage au lieu de rester périmé.
+def rafraichir_jours(jours):
+    for jour in sorted(set(jours)):
+        with transaction.atomic():
+            JourARecalculer.objects.filter(jour=jour).delete()
+            enregistrer_jour(jour)
+
+
+def rafraichir_jours_marques():
+    """
+    Recalcule les jours marqués (hors jour courant, servi en direct), un par transaction.
+    Seuls les jours marqués au départ sont traités ; chaque marqueur est réclamé
+    (FOR UPDATE SKIP LOCKED) : plusieurs commandes peuvent tourner en même temps.
+    Retourne le nombre de jours recalculés.
+    """
+    jours = list(
+        JourARecalculer.objects.filter(jour__lt=timezone.localdate())
+        .order_by("jour").values_list("jour", flat=True)
+    )
+    n = 0
+    for jour in jours:
+        with transaction.atomic():
+            marqueur = JourARecalculer.objects.select_for_update(skip_locked=True).filter(jour=jour).first()
+            if marqueur is None:
+                # déjà réclamé par une autre commande
+                continue
+            marqueur.delete()
+            enregistrer_jour(jour)
+        n += 1
+    return n
+
+
+def statistiques(depuis=None):
+    """
+    Nombre et montant total par mois x type x statut, et délai moyen (jours)
+    entre le dépôt et la 1re décision.
+    """
+    aujourdhui = timezone.localdate()
+    agregats = StatistiqueDossier.objects.filter(jour__lt=aujourdhui)
+    if depuis is not None:
+        agregats = agregats.filter(jour__gte=depuis)
+    agregats = (
+        agregats.annotate(mois=TruncMonth("jour"))
+        .values("mois", "type_subvention", "statut")
+        .annotate(
+            nombre=Sum("nombre"), montant_total=Sum("montant_total"),
+            nombre_decides=Sum("nombre_decides"), delai_decision_total=Sum("delai_decision_total"),
+        )
+    )
+    groupes = defaultdict(lambda: {"nombre": 0, "montant_total": Decimal("0"), "nombre_decides": 0, "delai": 0.0})
+
+    def ajouter(mois, type_subvention, statut, nombre, montant, decides, delai):
+        g = groupes[(mois, type_subvention, statut)]
+        g["nombre"] += nombre
+        g["montant_total"] += montant
+        g["nombre_decides"] += decides
+        g["delai"] += delai
+
+    for a in agregats:
+        ajouter(
+            a["mois"].strftime("%Y-%m"), a["type_subvention"], a["statut"],
+            a["nombre"], a["montant_total"], a["nombre_decides"], a["delai_decision_total"],
+        )
+    if depuis is None or depuis <= aujourdhui:
+        for s in calculer_jour(aujourdhui):
+            ajouter(
+                aujourdhui.strftime("%Y-%m"), s.type_subvention, s.statut,
+                s.nombre, s.montant_total, s.nombre_decides, s.delai_decision_total,
+            )
+
+    def delai_moyen(decides, delai):
+        return round(delai / decides / 86400, 2) if decides else None
+
+    resultats = [
+        {
+            "mois": mois, "type_subvention": type_subvention, "statut": statut,
+            "nombre": g["nombre"], "montant_total": g["montant_total"],
+            "delai_moyen_decision_jours": delai_moyen(g["nombre_decides"], g["delai"]),
+        }
+        for (mois, type_subvention, statut), g in sorted(groupes.items())
+    ]
+    total_decides = sum(g["nombre_decides"] for g in groupes.values())
+    total_delai = sum(g["delai"] for g in groupes.values())
+    return {
+        "par_mois": resultats,
+        "delai_moyen_decision_jours": delai_moyen(total_decides, total_delai),
+    }
@@ -1,3 +1,1549 @@
-from django.test import TestCase
+import hashlib
+import json
+import io
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .apercus import nouveau_pool, traiter_lot as traiter_lot_apercus
+from .dispatch import traiter_lot
+from .services import nombre_non_lues
+from .models import (
+    CustomUser, DossierDemande, SuiviDossier, Notification, JourARecalculer, PieceJointe, Televersement,
+    NotificationArchive, SuiviDossierArchive,
+)
+from .stats import calculer_jour, rafraichir_jours, rafraichir_jours_marques
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        DossierDemande.objects.bulk_create([
+            DossierDemande(utilisateur=cls.agent, type_subvention="formation", montant_demande="1.00",
+                           description_projet="p")
+            for _ in range(7)
+        ])
+        # même date de dépôt pour toutes les lignes : seul l'id départage
+        cls.date = timezone.now() - timedelta(days=1)
+        DossierDemande.objects.update(date_depot=cls.date)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def parcourir(self, url, lien="next"):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [d["id"] for d in response.data["results"]]
+            url = response.data[lien]
+        return ids
+
+    def test_curseur_stable_sur_dates_egales(self):
+        attendus = list(DossierDemande.objects.order_by("-date_depot", "-id").values_list("id", flat=True))
+        response = self.client.get("/api/dossiers/?page_size=3")
+        ids = [d["id"] for d in response.data["results"]]
+        # une ligne insérée à la même date entre deux pages n'est ni répétée ni décalée
+        nouveau = DossierDemande.objects.create(
+            utilisateur=self.agent, type_subvention="formation", montant_demande="1.00", description_projet="p"
+        )
+        DossierDemande.objects.filter(pk=nouveau.pk).update(date_depot=self.date)
+        with CaptureQueriesContext(connection) as ctx:
+            ids += self.parcourir(response.data["next"])
+        self.assertEqual(ids, attendus)
+        self.assertFalse(any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+
+    def test_lien_precedent(self):
+        premiere = self.client.get("/api/dossiers/?page_size=3").data
+        seconde = self.client.get(premiere["next"]).data
+        retour = self.client.get(seconde["previous"]).data
+        self.assertEqual([d["id"] for d in retour["results"]], [d["id"] for d in premiere["results"]])
+
+    def test_tri_sur_champ_nullable(self):
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f"u{i}@asdm.test", username=f"u{i}", role="demandeur",
+                       last_login=None if i % 2 else timezone.now() - timedelta(days=i % 3))
+            for i in range(9)
+        ])
+        admin = CustomUser.objects.create_user(email="admin@asdm.test", username="admin", password="x", role="admin")
+        self.client.force_authenticate(admin)
+        for ordering in ("last_login", "-last_login"):
+            ids = self.parcourir(f"/api/users/?ordering={ordering}&page_size=2")
+            self.assertEqual(sorted(ids), sorted(CustomUser.objects.values_list("id", flat=True)), ordering)
+            self.assertEqual(len(ids), len(set(ids)), ordering)
+
+    def test_curseur_invalide(self):
+        self.assertEqual(self.client.get("/api/dossiers/?cursor=cD1bMV0%3D").status_code, 404)
+
+    def test_mode_numerote(self):
+        response = self.client.get("/api/dossiers/?page=2&page_size=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIn("page=3", response.data["next"])
+
+    def test_taille_de_page_plafonnee(self):
+        DossierDemande.objects.bulk_create([
+            DossierDemande(utilisateur=self.agent, type_subvention="formation", montant_demande="1.00",
+                           description_projet="p")
+            for _ in range(200)
+        ])
+        self.assertEqual(len(self.client.get("/api/dossiers/?page_size=500").data["results"]), 200)
+        self.assertEqual(len(self.client.get("/api/dossiers/?page=1&page_size=500").data["results"]), 200)
+
+
+class ExplainRequetesTests(TestCase):
+    def test_index_attendus_dans_les_plans(self):
+        sortie = io.StringIO()
+        call_command("explain_requetes", stdout=sortie)
+        sortie = sortie.getvalue()
+        for libelle in ("dossiers ?statut=en_attente", "notifications ?utilisateur=&statut=false", "users"):
+            self.assertIn(libelle, sortie)
+        self.assertEqual(sortie.count("-> index utilisé"), 6)
+        self.assertNotIn("aucun index attendu", sortie)
+
+
+class RechercheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            email="admin@asdm.test", username="admin", password=None, role="admin"
+        )
+        cls.awa = CustomUser.objects.create_user(
+            email="awa@asdm.test", username="awa", password=None, first_name="Awa", last_name="Diallo",
+            phone="+221770001122",
+        )
+        cls.homonyme = CustomUser.objects.create_user(
+            email="awa.t@asdm.test", username="awat", password=None, first_name="Awa", last_name="Traoré",
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="moussa@asdm.test", username="moussa", password=None, role="agent"
+        )
+        for description in ("Formation en couture", "Atelier de couture", "Formation en menuiserie"):
+            DossierDemande.objects.create(
+                utilisateur=cls.awa, type_subvention="formation", montant_demande="10.00",
+                description_projet=description,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def chercher(self, url, terme):
+        response = self.client.get(url, {"search": terme})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_utilisateurs_tous_les_champs(self):
+        self.assertEqual([u["id"] for u in self.chercher("/api/users/", "770001122")], [self.awa.id])
+        self.assertEqual([u["id"] for u in self.chercher("/api/users/", "agent")], [self.agent.id])
+        self.assertEqual([u["id"] for u in self.chercher("/api/users/", "diallo")], [self.awa.id])
+
+    def test_utilisateurs_chaque_mot_doit_correspondre(self):
+        self.assertEqual({u["id"] for u in self.chercher("/api/users/", "awa")}, {self.awa.id, self.homonyme.id})
+        self.assertEqual([u["id"] for u in self.chercher("/api/users/", "Awa Diallo")], [self.awa.id])
+        # mots répartis sur deux champs (prénom, rôle)
+        self.assertEqual([u["id"] for u in self.chercher("/api/users/", "awa demandeur diallo")], [self.awa.id])
+        self.assertEqual(self.chercher("/api/users/", "awa agent"), [])
+
+    def test_dossiers(self):
+        self.assertEqual(len(self.chercher("/api/dossiers/", "couture")), 2)
+        self.assertEqual(
+            [d["description_projet"] for d in self.chercher("/api/dossiers/", "formation couture")],
+            ["Formation en couture"],
+        )
+
+
+class DossierTimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        cls.dossier = DossierDemande.objects.create(
+            utilisateur=cls.demandeur, type_subvention="formation",
+            montant_demande="1500.00", description_projet="Formation en couture",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.demandeur)
+
+    def ajouter_historique(self, n):
+        for i in range(n):
+            SuiviDossier.objects.create(dossier=self.dossier, commentaire=f"suivi {i}", statut="en_etude")
+            Notification.objects.create(
+                utilisateur=self.demandeur, dossier=self.dossier, message=f"notif {i}", type="in_app"
+            )
+
+    def test_timeline_contenu(self):
+        self.ajouter_historique(2)
+        Notification.objects.create(utilisateur=self.demandeur, message="autre", type="email")
+        response = self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["dossier"]["id"], self.dossier.id)
+        self.assertEqual([s["commentaire"] for s in response.data["suivis"]], ["suivi 0", "suivi 1"])
+        self.assertEqual([n["message"] for n in response.data["notifications"]], ["notif 0", "notif 1"])
+
+    def test_timeline_fichier_en_url_absolue(self):
+        with self.settings(MEDIA_ROOT=MEDIA_TEST):
+            self.dossier.fichiers = SimpleUploadedFile("devis.pdf", b"%PDF")
+            self.dossier.save()
+        detail = self.client.get(f"/api/dossiers/{self.dossier.id}/").data["fichiers"]
+        self.assertTrue(detail.startswith("http://testserver/"))
+        response = self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.assertEqual(response.data["dossier"]["fichiers"], detail)
+
+    def test_timeline_nombre_de_requetes_constant(self):
+        # dossier + utilisateur, suivis, notifications + utilisateur
+        self.ajouter_historique(1)
+        with self.assertNumQueries(3):
+            self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.ajouter_historique(20)
+        with self.assertNumQueries(3):
+            self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+
+    def test_timeline_notifications_du_demandeur_uniquement(self):
+        self.ajouter_historique(1)
+        Notification.objects.create(utilisateur=self.agent, dossier=self.dossier, message="pour l'agent", type="in_app")
+        response = self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.assertEqual([n["message"] for n in response.data["notifications"]], ["notif 0"])
+        self.client.force_authenticate(self.agent)
+        response = self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.assertEqual([n["message"] for n in response.data["notifications"]], ["notif 0", "pour l'agent"])
+
+    def test_timeline_dossier_d_un_autre_demandeur(self):
+        autre = CustomUser.objects.create_user(
+            email="autre@asdm.test", username="autre", password="x", role="demandeur"
+        )
+        self.client.force_authenticate(autre)
+        response = self.client.get(f"/api/dossiers/{self.dossier.id}/timeline/")
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkStatutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        cls.dossiers = [
+            DossierDemande.objects.create(
+                utilisateur=cls.demandeur, type_subvention="equipement", montant_demande="100.00",
+                description_projet=f"projet {i}", statut=statut,
+            )
+            for i, statut in enumerate(["en_etude", "en_etude", "accepte"])
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def test_bulk_par_ids(self):
+        ids = [d.id for d in self.dossiers] + [999999]
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/", {"ids": ids, "statut": "accepte", "batch_size": 1}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["modifies"], 2)
+        self.assertEqual(
+            [r["resultat"] for r in response.data["resultats"]],
+            ["modifie", "modifie", "inchange", "introuvable"],
+        )
+        self.assertEqual(DossierDemande.objects.filter(statut="accepte").count(), 3)
+        self.assertEqual(SuiviDossier.objects.filter(statut="accepte").count(), 2)
+        self.assertEqual(Notification.objects.filter(dossier__in=self.dossiers[:2]).count(), 2)
+
+    def test_bulk_par_filtre_dry_run(self):
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/",
+            {"filtre": {"statut": "en_etude"}, "statut": "refuse", "dry_run": True}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["modifies"], 2)
+        self.assertFalse(DossierDemande.objects.filter(statut="refuse").exists())
+        self.assertFalse(SuiviDossier.objects.exists())
+
+    def test_bulk_filtre_vide_ou_inconnu_refuse(self):
+        for filtre in ({}, {"statu": "en_etude"}, {"statut": ""}, {"statut": "en_etude", "type": "formation"}):
+            response = self.client.post(
+                "/api/dossiers/bulk-statut/", {"filtre": filtre, "statut": "refuse"}, format="json"
+            )
+            self.assertEqual(response.status_code, 400, filtre)
+            self.assertIn("filtre", response.data)
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/", {"filtre": {"statut": "inconnu"}, "statut": "refuse"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DossierDemande.objects.filter(statut="refuse").exists())
+        self.assertFalse(SuiviDossier.objects.exists())
+
+    def test_bulk_par_intervalle_de_dates(self):
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/",
+            {"filtre": {"date_depot_after": "2000-01-01"}, "statut": "refuse", "dry_run": True}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["modifies"], 3)
+
+    def test_bulk_trop_d_ids(self):
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/", {"ids": list(range(1, 10002)), "statut": "refuse"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.data)
+
+    def test_bulk_refuse_aux_demandeurs(self):
+        self.client.force_authenticate(self.demandeur)
+        response = self.client.post(
+            "/api/dossiers/bulk-statut/", {"ids": [self.dossiers[0].id], "statut": "accepte"}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class EnvoiNotificationsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+
+    def test_envoi_email_et_in_app(self):
+        email = Notification.objects.create(utilisateur=self.user, message="Bonjour", type="email")
+        in_app = Notification.objects.create(utilisateur=self.user, message="Bonjour", type="in_app")
+        self.assertEqual(traiter_lot(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        for notification in (email, in_app):
+            notification.refresh_from_db()
+            self.assertEqual(notification.etat_envoi, "envoye")
+            self.assertIsNotNone(notification.date_livraison)
+        self.assertEqual(traiter_lot(), 0)
+
+    @override_settings(NOTIFICATIONS_DISPATCH={"MAX_TENTATIVES": 2, "DELAI_RETRY": 0})
+    def test_nouvel_essai_puis_echec(self):
+        # pas de numéro de téléphone : le backend SMS échoue
+        sms = Notification.objects.create(utilisateur=self.user, message="Bonjour", type="sms")
+        traiter_lot()
+        sms.refresh_from_db()
+        self.assertEqual((sms.etat_envoi, sms.tentatives), ("en_attente", 1))
+        traiter_lot()
+        sms.refresh_from_db()
+        self.assertEqual((sms.etat_envoi, sms.tentatives), ("echec", 2))
+        self.assertTrue(sms.erreur_envoi)
+
+
+class CacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_me_invalide_apres_modification(self):
+        self.assertEqual(self.client.get("/api/users/me/").data["username"], "demandeur")
+        with self.assertNumQueries(0):
+            self.client.get("/api/users/me/")
+        self.user.username = "renomme"
+        self.user.save()
+        self.assertEqual(self.client.get("/api/users/me/").data["username"], "renomme")
+
+    @override_settings(USER_CACHE_TIMEOUT=0)
+    def test_duree_du_cache_lue_a_l_appel(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+
+        # jeton JWT : le profil est lu en base (ou dans le cache), pas sur l'instance authentifiée
+        self.client.force_authenticate(None)
+        jeton = ajouter_claims(AccessToken.for_user(self.user), self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {jeton}")
+        self.client.get("/api/users/me/")
+        # UPDATE sans signal : seul le délai d'expiration peut rafraîchir le profil
+        CustomUser.objects.filter(pk=self.user.pk).update(username="renomme")
+        self.assertEqual(self.client.get("/api/users/me/").data["username"], "renomme")
+
+    def test_liste_sans_lecture_du_cache_par_ligne(self):
+        for i in range(5):
+            DossierDemande.objects.create(
+                utilisateur=self.user, type_subvention="formation", montant_demande="1.00", description_projet="p"
+            )
+        cache.clear()
+        with mock.patch("django.core.cache.cache.get", wraps=cache.get) as lectures:
+            response = self.client.get("/api/dossiers/")
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(response.data["results"][0]["utilisateur"]["username"], "demandeur")
+        self.assertEqual(lectures.call_count, 0)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.1.0.0/16"])
+    def test_metriques_du_cache_reservees(self):
+        anonyme = APIClient()
+        self.assertIn(anonyme.get("/api/metrics/cache/", REMOTE_ADDR="10.2.0.1").status_code, (401, 403))
+        self.assertEqual(self.client.get("/api/metrics/cache/", REMOTE_ADDR="10.2.0.1").status_code, 403)
+        self.assertEqual(anonyme.get("/api/metrics/cache/", REMOTE_ADDR="10.1.3.4").status_code, 200)
+        admin = CustomUser.objects.create_user(email="admin@asdm.test", username="admin", password=None, role="admin")
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get("/api/metrics/cache/", REMOTE_ADDR="10.2.0.1").status_code, 200)
+
+    def test_meta_etag(self):
+        response = self.client.get("/api/meta/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn({"value": "accepte", "label": "Accepté"}, response.data["statuts"])
+        response = self.client.get("/api/meta/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+class GetConditionnelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.dossier = DossierDemande.objects.create(
+            utilisateur=cls.user, type_subvention="soutien",
+            montant_demande="300.00", description_projet="Atelier",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_detail_304_puis_200_apres_modification(self):
+        url = f"/api/dossiers/{self.dossier.id}/"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.dossier.description_projet = "Atelier de couture"
+        self.dossier.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_modification_de_l_utilisateur_imbrique(self):
+        Notification.objects.create(utilisateur=self.user, message="Bonjour", type="in_app")
+        urls = ("/api/notifications/", "/api/dossiers/", f"/api/dossiers/{self.dossier.id}/")
+        etags = {url: self.client.get(url)["ETag"] for url in urls}
+        self.user.first_name = "Awa"
+        self.user.save(update_fields=["first_name"])
+        for url in urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_liste_304_puis_200_apres_creation(self):
+        Notification.objects.create(utilisateur=self.user, message="Bonjour", type="in_app")
+        response = self.client.get("/api/notifications/")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(self.client.get("/api/notifications/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get("/api/notifications/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304
+        )
+        Notification.objects.create(utilisateur=self.user, message="Encore", type="in_app")
+        self.assertEqual(self.client.get("/api/notifications/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_liste_validateurs_calcules_sur_la_page(self):
+        for i in range(4):
+            Notification.objects.create(utilisateur=self.user, message=f"m{i}", type="in_app")
+        url = "/api/notifications/?page_size=2"
+        with CaptureQueriesContext(connection) as requetes:
+            etag = self.client.get(url)["ETag"]
+        # pas d'agrégat (COUNT / MAX) sur toutes les lignes filtrées : deux lectures d'une page
+        sql = [q["sql"].upper() for q in requetes]
+        self.assertFalse([q for q in sql if "COUNT(" in q or "MAX(" in q], sql)
+        self.assertTrue(all("LIMIT 3" in q for q in sql), sql)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # suppression d'une ligne de la page
+        Notification.objects.order_by("-date_envoi", "-id").first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        for statut in ["accepte", "refuse", "accepte"]:
+            DossierDemande.objects.create(
+                utilisateur=cls.agent, type_subvention="formation", montant_demande="1234.50",
+                description_projet="projet", statut=statut,
+            )
+
+    def test_export_csv_filtre(self):
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        response = client.get("/api/dossiers/export/?statut=accepte&date_depot_after=2000-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        contenu = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(contenu[0].split(",")[:5], ["id", "date_depot", "type_subvention", "statut", "montant_demande"])
+        self.assertEqual(len(contenu), 3)
+        self.assertIn("1234.50", contenu[1])
+        self.assertIn("agent@asdm.test", contenu[1])
+
+    def test_export_sans_formules(self):
+        import csv
+
+        dossier = DossierDemande.objects.first()
+        for commentaire in ("=HYPERLINK(\"http://x\")", "+1+2", "-2", "@SUM(A1)", "normal"):
+            SuiviDossier.objects.create(dossier=dossier, commentaire=commentaire, statut="accepte")
+        self.agent.last_name = "=cmd|' /C calc'!A0"
+        self.agent.save()
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        suivis = list(csv.reader(b"".join(client.get("/api/suivis/export/").streaming_content).decode().splitlines()))
+        self.assertEqual(
+            sorted(ligne[4] for ligne in suivis[1:]),
+            sorted(["'=HYPERLINK(\"http://x\")", "'+1+2", "'-2", "'@SUM(A1)", "normal"]),
+        )
+        dossiers = list(csv.reader(b"".join(client.get("/api/dossiers/export/").streaming_content).decode().splitlines()))
+        self.assertEqual(dossiers[1][7], "'=cmd|' /C calc'!A0")
+        # les nombres ne sont pas modifiés
+        self.assertEqual(dossiers[1][4], "1234.50")
+
+    async def test_export_en_flux_async_sous_asgi(self):
+        from django.test import AsyncClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+
+        jeton = ajouter_claims(AccessToken.for_user(self.agent), self.agent)
+        response = await AsyncClient().get(
+            "/api/dossiers/export/?statut=accepte", headers={"Authorization": f"Bearer {jeton}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        # itérateur async : pas de lecture de tout l'export par sync_to_async(list)
+        self.assertTrue(response.is_async)
+        contenu = b"".join([morceau async for morceau in response.streaming_content]).decode().splitlines()
+        self.assertEqual(len(contenu), 3)
+        self.assertIn("1234.50", contenu[1])
+
+
+class StatistiquesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+
+    def creer_dossier(self, statut, date_depot=None):
+        dossier = DossierDemande.objects.create(
+            utilisateur=self.agent, type_subvention="formation", montant_demande="100.00",
+            description_projet="projet", statut=statut,
+        )
+        if date_depot is not None:
+            DossierDemande.objects.filter(pk=dossier.pk).update(date_depot=date_depot)
+        return dossier
+
+    def test_agregats_et_jour_courant(self):
+        ancien = self.creer_dossier("accepte", datetime(2025, 1, 10, 9, tzinfo=dt_timezone.utc))
+        suivi = SuiviDossier.objects.create(dossier=ancien, commentaire="ok", statut="accepte")
+        SuiviDossier.objects.filter(pk=suivi.pk).update(date_update=datetime(2025, 1, 12, 9, tzinfo=dt_timezone.utc))
+        self.creer_dossier("en_attente")
+        rafraichir_jours([date(2025, 1, 10)])
+
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        data = client.get("/api/stats/").data
+        self.assertEqual(data["par_mois"][0]["mois"], "2025-01")
+        self.assertEqual(data["par_mois"][0]["nombre"], 1)
+        self.assertEqual(data["par_mois"][0]["delai_moyen_decision_jours"], 2.0)
+        self.assertEqual(len(data["par_mois"]), 2)
+        self.assertEqual(data["delai_moyen_decision_jours"], 2.0)
+
+    def test_jours_marques(self):
+        dossier = self.creer_dossier("en_attente")
+        self.assertTrue(JourARecalculer.objects.filter(jour=dossier.date_depot.date()).exists())
+        # le jour courant reste servi en direct
+        self.assertEqual(rafraichir_jours_marques(), 0)
+
+    def test_ecriture_pendant_le_calcul_remarque_le_jour(self):
+        dossier = self.creer_dossier("accepte", datetime(2025, 1, 10, 9, tzinfo=dt_timezone.utc))
+        JourARecalculer.objects.all().delete()
+        JourARecalculer.objects.create(jour=date(2025, 1, 10))
+        calculer = calculer_jour
+
+        def calcul_puis_ecriture(jour):
+            stats = calculer(jour)
+            # suivi enregistré après la lecture des dossiers du jour
+            SuiviDossier.objects.create(dossier=dossier, commentaire="tardif", statut="accepte")
+            return stats
+
+        with mock.patch("app_principale.stats.calculer_jour", calcul_puis_ecriture):
+            self.assertEqual(rafraichir_jours_marques(), 1)
+        self.assertTrue(JourARecalculer.objects.filter(jour=date(2025, 1, 10)).exists())
+        self.assertEqual(rafraichir_jours_marques(), 1)
+        self.assertFalse(JourARecalculer.objects.exists())
+
+
+MEDIA_TEST = Path(tempfile.mkdtemp())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST, UPLOAD_TMP_DIR=MEDIA_TEST / "televersements", UPLOAD_PART_MAX_SIZE=4)
+class TeleversementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.dossier = DossierDemande.objects.create(
+            utilisateur=cls.user, type_subvention="equipement", montant_demande="10.00", description_projet="p",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def put(self, televersement_id, debut, contenu, total):
+        return self.client.generic(
+            "PUT", f"/api/televersements/{televersement_id}/", contenu,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {debut}-{debut + len(contenu) - 1}/{total}",
+        )
+
+    def test_televersement_reprise_et_finalisation(self):
+        contenu = b"bonjour ASDM"
+        response = self.client.post(
+            f"/api/dossiers/{self.dossier.id}/televersements/", {"nom": "scan.pdf", "taille": len(contenu)}
+        )
+        self.assertEqual(response.status_code, 201)
+        televersement_id = response.data["id"]
+
+        self.assertEqual(self.put(televersement_id, 0, contenu[:4], len(contenu)).data["recu"], 4)
+        # plage non contiguë : le serveur indique où reprendre
+        response = self.put(televersement_id, 8, contenu[8:], len(contenu))
+        self.assertEqual((response.status_code, response.data["recu"]), (409, 4))
+        # partie trop grande
+        self.assertEqual(self.put(televersement_id, 4, contenu[4:], len(contenu)).status_code, 413)
+        self.put(televersement_id, 4, contenu[4:8], len(contenu))
+        self.put(televersement_id, 8, contenu[8:], len(contenu))
+
+        url = f"/api/televersements/{televersement_id}/finaliser/"
+        self.assertEqual(self.client.post(url, {"sha256": "0" * 64}).status_code, 422)
+        response = self.client.post(url, {"sha256": hashlib.sha256(contenu).hexdigest()})
+        self.assertEqual(response.status_code, 201)
+        piece = PieceJointe.objects.get()
+        with piece.fichier.open("rb") as f:
+            self.assertEqual(f.read(), contenu)
+        self.assertFalse(Televersement.objects.exists())
+        self.assertEqual(len(self.client.get(f"/api/dossiers/{self.dossier.id}/pieces-jointes/").data), 1)
+
+    def test_purge_des_televersements_abandonnes(self):
+        response = self.client.post(
+            f"/api/dossiers/{self.dossier.id}/televersements/", {"nom": "scan.pdf", "taille": 8}
+        )
+        actif = Televersement.objects.get(pk=response.data["id"])
+        abandonne = Televersement.objects.create(dossier=self.dossier, utilisateur=self.user, nom="a.pdf", taille=8)
+        open(abandonne.chemin_temporaire, "wb").close()
+        Televersement.objects.filter(pk=abandonne.pk).update(derniere_activite=timezone.now() - timedelta(days=2))
+        orpheline = MEDIA_TEST / "televersements" / "orpheline.partie"
+        orpheline.write_bytes(b"x")
+        ancien = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orpheline, (ancien, ancien))
+
+        call_command("purger_televersements", stdout=io.StringIO())
+        self.assertEqual(list(Televersement.objects.values_list("pk", flat=True)), [actif.pk])
+        self.assertFalse(os.path.exists(abandonne.chemin_temporaire))
+        self.assertFalse(orpheline.exists())
+        self.assertTrue(os.path.exists(actif.chemin_temporaire))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST)
+class TelechargementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.autre = CustomUser.objects.create_user(
+            email="autre@asdm.test", username="autre", password="x", role="demandeur"
+        )
+
+    def setUp(self):
+        self.dossier = DossierDemande.objects.create(
+            utilisateur=self.user, type_subvention="equipement", montant_demande="10.00", description_projet="p",
+            fichiers=SimpleUploadedFile("devis.pdf", b"0123456789"),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/dossiers/{self.dossier.id}/fichier/"
+
+    def test_telechargement_avec_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=20-").status_code, 416)
+        response = self.client.get(self.url)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertTrue(self.client.get(f"/api/dossiers/{self.dossier.id}/").data["fichiers"].endswith(self.url))
+
+    async def test_telechargement_en_flux_async_sous_asgi(self):
+        from django.test import AsyncClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+
+        jeton = ajouter_claims(AccessToken.for_user(self.user), self.user)
+        client = AsyncClient()
+        for entetes, attendu in (({}, b"0123456789"), ({"Range": "bytes=2-5"}, b"2345")):
+            response = await client.get(self.url, headers={"Authorization": f"Bearer {jeton}", **entetes})
+            # itérateur async : le fichier n'est pas lu en entier par sync_to_async(list)
+            self.assertTrue(response.is_async)
+            self.assertEqual(b"".join([bloc async for bloc in response.streaming_content]), attendu)
+            self.assertEqual(response["Content-Length"], str(len(attendu)))
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel")
+    def test_delegation_au_serveur_frontal(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.dossier.fichiers.name)
+        self.assertEqual(response.content, b"")
+
+    def test_reserve_au_proprietaire(self):
+        self.client.force_authenticate(self.autre)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST)
+class ApercusTests(TestCase):
+    def creer_piece(self, dossier, contenu, nom):
+        return PieceJointe.objects.create(
+            dossier=dossier, fichier=SimpleUploadedFile(nom, contenu), nom=nom,
+            taille=len(contenu), sha256=hashlib.sha256(contenu).hexdigest(),
+        )
+
+    def test_generation_des_apercus(self):
+        user = CustomUser.objects.create_user(email="d@asdm.test", username="d", password="x")
+        dossier = DossierDemande.objects.create(
+            utilisateur=user, type_subvention="equipement", montant_demande="10.00", description_projet="p",
+        )
+        tampon = io.BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(tampon, "PNG")
+        image = self.creer_piece(dossier, tampon.getvalue(), "photo.png")
+        texte = self.creer_piece(dossier, b"pas une image", "notes.txt")
+
+        with nouveau_pool(1) as pool:
+            self.assertEqual(traiter_lot_apercus(pool), 2)
+        image.refresh_from_db()
+        texte.refresh_from_db()
+        self.assertEqual(image.etat_apercus, "genere")
+        self.assertEqual(texte.etat_apercus, "sans_apercu")
+        with Image.open(MEDIA_TEST / image.apercus["256"]) as apercu:
+            self.assertEqual(apercu.size, (256, 128))
+
+        client = APIClient()
+        client.force_authenticate(user)
+        pieces = client.get(f"/api/dossiers/{dossier.id}/pieces-jointes/").data
+        response = client.get(pieces[0]["apercus"]["1024"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_piece_en_cours_reprise_apres_le_bail(self):
+        user = CustomUser.objects.create_user(email="d@asdm.test", username="d", password="x")
+        dossier = DossierDemande.objects.create(
+            utilisateur=user, type_subvention="equipement", montant_demande="10.00", description_projet="p",
+        )
+        abandonnee = self.creer_piece(dossier, b"a", "a.txt")
+        reclamee = self.creer_piece(dossier, b"b", "b.txt")
+        PieceJointe.objects.filter(pk=abandonnee.pk).update(
+            etat_apercus="en_cours", bail_apercus=timezone.now() - timedelta(minutes=1)
+        )
+        PieceJointe.objects.filter(pk=reclamee.pk).update(
+            etat_apercus="en_cours", bail_apercus=timezone.now() + timedelta(minutes=10)
+        )
+
+        with nouveau_pool(1) as pool:
+            self.assertEqual(traiter_lot_apercus(pool), 1)
+        abandonnee.refresh_from_db()
+        reclamee.refresh_from_db()
+        self.assertEqual(abandonnee.etat_apercus, "sans_apercu")
+        self.assertEqual(reclamee.etat_apercus, "en_cours")
+
+
+class PerimetreParRoleTests(TestCase):
+    """Un demandeur ne voit que ses lignes ; le filtre est fait en SQL, sur l'index utilisateur."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.autre = CustomUser.objects.create_user(
+            email="autre@asdm.test", username="autre", password="x", role="demandeur"
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        for user, n in ((cls.demandeur, 3), (cls.autre, 200)):
+            dossiers = DossierDemande.objects.bulk_create([
+                DossierDemande(utilisateur=user, type_subvention="formation", montant_demande="1.00",
+                               description_projet="p")
+                for _ in range(n)
+            ])
+            SuiviDossier.objects.bulk_create([SuiviDossier(dossier=d, commentaire="c") for d in dossiers])
+            Notification.objects.bulk_create([
+                Notification(utilisateur=user, message="m", type="in_app") for _ in range(n)
+            ])
+
+    def lister(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(url + "?page_size=200").data["results"]
+
+    def test_listes_limitees_au_demandeur(self):
+        for url in ("/api/dossiers/", "/api/suivis/", "/api/notifications/"):
+            self.assertEqual(len(self.lister(self.demandeur, url)), 3, url)
+            self.assertEqual(len(self.lister(self.agent, url)), 200, url)
+
+    def test_detail_d_un_autre_demandeur_introuvable(self):
+        dossier = DossierDemande.objects.filter(utilisateur=self.autre).first()
+        client = APIClient()
+        client.force_authenticate(self.demandeur)
+        self.assertEqual(client.get(f"/api/dossiers/{dossier.id}/").status_code, 404)
+
+    def test_filtre_pousse_en_sql_sur_l_index(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.lister(self.demandeur, "/api/dossiers/")
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn('"utilisateur_id" = %d' % self.demandeur.id, sql)
+        if connection.vendor == "sqlite":
+            plan = DossierDemande.objects.filter(utilisateur=self.demandeur).order_by("-date_depot", "-id").explain()
+            self.assertIn("dossier_user_depot_idx", plan)
+
+
+class ReplicaRouterTests(TestCase):
+    def lectures(self, methode):
+        from django.contrib.sessions.models import Session
+        from django.test import RequestFactory
+
+        from .routers import ReplicaMiddleware, ReplicaRouter
+
+        router = ReplicaRouter()
+
+        def vue(request):
+            return {
+                modele: router.db_for_read(modele)
+                for modele in (DossierDemande, Notification, CustomUser, Session)
+            }
+
+        with mock.patch.dict("django.conf.settings.DATABASES", {"replica": {}}):
+            return ReplicaMiddleware(vue)(RequestFactory().generic(methode, "/api/dossiers/"))
+
+    def test_lectures_get_sur_la_replique_sauf_securite(self):
+        from django.contrib.sessions.models import Session
+
+        lectures = self.lectures("GET")
+        self.assertEqual(lectures[DossierDemande], "replica")
+        self.assertEqual(lectures[Notification], "replica")
+        # token_version, comptes désactivés, sessions : jamais lus sur une réplique en retard
+        self.assertEqual(lectures[CustomUser], "default")
+        self.assertEqual(lectures[Session], "default")
+
+    def test_requete_qui_ecrit_reste_sur_la_principale(self):
+        self.assertEqual(set(self.lectures("POST").values()), {None})
+
+    def test_sans_replique_tout_reste_sur_la_principale(self):
+        from .routers import ReplicaRouter
+
+        self.assertIsNone(ReplicaRouter().db_for_read(DossierDemande))
+
+
+class JWTTests(TestCase):
+    """Authentification par jeton : utilisateur lu depuis les claims, révocation par version."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="motdepasse", role="demandeur"
+        )
+
+    def setUp(self):
+        # les identifiants sont réutilisés d'une classe de tests à l'autre
+        cache.clear()
+
+    def jetons(self):
+        response = APIClient().post(
+            "/api/auth/token/", {"email": "demandeur@asdm.test", "password": "motdepasse"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def client_jwt(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def test_aucune_requete_utilisateur(self):
+        client = self.client_jwt(self.jetons()["access"])
+        self.assertEqual(client.get("/api/users/me/").data["email"], "demandeur@asdm.test")
+        with self.assertNumQueries(0):
+            response = client.get("/api/users/me/")
+        self.assertEqual(response.status_code, 200)
+        response = client.post(
+            "/api/dossiers/",
+            {"utilisateur_id": self.user.id, "type_subvention": "formation", "montant_demande": "10.00",
+             "description_projet": "p"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(DossierDemande.objects.get().utilisateur_id, self.user.id)
+        self.assertEqual(client.patch(f"/api/dossiers/{response.data['id']}/", {"description_projet": "q"}).status_code, 200)
+
+    def test_revocation(self):
+        jetons = self.jetons()
+        client = self.client_jwt(jetons["access"])
+        self.assertEqual(client.post("/api/auth/token/revoke/").status_code, 204)
+        self.assertEqual(client.get("/api/users/me/").status_code, 401)
+        response = APIClient().post("/api/auth/token/refresh/", {"refresh": jetons["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_changement_de_role_invalide_les_jetons(self):
+        client = self.client_jwt(self.jetons()["access"])
+        self.assertEqual(client.get("/api/stats/").status_code, 403)
+        self.user.role = "agent"
+        self.user.save()
+        self.assertEqual(client.get("/api/stats/").status_code, 401)
+        client = self.client_jwt(self.jetons()["access"])
+        self.assertEqual(client.get("/api/stats/").status_code, 200)
+
+    def test_changement_de_mot_de_passe_invalide_les_jetons(self):
+        client = self.client_jwt(self.jetons()["access"])
+        self.user.set_password("nouveau-motdepasse")
+        self.user.save(update_fields=["password"])
+        self.assertEqual(client.get("/api/users/me/").status_code, 401)
+
+    def test_connexion_avec_un_hachage_perime(self):
+        # PBKDF2SHA1 : encore accepté par la configuration par défaut, mais plus le premier
+        with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]):
+            user = CustomUser.objects.create_user(
+                email="ancien@asdm.test", username="ancien", password="motdepasse", role="demandeur"
+            )
+        response = APIClient().post(
+            "/api/auth/token/", {"email": "ancien@asdm.test", "password": "motdepasse"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        # la mise à niveau du hachage ne révoque pas le jeton tout juste émis
+        self.assertEqual(self.client_jwt(response.data["access"]).get("/api/users/me/").status_code, 200)
+
+    def test_demandeur_lit_et_modifie_son_dossier(self):
+        # l'id des claims est une chaîne dans le jeton : comparé en entier au propriétaire
+        dossier = DossierDemande.objects.create(
+            utilisateur=self.user, type_subvention="formation", montant_demande="10.00", description_projet="p",
+        )
+        client = self.client_jwt(self.jetons()["access"])
+        self.assertEqual(client.get(f"/api/dossiers/{dossier.id}/").status_code, 200)
+        response = client.patch(f"/api/dossiers/{dossier.id}/", {"description_projet": "q"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        dossier.refresh_from_db()
+        self.assertEqual(dossier.description_projet, "q")
+
+
+class EvenementsTests(TestCase):
+    """Flux SSE : les notifications in-app et changements de statut sont poussés à leur destinataire."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        DossierDemande.objects.create(
+            utilisateur=cls.demandeur, type_subvention="formation", montant_demande="1.00", description_projet="p"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_authentification_requise(self):
+        from django.test import AsyncClient
+
+        self.assertEqual((await AsyncClient().get("/api/evenements/")).status_code, 401)
+
+    def test_non_disponible_sous_wsgi(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+
+        jeton = ajouter_claims(AccessToken.for_user(self.demandeur), self.demandeur)
+        response = self.client.get("/api/evenements/", headers={"Authorization": f"Bearer {jeton}"})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_flux(self):
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+        from .services import changer_statut_en_masse
+
+        jeton = ajouter_claims(AccessToken.for_user(self.demandeur), self.demandeur)
+        response = await AsyncClient().post("/api/evenements/ticket/", headers={"Authorization": f"Bearer {jeton}"})
+        self.assertEqual(response.status_code, 201)
+        ticket = response.json()["ticket"]
+        # le JWT n'est plus accepté dans l'URL
+        self.assertEqual((await AsyncClient().get(f"/api/evenements/?token={jeton}")).status_code, 401)
+        response = await AsyncClient().get(f"/api/evenements/?ticket={ticket}")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        # ticket à usage unique
+        self.assertEqual((await AsyncClient().get(f"/api/evenements/?ticket={ticket}")).status_code, 401)
+        flux = aiter(response.streaming_content)
+        self.assertEqual(await anext(flux), b"retry: 5000\n\n")
+
+        def changer():
+            with self.captureOnCommitCallbacks(execute=True):
+                changer_statut_en_masse(DossierDemande.objects.all(), "accepte")
+
+        await sync_to_async(changer)()
+        statut, notification = await anext(flux), await anext(flux)
+        self.assertTrue(statut.startswith(b"event: statut\n"))
+        self.assertIn(b'"statut": "accepte"', statut)
+        self.assertTrue(notification.startswith(b"event: notification\n"))
+        await response.streaming_content.aclose()
+
+    async def test_flux_ferme_apres_revocation(self):
+        import asyncio
+
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims, revoquer_tokens
+
+        jeton = ajouter_claims(AccessToken.for_user(self.demandeur), self.demandeur)
+        with mock.patch("app_principale.views.SSE_HEARTBEAT", 0.05):
+            response = await AsyncClient().get("/api/evenements/", headers={"Authorization": f"Bearer {jeton}"})
+            flux = aiter(response.streaming_content)
+            self.assertEqual(await anext(flux), b"retry: 5000\n\n")
+            self.assertEqual(await anext(flux), b": ping\n\n")
+            await sync_to_async(revoquer_tokens)(self.demandeur.id)
+
+            async def jusqu_a_la_fin():
+                return [morceau async for morceau in flux]
+
+            # au plus un ping avant la vérification suivante, puis fin du flux
+            self.assertLessEqual(len(await asyncio.wait_for(jusqu_a_la_fin(), timeout=5)), 1)
+
+    def test_erreur_de_diffusion_apres_commit(self):
+        from .services import changer_statut_en_masse
+
+        backend = mock.Mock()
+        backend.publier.side_effect = RuntimeError("payload string too long")
+        with mock.patch("app_principale.push.get_backend", return_value=backend), \
+                self.assertLogs("app_principale.push", "ERROR"), \
+                self.captureOnCommitCallbacks(execute=True):
+            changer_statut_en_masse(DossierDemande.objects.all(), "accepte")
+        self.assertTrue(backend.publier.called)
+        self.assertEqual(DossierDemande.objects.get().statut, "accepte")
+
+
+class LecturesAsyncTests(TestCase):
+    """Les vues de lecture async (ASYNC_READ_VIEWS) répondent octet pour octet comme les viewsets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        autre = CustomUser.objects.create_user(
+            email="autre@asdm.test", username="autre", password="x", role="demandeur"
+        )
+        for user in (cls.demandeur, autre):
+            for i in range(5):
+                dossier = DossierDemande.objects.create(
+                    utilisateur=user, type_subvention="formation", montant_demande=f"{i}.50",
+                    description_projet="p", statut="accepte" if i % 2 else "en_attente",
+                )
+                Notification.objects.create(utilisateur=user, dossier=dossier, message=f"m{i}", type="in_app")
+
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from .authentication import ajouter_claims
+        from .async_views import urls_async
+        from .urls import router
+
+        cache.clear()
+        self.jeton = str(ajouter_claims(AccessToken.for_user(self.demandeur), self.demandeur))
+        self.vues = {"/api/" + url.pattern._route: url.callback for url in urls_async(router)}
+
+    async def comparer(self, url, **headers):
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncRequestFactory
+
+        headers = {"Authorization": f"Bearer {self.jeton}", **headers}
+        attendu = await sync_to_async(APIClient().get)(url, headers=headers)
+        requete = AsyncRequestFactory().get(url, headers=headers)
+        obtenu = await self.vues[requete.path](requete)
+        if hasattr(obtenu, "render"):
+            # réponse déléguée à la vue DRF : rendue par le handler en production
+            obtenu = await sync_to_async(obtenu.render)()
+        self.assertEqual(obtenu.status_code, attendu.status_code, url)
+        self.assertEqual(obtenu.content, attendu.content, url)
+        for entete in ("Content-Type", "ETag", "Last-Modified", "Allow", "Vary"):
+            self.assertEqual(obtenu.headers.get(entete), attendu.headers.get(entete), (url, entete))
+        return obtenu
+
+    async def test_reponses_identiques(self):
+        for url in (
+            "/api/users/me/",
+            "/api/notifications/unread-count/",
+            "/api/notifications/",
+            "/api/notifications/?statut=false&page_size=2",
+            "/api/dossiers/?statut=accepte&ordering=montant_demande",
+            "/api/dossiers/?page_size=2&date_depot_after=2000-01-01",
+        ):
+            await self.comparer(url)
+        page = await self.comparer("/api/dossiers/?page_size=2")
+        suivante = json.loads(page.content)["next"].removeprefix("http://testserver")
+        await self.comparer(suivante)
+        await self.comparer("/api/notifications/", **{"If-None-Match": page["ETag"]})
+        notifications = await self.comparer("/api/notifications/")
+        self.assertEqual(
+            (await self.comparer("/api/notifications/", **{"If-None-Match": notifications["ETag"]})).status_code,
+            304,
+        )
+
+    async def test_delegation_a_la_vue_synchrone(self):
+        from asgiref.sync import sync_to_async
+
+        from .authentication import revoquer_tokens
+
+        # hors du chemin async (recherche, format explicite, jeton révoqué) : même réponse que la vue DRF
+        await self.comparer("/api/dossiers/?search=p")
+        await self.comparer("/api/notifications/?format=json")
+        await sync_to_async(revoquer_tokens)(self.demandeur.id)
+        self.assertEqual((await self.comparer("/api/users/me/")).status_code, 401)
+
+    async def test_liste_sans_lecture_du_cache_par_ligne(self):
+        from django.test import AsyncRequestFactory
+
+        # l'utilisateur imbriqué est lu depuis la jointure : aucun cache.get (synchrone)
+        # par dossier dans la boucle d'événements
+        requete = AsyncRequestFactory().get("/api/dossiers/", headers={"Authorization": f"Bearer {self.jeton}"})
+        with mock.patch("django.core.cache.cache.get", wraps=cache.get) as get:
+            response = await self.vues["/api/dossiers/"](requete)
+        self.assertEqual(len(json.loads(response.content)["results"]), 5)
+        cles = [appel.args[0] for appel in get.call_args_list]
+        self.assertFalse([cle for cle in cles if cle.startswith("user-payload:")])
+
+
+class NotificationsNonLuesTests(TestCase):
+    """Compteur de non lues tenu par triggers, et marquage en masse en un seul UPDATE."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.gros = CustomUser.objects.create_user(
+            email="gros@asdm.test", username="gros", password="x", role="demandeur"
+        )
+        Notification.objects.bulk_create([
+            Notification(utilisateur=cls.gros, message="m", type="in_app") for _ in range(2000)
+        ])
+
+    def client_pour(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def non_lues(self, user):
+        return self.client_pour(user).get("/api/notifications/unread-count/").data["non_lues"]
+
+    def test_compteur_suit_toutes_les_ecritures(self):
+        self.assertEqual(self.non_lues(self.user), 0)
+        notifications = [
+            Notification.objects.create(utilisateur=self.user, message=f"m{i}", type="in_app") for i in range(4)
+        ]
+        self.assertEqual(self.non_lues(self.user), 4)
+        notifications[0].statut = True
+        notifications[0].save()
+        notifications[1].delete()
+        self.assertEqual(self.non_lues(self.user), 2)
+        Notification.objects.filter(pk=notifications[0].pk).update(statut=False)
+        self.assertEqual(self.non_lues(self.user), 3)
+        self.assertEqual(self.non_lues(self.gros), 2000)
+
+    def test_mark_read(self):
+        notifications = [
+            Notification.objects.create(utilisateur=self.user, message=f"m{i}", type="in_app") for i in range(3)
+        ]
+        client = self.client_pour(self.user)
+        with self.assertNumQueries(2):
+            response = client.post("/api/notifications/mark-read/", {"ids": [notifications[0].id]}, format="json")
+        self.assertEqual(response.data, {"modifiees": 1, "non_lues": 2})
+        # les notifications des autres ne sont pas touchées
+        response = client.post("/api/notifications/mark-read/", {"avant": timezone.now().isoformat()}, format="json")
+        self.assertEqual(response.data, {"modifiees": 2, "non_lues": 0})
+        self.assertEqual(self.non_lues(self.gros), 2000)
+        self.assertEqual(client.post("/api/notifications/mark-read/", {}, format="json").status_code, 400)
+
+    def test_cout_constant(self):
+        for user in (self.user, self.gros):
+            with self.assertNumQueries(1):
+                self.client_pour(user).get("/api/notifications/unread-count/")
+        with self.assertNumQueries(2):
+            self.client_pour(self.gros).post(
+                "/api/notifications/mark-read/", {"avant": timezone.now().isoformat()}, format="json"
+            )
+        self.assertEqual(self.non_lues(self.gros), 0)
+
+
+@override_settings(PROFILAGE_API=True)
+class ProfilageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            email="admin@asdm.test", username="admin", password="x", role="admin"
+        )
+        for i in range(3):
+            DossierDemande.objects.create(
+                utilisateur=cls.admin, type_subvention="formation", montant_demande="1.00", description_projet="p"
+            )
+
+    def setUp(self):
+        from .profilage import registre
+
+        registre.vider()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_server_timing_et_metriques(self):
+        response = self.client.get("/api/dossiers/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ requetes", ser;dur=[\d.]+, total;dur=')
+        metriques = self.client.get("/api/metrics/").content.decode()
+        self.assertIn('asdm_http_requests_total{vue="dossiers-list",methode="GET"} 1', metriques)
+        self.assertIn("asdm_cache_requests_total", metriques)
+        # collecteur sans jeton : seulement depuis METRICS_ALLOWED_IPS
+        self.assertEqual(APIClient().get("/api/metrics/").status_code, 401)
+        with override_settings(METRICS_ALLOWED_IPS=["127.0.0.0/8"]):
+            self.assertEqual(APIClient().get("/api/metrics/").status_code, 200)
+
+        profil = self.client.get("/api/metrics/profil/").data
+        vue = next(v for v in profil["vues"] if v["vue"] == "dossiers-list")
+        self.assertGreater(vue["requetes_sql_moy"], 0)
+        self.assertGreater(vue["serialisation_ms_moy"], 0)
+
+        demandeur = CustomUser.objects.create_user(email="d@asdm.test", username="d", password="x")
+        self.client.force_authenticate(demandeur)
+        self.assertEqual(self.client.get("/api/metrics/profil/").status_code, 403)
+
+    def test_sql_duplique(self):
+        from .profilage import Mesure, _mesure, installer, registre
+
+        installer()
+        mesure = Mesure()
+        token = _mesure.set(mesure)
+        try:
+            for dossier in DossierDemande.objects.all():
+                CustomUser.objects.get(pk=dossier.utilisateur_id)
+        finally:
+            _mesure.reset(token)
+        registre.ajouter("essai", "GET", 200, mesure, 0.01)
+        self.assertEqual(mesure.requetes, 4)
+        doublons = next(v for v in registre.instantane()[0] if v["vue"] == "essai")["sql_dupliques"]
+        self.assertEqual(len(doublons), 1)
+        self.assertEqual(doublons[0][1], 3)
+
+
+class DonneesSynthetiquesTests(TestCase):
+    def generer(self, **options):
+        options = {"utilisateurs": 4, "agents": 1, "admins": 1, "dossiers": 6, "suivis": 10,
+                   "notifications": 30, "seed": 7, "lot": 4, **options}
+        call_command("generer_donnees", stdout=io.StringIO(), **options)
+
+    def test_generation_reproductible(self):
+        self.generer()
+        self.assertEqual(CustomUser.objects.count(), 6)
+        self.assertEqual(DossierDemande.objects.count(), 6)
+        self.assertEqual(SuiviDossier.objects.count(), 10)
+        self.assertEqual(Notification.objects.count(), 30)
+        # déjà envoyées : rien pour le worker d'envoi ; dates dans le passé
+        self.assertFalse(Notification.objects.exclude(etat_envoi="envoye").exists())
+        self.assertLess(DossierDemande.objects.order_by("date_depot").first().date_depot,
+                        timezone.now() - timedelta(hours=1))
+        # compteurs tenus par les triggers malgré bulk_create
+        for user in CustomUser.objects.filter(role="demandeur"):
+            self.assertEqual(
+                nombre_non_lues(user.pk), Notification.objects.filter(utilisateur=user, statut=False).count()
+            )
+        self.assertTrue(JourARecalculer.objects.exists())
+
+        messages = list(Notification.objects.order_by("id").values_list("message", "type", "statut"))
+        with self.assertRaises(CommandError):
+            self.generer()
+        self.generer(prefixe="autre")
+        self.assertEqual(
+            list(Notification.objects.order_by("id").values_list("message", "type", "statut"))[30:], messages
+        )
+
+    @override_settings(ALLOWED_HOSTS=["localhost"])
+    def test_bench_et_baseline(self):
+        self.generer()
+        sortie = Path(tempfile.mkdtemp()) / "bench.json"
+        call_command("bench_api", repetitions=2, echauffement=0, sortie=str(sortie), stdout=io.StringIO())
+        resultats = json.loads(sortie.read_text())
+        self.assertEqual(resultats["volumes"]["Notification"], 30)
+        self.assertEqual({r["statut"] for r in resultats["scenarios"].values()}, {200})
+        # les écritures du banc sont annulées
+        self.assertEqual(SuiviDossier.objects.count(), 10)
+
+        resultats["scenarios"]["dossiers-liste"]["requetes_sql"] -= 1
+        sortie.write_text(json.dumps(resultats))
+        with self.assertRaisesMessage(CommandError, "1 régression(s)"):
+            call_command("bench_api", repetitions=2, echauffement=0, scenario=["dossiers-liste"],
+                         baseline=str(sortie), marge_ms=1000, seuil=100, stdout=io.StringIO())
+
+
+class LectureRapideTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur",
+            first_name="Aïssata", phone="622",
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        for i in range(7):
+            dossier = DossierDemande.objects.create(
+                utilisateur=cls.demandeur if i % 2 else cls.agent, type_subvention="formation",
+                montant_demande=f"{1000 + i}.5", description_projet=f"Projet couture n°{i} ",
+                fichiers="dossiers/devis.pdf" if i % 3 == 0 else "",
+            )
+            SuiviDossier.objects.create(dossier=dossier, commentaire=f"Suivi {i}", statut="en_etude")
+            Notification.objects.create(
+                utilisateur=dossier.utilisateur, dossier=dossier if i % 2 else None,
+                message=f"Dossier {i} reçu", type="in_app", statut=i % 3 == 0,
+            )
+
+    def comparer(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        attendu = client.get(url)
+        with override_settings(LECTURE_RAPIDE=True):
+            obtenu = client.get(url)
+        self.assertEqual(attendu.status_code, 200)
+        self.assertEqual(obtenu.content, attendu.content, url)
+        return attendu
+
+    def test_json_identique(self):
+        for user in (self.agent, self.demandeur):
+            for url in (
+                "/api/dossiers/", "/api/dossiers/?ordering=-montant_demande&page_size=2",
+                "/api/dossiers/?search=couture&statut=en_attente", "/api/dossiers/?page=2&page_size=2",
+                "/api/suivis/?ordering=date_update", "/api/notifications/?statut=false",
+                "/api/notifications/?page_size=2",
+            ):
+                response = self.comparer(user, url)
+                if response.data.get("next"):
+                    self.comparer(user, response.data["next"])
+
+    def test_fuseau_horaire(self):
+        with timezone.override("America/Montreal"):
+            response = self.comparer(self.agent, "/api/notifications/")
+        self.assertIn("-0", response.data["results"][0]["date_envoi"])
+
+    def test_moins_de_requetes(self):
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        cache.clear()
+        with override_settings(LECTURE_RAPIDE=True), self.assertNumQueries(2):
+            # validateurs du GET conditionnel (page, colonnes minimales) + page (utilisateurs joints, pas de cache)
+            client.get("/api/notifications/")
+
+
+class ArchivageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.demandeur = CustomUser.objects.create_user(
+            email="demandeur@asdm.test", username="demandeur", password="x", role="demandeur"
+        )
+        cls.agent = CustomUser.objects.create_user(
+            email="agent@asdm.test", username="agent", password="x", role="agent"
+        )
+        cls.clos = DossierDemande.objects.create(
+            utilisateur=cls.demandeur, type_subvention="formation", montant_demande="10.00",
+            description_projet="clos", statut="accepte",
+        )
+        cls.ouvert = DossierDemande.objects.create(
+            utilisateur=cls.demandeur, type_subvention="formation", montant_demande="10.00",
+            description_projet="ouvert", statut="en_etude",
+        )
+        ancien = timezone.now() - timedelta(days=400)
+        cls.suivi_ancien = SuiviDossier.objects.create(dossier=cls.clos, commentaire="accord", statut="accepte")
+        SuiviDossier.objects.create(dossier=cls.ouvert, commentaire="étude", statut="en_etude")
+        SuiviDossier.objects.update(date_update=ancien)
+        SuiviDossier.objects.create(dossier=cls.clos, commentaire="récent", statut="accepte")
+
+        def notification(statut, date_envoi):
+            n = Notification.objects.create(
+                utilisateur=cls.demandeur, dossier=cls.clos, message="Dossier accepté", type="email",
+                statut=statut, etat_envoi="envoye",
+            )
+            Notification.objects.filter(pk=n.pk).update(date_envoi=date_envoi)
+            return n
+
+        cls.lue_ancienne = notification(True, ancien)
+        notification(False, ancien)
+        notification(True, timezone.now())
+
+    def client_pour(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_archiver(self):
+        decisions = [(s.nombre, s.nombre_decides) for s in calculer_jour(timezone.localdate())]
+        sortie = io.StringIO()
+        call_command("archiver", dry_run=True, stdout=sortie)
+        self.assertIn("notifications : 1 ligne(s) archivable(s)", sortie.getvalue())
+        call_command("archiver", pause=0, batch_size=1, stdout=io.StringIO())
+
+        self.assertEqual(list(NotificationArchive.objects.values_list("id", flat=True)), [self.lue_ancienne.pk])
+        self.assertEqual(list(SuiviDossierArchive.objects.values_list("id", flat=True)), [self.suivi_ancien.pk])
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(SuiviDossier.objects.count(), 2)
+        self.assertEqual(nombre_non_lues(self.demandeur.pk), 1)
+        self.assertEqual([(s.nombre, s.nombre_decides) for s in calculer_jour(timezone.localdate())], decisions)
+        # rien de plus au 2e passage
+        call_command("archiver", pause=0, stdout=io.StringIO())
+        self.assertEqual(NotificationArchive.objects.count(), 1)
+
+    def test_include_archived(self):
+        call_command("archiver", pause=0, stdout=io.StringIO())
+        client = self.client_pour(self.demandeur)
+        ids = lambda r: {n["id"] for n in r.data["results"]}
+        self.assertNotIn(self.lue_ancienne.pk, ids(client.get("/api/notifications/")))
+        response = client.get("/api/notifications/?include_archived=true&statut=true")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn(self.lue_ancienne.pk, ids(response))
+        archivee = f"/api/notifications/{self.lue_ancienne.pk}/"
+        self.assertEqual(client.get(archivee).status_code, 404)
+        self.assertEqual(client.get(archivee + "?include_archived=1").data["message"], "Dossier accepté")
+        # lecture seule
+        self.assertEqual(client.patch(archivee + "?include_archived=1", {"statut": False}).status_code, 404)
+        autre = CustomUser.objects.create_user(email="autre@asdm.test", username="autre", password="x")
+        self.assertEqual(self.client_pour(autre).get(archivee + "?include_archived=1").status_code, 404)
+
+        agent = self.client_pour(self.agent)
+        response = agent.get(f"/api/suivis/?include_archived=true&dossier={self.clos.pk}&ordering=date_update")
+        self.assertEqual([s["commentaire"] for s in response.data["results"]], ["accord", "récent"])
+        timeline = client.get(f"/api/dossiers/{self.clos.pk}/timeline/?include_archived=true").data
+        self.assertEqual(len(timeline["suivis"]), 2)
+        self.assertEqual(len(timeline["notifications"]), 3)
+        self.assertEqual(len(client.get(f"/api/dossiers/{self.clos.pk}/timeline/").data["suivis"]), 1)
+
+    def test_suppression_en_cascade(self):
+        call_command("archiver", pause=0, stdout=io.StringIO())
+        self.demandeur.delete()
+        self.assertFalse(NotificationArchive.objects.exists())
+        self.assertFalse(SuiviDossierArchive.objects.exists())
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email="admin@asdm.test", username="admin", password="x", role="admin"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def creer(self, n):
+        for i in range(n):
+            user = CustomUser.objects.create_user(
+                email=f"demandeur{CustomUser.objects.count()}@asdm.test",
+                username=f"demandeur{CustomUser.objects.count()}", password=None,
+            )
+            dossier = DossierDemande.objects.create(
+                utilisateur=user, type_subvention="formation", montant_demande="10.00", description_projet="p"
+            )
+            SuiviDossier.objects.create(dossier=dossier, commentaire="c", statut="en_etude")
+            Notification.objects.create(utilisateur=user, dossier=dossier, message="m", type="in_app")
+
+    def requetes(self, url):
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(requetes)
+
+    def test_requetes_constantes(self):
+        filtres = {
+            "customuser": "role__exact=demandeur", "dossierdemande": "statut__exact=en_attente",
+            "suividossier": "statut__exact=en_etude", "notification": "statut__exact=0",
+        }
+        urls = [
+            f"/admin/app_principale/{modele}/{parametres}"
+            for modele, filtre in filtres.items()
+            for parametres in ("", "?q=demandeur", f"?{filtre}")
+        ]
+        self.creer(2)
+        avant = [self.requetes(url) for url in urls]
+        self.creer(20)
+        self.assertEqual([self.requetes(url) for url in urls], avant)
+
+    def test_recherche(self):
+        self.creer(12)
+        dossier = DossierDemande.objects.order_by("id").last()
+        response = self.client.get(f"/admin/app_principale/dossierdemande/?q={dossier.pk}")
+        self.assertEqual([d.pk for d in response.context["cl"].result_list], [dossier.pk])
+        response = self.client.get(f"/admin/app_principale/suividossier/?q={dossier.pk}")
+        self.assertIn(dossier.pk, [s.dossier_id for s in response.context["cl"].result_list])
+        response = self.client.get("/admin/app_principale/dossierdemande/?q=demandeur1")
+        # préfixe : demandeur1, demandeur10, demandeur11, demandeur12
+        self.assertEqual(response.context["cl"].result_count, 4)
+        # chiffres que int() refuse, identifiant hors bigint : recherche texte, pas d'erreur 500
+        for terme in ("²", "9" * 30):
+            response = self.client.get("/admin/app_principale/dossierdemande/", {"q": terme})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["cl"].result_count, 0)
+
+    def test_actions(self):
+        self.creer(3)
+        ids = list(DossierDemande.objects.values_list("id", flat=True)[:2])
+        response = self.client.post("/admin/app_principale/dossierdemande/", {
+            "action": "passer_accepte", "_selected_action": ids,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(DossierDemande.objects.filter(statut="accepte").count(), 2)
+        self.assertEqual(SuiviDossier.objects.filter(statut="accepte").count(), 2)
+
+        user = CustomUser.objects.get(email="demandeur2@asdm.test")
+        self.assertEqual(nombre_non_lues(user.pk), 2)
+        self.client.post("/admin/app_principale/notification/", {
+            "action": "marquer_lues", "_selected_action": list(user.notification_set.values_list("id", flat=True)),
+        })
+        self.assertEqual(nombre_non_lues(user.pk), 0)
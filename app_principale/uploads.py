@@ -0,0 +1,164 @@
+"""
+Téléversement par morceaux, reprenable :
+init (taille annoncée) -> PUT des plages (Content-Range) -> finalisation (sha256).
+Chaque partie est lue depuis le flux de la requête dans un fichier à part, hors transaction
+(client lent), puis recopiée à sa position sous verrou court ;
+le fichier terminé est déplacé (os.replace, atomique) dans le stockage puis rattaché au dossier.
+Les téléversements abandonnés sont purgés (commande purger_televersements).
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import PieceJointe, Televersement
+
+BLOC = 64 * 1024
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class ErreurTeleversement(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_content_range(valeur):
+    m = CONTENT_RANGE.match(valeur or "")
+    if not m:
+        raise ErreurTeleversement("En-tête Content-Range attendu : 'bytes debut-fin/total'.")
+    debut, fin, total = (int(g) for g in m.groups())
+    if fin < debut:
+        raise ErreurTeleversement("Plage invalide.")
+    return debut, fin, total
+
+
+def verifier_plage(televersement, debut, fin, total):
+    if total != televersement.taille or fin >= televersement.taille:
+        raise ErreurTeleversement("La plage dépasse la taille annoncée.")
+    if debut != televersement.recu:
+        raise ErreurTeleversement(f"Reprendre à l'octet {televersement.recu}.", status=409)
+
+
+def creer_televersement(dossier, utilisateur, nom, taille):
+    if taille > settings.UPLOAD_MAX_SIZE:
+        raise ErreurTeleversement(f"Fichier trop volumineux (max {settings.UPLOAD_MAX_SIZE} octets).")
+    televersement = Televersement.objects.create(
+        dossier=dossier, utilisateur_id=utilisateur.pk, nom=get_valid_filename(os.path.basename(nom)), taille=taille
+    )
+    os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+    open(televersement.chemin_temporaire, "wb").close()
+    return televersement
+
+
+def ecrire_partie(televersement_id, content_range, flux):
+    """
+    Écrit la plage reçue à sa position. Les plages doivent se suivre : un client
+    interrompu relit `recu` (GET) et reprend à partir de là.
+    """
+    debut, fin, total = parse_content_range(content_range)
+    longueur = fin - debut + 1
+    if longueur > settings.UPLOAD_PART_MAX_SIZE:
+        raise ErreurTeleversement(f"Partie trop grande (max {settings.UPLOAD_PART_MAX_SIZE} octets).", status=413)
+
+    # contrôle sans verrou avant de lire le corps, revérifié sous verrou ensuite
+    verifier_plage(Televersement.objects.get(pk=televersement_id), debut, fin, total)
+
+    os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=settings.UPLOAD_TMP_DIR, suffix=".partie") as partie:
+        ecrits = 0
+        while ecrits < longueur:
+            bloc = flux.read(min(BLOC, longueur - ecrits))
+            if not bloc:
+                break
+            partie.write(bloc)
+            ecrits += len(bloc)
+        partie.flush()
+        partie.seek(0)
+
+        with transaction.atomic():
+            televersement = Televersement.objects.select_for_update().get(pk=televersement_id)
+            verifier_plage(televersement, debut, fin, total)
+            with open(televersement.chemin_temporaire, "r+b") as f:
+                f.seek(debut)
+                shutil.copyfileobj(partie, f, BLOC)
+                f.truncate(debut + ecrits)
+            televersement.recu = debut + ecrits
+            televersement.save(update_fields=["recu", "derniere_activite"])
+    return televersement
+
+
+def finaliser(televersement_id, sha256):
+    with transaction.atomic():
+        televersement = Televersement.objects.select_for_update().get(pk=televersement_id)
+        if televersement.recu != televersement.taille:
+            raise ErreurTeleversement(f"Téléversement incomplet ({televersement.recu}/{televersement.taille}).")
+
+        empreinte = hashlib.sha256()
+        with open(televersement.chemin_temporaire, "rb") as f:
+            for bloc in iter(lambda: f.read(BLOC), b""):
+                empreinte.update(bloc)
+        if empreinte.hexdigest() != (sha256 or "").lower():
+            raise ErreurTeleversement("Somme de contrôle sha256 différente.", status=422)
+
+        nom = default_storage.get_available_name(
+            PieceJointe._meta.get_field("fichier").generate_filename(None, televersement.nom)
+        )
+        chemin = default_storage.path(nom)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        os.replace(televersement.chemin_temporaire, chemin)
+        try:
+            piece = PieceJointe.objects.create(
+                dossier_id=televersement.dossier_id, fichier=nom, nom=televersement.nom,
+                taille=televersement.taille, sha256=empreinte.hexdigest(),
+            )
+            televersement.delete()
+        except Exception:
+            os.replace(chemin, televersement.chemin_temporaire)
+            raise
+    return piece
+
+
+def annuler(televersement):
+    try:
+        os.remove(televersement.chemin_temporaire)
+    except FileNotFoundError:
+        pass
+    televersement.delete()
+
+
+def purger_expires(maintenant=None):
+    """
+    Supprime les téléversements sans partie reçue depuis UPLOAD_EXPIRATION_HEURES, puis
+    les fichiers temporaires orphelins aussi anciens (ligne supprimée, partie d'une
+    requête interrompue). Retourne le nombre de téléversements supprimés.
+    """
+    limite = (maintenant or timezone.now()) - timedelta(hours=settings.UPLOAD_EXPIRATION_HEURES)
+    n = 0
+    for televersement in Televersement.objects.filter(derniere_activite__lt=limite).iterator():
+        annuler(televersement)
+        n += 1
+
+    try:
+        fichiers = list(os.scandir(settings.UPLOAD_TMP_DIR))
+    except FileNotFoundError:
+        return n
+    en_cours = {f"{pk}.part" for pk in Televersement.objects.values_list("pk", flat=True)}
+    for fichier in fichiers:
+        if (
+            fichier.is_file() and fichier.name not in en_cours
+            and fichier.stat().st_mtime < limite.timestamp()
+        ):
+            try:
+                os.remove(fichier.path)
+            except FileNotFoundError:
+                pass
+    return n
@@ -1,13 +1,30 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, DossierDemandeViewSet, SuiviDossierViewSet, NotificationViewSet
+from .views import (
+    UserViewSet, DossierDemandeViewSet, SuiviDossierViewSet, NotificationViewSet, TeleversementViewSet,
+    MetaView, CacheMetricsView, MetricsView, ProfilView, StatsView, EvenementsTicketView, evenements,
+)
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='users')
 router.register(r'dossiers', DossierDemandeViewSet, basename='dossiers')
 router.register(r'suivis', SuiviDossierViewSet, basename='suivis')
 router.register(r'notifications', NotificationViewSet, basename='notifications')
+router.register(r'televersements', TeleversementViewSet, basename='televersements')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('meta/', MetaView.as_view(), name='meta'),
+    path('stats/', StatsView.as_view(), name='stats'),
+    path('evenements/', evenements, name='evenements'),
+    path('evenements/ticket/', EvenementsTicketView.as_view(), name='evenements-ticket'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('metrics/cache/', CacheMetricsView.as_view(), name='metrics-cache'),
+    path('metrics/profil/', ProfilView.as_view(), name='metrics-profil'),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import urls_async
+
+    urlpatterns = urls_async(router) + urlpatterns
@@ -1,16 +1,50 @@
+import asyncio
+import json
+import os
+
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, mixins, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.db.models import Prefetch
 
-from .models import CustomUser, DossierDemande, SuiviDossier, Notification
+from .models import (
+    CustomUser, DossierDemande, SuiviDossier, Notification, PieceJointe, Televersement,
+    NotificationHistorique, SuiviDossierHistorique,
+)
 from .serializers import (
     UserCreateSerializer, UserPublicSerializer,
     DossierDemandeSerializer, DossierDemandeUpdateStatutSerializer,
-    SuiviDossierSerializer, NotificationSerializer
+    SuiviDossierSerializer, NotificationSerializer, DossierTimelineSerializer,
+    DossierBulkStatutSerializer, PieceJointeSerializer, TeleversementSerializer,
+    NotificationMarquerLuesSerializer,
+)
+from .permissions import IsOwnerOrReadOnly, IsAdmin, IsAdminOrMetricsClient, IsAgent, RoleScopedQuerysetMixin
+from .search import FullTextSearchFilter, TrigramSearchFilter
+from .services import changer_statut_en_masse, marquer_lues, nombre_non_lues
+from .cache import aget_token_version, get_user_payload, get_meta, get_compteurs
+from .archives import ArchivesMixin
+from .conditional import ConditionalGetMixin
+from .lecture_rapide import ListeRapideMixin
+from .export import COLONNES_DOSSIERS, COLONNES_SUIVIS, acsv_stream, alignes, csv_stream, lignes
+from .filters import DossierDemandeFilter, SuiviDossierFilter, SuiviDossierHistoriqueFilter
+from .stats import statistiques
+from .media import servir_fichier
+from .uploads import ErreurTeleversement, creer_televersement, ecrire_partie, finaliser, annuler
+from .authentication import (
+    TICKET_SSE_DUREE, consommer_ticket_sse, creer_ticket_sse, revoquer_tokens, utilisateur_depuis_requete,
 )
-from .permissions import IsOwnerOrReadOnly, IsAdmin, IsAgent
+from .profilage import resume
+from .push import abonnements, evenement_statut, get_backend, publier
 
 # ---- Utilisateurs ----
 class UserViewSet(mixins.CreateModelMixin,
@@ -18,9 +52,10 @@ class UserViewSet(mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   viewsets.GenericViewSet):
     queryset = CustomUser.objects.all().order_by("-date_joined")
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TrigramSearchFilter]
     search_fields = ["email", "username", "first_name", "last_name", "phone", "role"]
     ordering_fields = ["date_joined", "last_login"]
+    ordering = ["-date_joined"]
 
     def get_permissions(self):
         if self.action in ["create"]:
@@ -36,22 +71,50 @@ class UserViewSet(mixins.CreateModelMixin,
 
     @action(methods=["get"], detail=False, url_path="me")
     def me(self, request):
-        return Response(UserPublicSerializer(request.user).data)
+        return Response(get_user_payload(request.user))
 
 # ---- Dossiers ----
-class DossierDemandeViewSet(viewsets.ModelViewSet):
+class DossierDemandeViewSet(RoleScopedQuerysetMixin, ConditionalGetMixin, ListeRapideMixin, viewsets.ModelViewSet):
     queryset = DossierDemande.objects.select_related("utilisateur").all().order_by("-date_depot")
     serializer_class = DossierDemandeSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ["type_subvention", "statut", "utilisateur"]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
+    filterset_class = DossierDemandeFilter
     search_fields = ["description_projet"]
     ordering_fields = ["date_depot", "montant_demande"]
+    ordering = ["-date_depot"]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "timeline":
+            # historique et notifications en 2 requêtes, quelle que soit leur longueur ;
+            # ?include_archived=true : lignes archivées comprises (vues *_historique)
+            archives = self.request.query_params.get("include_archived", "").lower() in ("1", "true")
+            suivis = SuiviDossierHistorique if archives else SuiviDossier
+            notifications = (NotificationHistorique if archives else Notification).objects.all()
+            if self.request.user.role not in ("agent", "admin"):
+                # le demandeur ne voit que les notifications qui lui sont adressées
+                notifications = notifications.filter(utilisateur_id=self.request.user.pk)
+            qs = qs.prefetch_related(
+                Prefetch(
+                    "suivis_historique" if archives else "suividossier_set",
+                    queryset=suivis.objects.order_by("date_update", "id"),
+                    to_attr="historique",
+                ),
+                Prefetch(
+                    "notifications_historique" if archives else "notifications",
+                    queryset=notifications.select_related("utilisateur").order_by("date_envoi", "id"),
+                    to_attr="notifications_liees",
+                ),
+            )
+        return qs
 
     def perform_create(self, serializer):
         # le demandeur est automatiquement le user courant s'il n'envoie pas utilisateur_id
-        utilisateur = serializer.validated_data.get("utilisateur", self.request.user)
-        serializer.save(utilisateur=utilisateur)
+        if "utilisateur" in serializer.validated_data:
+            serializer.save()
+        else:
+            serializer.save(utilisateur_id=self.request.user.pk)
 
     @action(methods=["patch"], detail=True, url_path="statut")
     def update_statut(self, request, pk=None):
@@ -64,16 +127,140 @@ class DossierDemandeViewSet(viewsets.ModelViewSet):
         s = DossierDemandeUpdateStatutSerializer(dossier, data=request.data, partial=True)
         s.is_valid(raise_exception=True)
         s.save()
+        publier([(dossier.utilisateur_id, evenement_statut(dossier.id, dossier.statut))])
         return Response(DossierDemandeSerializer(dossier).data)
 
+    @action(methods=["post"], detail=False, url_path="bulk-statut")
+    def bulk_statut(self, request):
+        """
+        Changement de statut en masse (agents/admins), par liste d'ids ou par filtre
+        (mêmes paramètres que DossierDemandeFilter, au moins un). Une seule transaction.
+        """
+        if not (request.user.role in ("agent", "admin")):
+            return Response({"detail": "Non autorisé."}, status=403)
+        s = DossierBulkStatutSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        data = s.validated_data
+
+        qs = DossierDemande.objects.all()
+        if "ids" in data:
+            qs = qs.filter(pk__in=data["ids"])
+        else:
+            # filtre déjà validé (clés connues, au moins un critère) par le serializer
+            qs = DossierDemandeFilter(data=data["filtre"], queryset=qs, request=request).qs
+
+        resultats = changer_statut_en_masse(
+            qs, data["statut"], commentaire=data["commentaire"],
+            dry_run=data["dry_run"], batch_size=data["batch_size"],
+        )
+        ids = data.get("ids", resultats.keys())
+        return Response({
+            "statut": data["statut"],
+            "dry_run": data["dry_run"],
+            "modifies": sum(1 for _, r in resultats.values() if r == "modifie"),
+            "resultats": [
+                {"id": i, "ancien_statut": resultats[i][0], "resultat": resultats[i][1]}
+                if i in resultats else {"id": i, "ancien_statut": None, "resultat": "introuvable"}
+                for i in ids
+            ],
+        })
+
+    @action(methods=["get"], detail=False, url_path="export")
+    def export(self, request):
+        """
+        Export CSV en flux (agents/admins), mêmes filtres que la liste
+        (+ date_depot_after / date_depot_before).
+        """
+        if not (request.user.role in ("agent", "admin")):
+            return Response({"detail": "Non autorisé."}, status=403)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_csv_response(request, queryset, COLONNES_DOSSIERS, "dossiers")
+
+    @action(methods=["get"], detail=True, url_path="pieces-jointes")
+    def pieces_jointes(self, request, pk=None):
+        dossier = self.get_object()
+        pieces = dossier.pieces_jointes.order_by("date_ajout", "id")
+        return Response(PieceJointeSerializer(pieces, many=True, context={"request": request}).data)
+
+    @action(methods=["get"], detail=True, url_path="fichier")
+    def fichier(self, request, pk=None):
+        """Téléchargement du fichier du dossier (mêmes droits que le dossier)."""
+        dossier = self.get_object()
+        if not dossier.fichiers:
+            raise Http404
+        return servir_fichier(request, dossier.fichiers, os.path.basename(dossier.fichiers.name))
+
+    @action(methods=["get"], detail=True, url_path=r"pieces-jointes/(?P<piece_id>\d+)", url_name="piece-jointe")
+    def piece_jointe(self, request, pk=None, piece_id=None):
+        dossier = self.get_object()
+        piece = get_object_or_404(dossier.pieces_jointes, pk=piece_id)
+        return servir_fichier(request, piece.fichier, piece.nom)
+
+    @action(
+        methods=["get"], detail=True,
+        url_path=r"pieces-jointes/(?P<piece_id>\d+)/apercus/(?P<taille>\d+)", url_name="piece-jointe-apercu",
+    )
+    def piece_jointe_apercu(self, request, pk=None, piece_id=None, taille=None):
+        dossier = self.get_object()
+        piece = get_object_or_404(dossier.pieces_jointes, pk=piece_id)
+        nom = piece.apercus.get(taille)
+        if nom is None:
+            raise Http404
+        fichier = FieldFile(piece, PieceJointe._meta.get_field("fichier"), nom)
+        return servir_fichier(request, fichier, f"apercu_{taille}_{os.path.splitext(piece.nom)[0]}.jpg")
+
+    @action(methods=["post"], detail=True, url_path="televersements")
+    def televersements(self, request, pk=None):
+        """
+        Démarre un téléversement par morceaux : {"nom": ..., "taille": ...}.
+        Suite : PUT /api/televersements/{id}/ puis POST .../finaliser/.
+        """
+        dossier = self.get_object()
+        s = TeleversementSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        try:
+            televersement = creer_televersement(
+                dossier, request.user, s.validated_data["nom"], s.validated_data["taille"]
+            )
+        except ErreurTeleversement as e:
+            return Response({"detail": str(e)}, status=e.status)
+        return Response(TeleversementSerializer(televersement).data, status=201)
+
+    @action(methods=["get"], detail=True, url_path="timeline")
+    def timeline(self, request, pk=None):
+        """
+        Dossier + historique des suivis + notifications liées, en une seule réponse.
+        """
+        dossier = self.get_object()
+        return Response(DossierTimelineSerializer(dossier, context=self.get_serializer_context()).data)
+
+def export_csv_response(request, queryset, colonnes, nom):
+    if isinstance(request._request, ASGIRequest):
+        # flux async : sinon Django lit tout l'export en mémoire avant d'envoyer
+        contenu = acsv_stream(alignes(queryset, colonnes))
+    else:
+        contenu = csv_stream(lignes(queryset, colonnes))
+    response = StreamingHttpResponse(contenu, content_type="text/csv")
+    fichier = f"{nom}_{timezone.now():%Y%m%d_%H%M%S}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{fichier}"'
+    return response
+
 # ---- Suivi ----
-class SuiviDossierViewSet(viewsets.ModelViewSet):
+class SuiviDossierViewSet(RoleScopedQuerysetMixin, ArchivesMixin, ListeRapideMixin, viewsets.ModelViewSet):
     queryset = SuiviDossier.objects.select_related("dossier").all().order_by("-date_update")
+    archive_queryset = SuiviDossierHistorique.objects.select_related("dossier").order_by("-date_update")
     serializer_class = SuiviDossierSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ["dossier", "statut"]
+    owner_field = "dossier__utilisateur"
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
+    search_fields = ["commentaire"]
     ordering_fields = ["date_update"]
+    ordering = ["-date_update"]
+
+    @property
+    def filterset_class(self):
+        # le FilterSet doit porter sur le modèle du queryset (table ou vue historique)
+        return SuiviDossierHistoriqueFilter if self.inclure_archives() else SuiviDossierFilter
 
     def create(self, request, *args, **kwargs):
         # Seulement agent/admin
@@ -81,25 +268,263 @@ class SuiviDossierViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Non autorisé."}, status=403)
         return super().create(request, *args, **kwargs)
 
+    @action(methods=["get"], detail=False, url_path="export")
+    def export(self, request):
+        """Export CSV en flux de l'historique des suivis (agents/admins)."""
+        if not (request.user.role in ("agent", "admin")):
+            return Response({"detail": "Non autorisé."}, status=403)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_csv_response(request, queryset, COLONNES_SUIVIS, "suivis")
+
 # ---- Notifications ----
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(RoleScopedQuerysetMixin, ArchivesMixin, ConditionalGetMixin, ListeRapideMixin,
+                          viewsets.ModelViewSet):
     queryset = Notification.objects.select_related("utilisateur").all().order_by("-date_envoi")
+    archive_queryset = NotificationHistorique.objects.select_related("utilisateur").order_by("-date_envoi")
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ["utilisateur", "type", "statut"]
     ordering_fields = ["date_envoi"]
+    ordering = ["-date_envoi"]
     search_fields = ["message"]
 
-    def get_queryset(self):
-        # un demandeur ne voit que ses notifications
-        qs = super().get_queryset()
-        if self.request.user.role == "demandeur":
-            return qs.filter(utilisateur=self.request.user)
-        return qs
-
     def perform_create(self, serializer):
         # Par défaut, l'émetteur est un agent/admin qui choisit le destinataire via utilisateur_id
         if not (self.request.user.role in ("agent", "admin")):
             raise PermissionError("Non autorisé.")
         serializer.save()
+
+    @action(methods=["get"], detail=False, url_path="unread-count")
+    def unread_count(self, request):
+        """Nombre de notifications non lues de l'utilisateur connecté (badge)."""
+        return Response({"non_lues": nombre_non_lues(request.user.pk)})
+
+    @action(methods=["post"], detail=False, url_path="mark-read")
+    def mark_read(self, request):
+        """
+        Marque comme lues les notifications de l'utilisateur connecté :
+        {"ids": [...]} ou {"avant": "2025-01-31T00:00:00Z"} (toutes celles envoyées jusque-là).
+        """
+        s = NotificationMarquerLuesSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        modifiees = marquer_lues(request.user.pk, ids=s.validated_data.get("ids"), avant=s.validated_data.get("avant"))
+        return Response({"modifiees": modifiees, "non_lues": nombre_non_lues(request.user.pk)})
+
+# ---- Téléversements par morceaux ----
+class TeleversementViewSet(mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    GET : état (octets reçus, pour reprendre) ; PUT : une plage (Content-Range,
+    corps brut) ; POST finaliser/ : {"sha256": ...} ; DELETE : abandon.
+    """
+    serializer_class = TeleversementSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return Televersement.objects.filter(utilisateur_id=self.request.user.pk)
+
+    def update(self, request, pk=None):
+        # corps lu en flux depuis la requête (pas de request.data) : rien n'est gardé en mémoire
+        televersement = self.get_object()
+        if request.stream is None:
+            return Response({"detail": "Corps de requête vide.", "recu": televersement.recu}, status=400)
+        try:
+            televersement = ecrire_partie(televersement.pk, request.headers.get("Content-Range"), request.stream)
+        except ErreurTeleversement as e:
+            televersement.refresh_from_db()
+            return Response({"detail": str(e), "recu": televersement.recu}, status=e.status)
+        return Response(TeleversementSerializer(televersement).data)
+
+    def destroy(self, request, pk=None):
+        annuler(self.get_object())
+        return Response(status=204)
+
+    @action(methods=["post"], detail=True, url_path="finaliser")
+    def finaliser_televersement(self, request, pk=None):
+        televersement = self.get_object()
+        try:
+            piece = finaliser(televersement.pk, request.data.get("sha256"))
+        except ErreurTeleversement as e:
+            return Response({"detail": str(e)}, status=e.status)
+        return Response(PieceJointeSerializer(piece, context={"request": request}).data, status=201)
+
+# ---- Authentification ----
+class RevoquerTokensView(APIView):
+    """Déconnexion de tous les appareils : révoque tous les jetons JWT de l'utilisateur."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revoquer_tokens(request.user.pk)
+        return Response(status=204)
+
+# ---- Temps réel ----
+# intervalle des commentaires de maintien de connexion (proxies, load balancers),
+# et de la vérification de la version de jeton de l'utilisateur du flux
+SSE_HEARTBEAT = 25
+
+
+async def flux_sse(user_id, version):
+    """
+    Événements de l'utilisateur jusqu'à la déconnexion du client, ou jusqu'à ce que sa
+    version de jeton change (jetons révoqués, mot de passe, rôle, email) ou que son compte
+    soit désactivé : vérifié au plus tard toutes les SSE_HEARTBEAT secondes (cache).
+    """
+    file = abonnements.abonner(user_id)
+    loop = asyncio.get_running_loop()
+    try:
+        await sync_to_async(get_backend().demarrer)()
+        yield "retry: 5000\n\n"
+        verification = loop.time()
+        while True:
+            try:
+                evenement = await asyncio.wait_for(file.get(), timeout=SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                evenement = None
+            if loop.time() - verification >= SSE_HEARTBEAT:
+                # None : compte désactivé
+                if await aget_token_version(user_id) != version:
+                    return
+                verification = loop.time()
+            if evenement is None:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {evenement['type']}\ndata: {json.dumps(evenement, ensure_ascii=False)}\n\n"
+    finally:
+        abonnements.desabonner(user_id, file)
+
+
+async def evenements(request):
+    """
+    Flux Server-Sent Events des notifications in-app et changements de statut de
+    l'utilisateur (remplace le polling des notifications). Jeton JWT dans l'en-tête
+    Authorization ou ticket à usage unique (?ticket=, voir EvenementsTicketView).
+
+    Nécessite l'application ASGI (voir asdmbackend/asgi.py) : sous WSGI, un flux ouvert
+    bloquerait un thread du worker pour toute sa durée, d'où une 501.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Flux disponible uniquement sous ASGI."}, status=501)
+    user = await sync_to_async(utilisateur_depuis_requete)(request)
+    if user is not None:
+        identite = (user.pk, user.token.get("ver"))
+    else:
+        identite = await sync_to_async(consommer_ticket_sse)(request.GET.get("ticket", ""))
+    if identite is None:
+        return JsonResponse({"detail": "Authentification requise."}, status=401)
+    response = StreamingHttpResponse(flux_sse(*identite), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # pas de mise en tampon par nginx
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class EvenementsTicketView(APIView):
+    """Ticket d'ouverture du flux SSE (EventSource : pas d'en-tête Authorization), valable une fois."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({"ticket": creer_ticket_sse(request.user), "expire_dans": TICKET_SSE_DUREE}, status=201)
+
+# ---- Statistiques ----
+class StatsView(APIView):
+    """
+    Tableau de bord : nombre et montant par mois x type x statut, délai moyen
+    jusqu'à la 1re décision. ?depuis=AAAA-MM-JJ pour limiter la période.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not (request.user.role in ("agent", "admin")):
+            return Response({"detail": "Non autorisé."}, status=403)
+        depuis = request.query_params.get("depuis")
+        if depuis is not None:
+            depuis = parse_date(depuis)
+            if depuis is None:
+                return Response({"depuis": "Date invalide (AAAA-MM-JJ)."}, status=400)
+        return Response(statistiques(depuis))
+
+# ---- Métadonnées ----
+def etag_correspond(request, etag):
+    if_none_match = request.headers.get("If-None-Match", "")
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(",") if tag.strip())
+
+
+class MetaView(APIView):
+    """
+    Listes de choix (types de subvention, statuts, types de notification, rôles).
+    Servies depuis le cache, avec ETag / 304.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        meta = get_meta()
+        if etag_correspond(request, meta["etag"]):
+            response = Response(status=304)
+        else:
+            response = Response(meta["payload"])
+        response["ETag"] = meta["etag"]
+        return response
+
+
+def lignes_cache():
+    return [
+        "# TYPE asdm_cache_requests_total counter",
+    ] + [
+        f'asdm_cache_requests_total{{cache="{nom}",resultat="{resultat}"}} {valeur}'
+        for (nom, resultat), valeur in sorted(get_compteurs().items())
+    ]
+
+
+def reponse_prometheus(lignes):
+    return HttpResponse("\n".join(lignes) + "\n", content_type="text/plain; version=0.0.4")
+
+
+class CacheMetricsView(APIView):
+    """Compteurs hit/miss du cache, au format texte Prometheus."""
+    permission_classes = [IsAdminOrMetricsClient]
+
+    def get(self, request):
+        return reponse_prometheus(lignes_cache())
+
+
+class MetricsView(APIView):
+    """
+    Métriques au format texte Prometheus : par vue (si PROFILAGE_API), requêtes,
+    durées totales, SQL et sérialisation cumulées, p95 récent ; plus les compteurs du cache.
+    Le registre et les compteurs sont ceux du processus qui répond : avec plusieurs
+    workers, chaque collecte n'en voit qu'un (à collecter par worker, ou un seul worker).
+    """
+    permission_classes = [IsAdminOrMetricsClient]
+
+    def get(self, request):
+        profil = resume()
+        lignes = []
+        metriques = [
+            ("asdm_http_requests_total", "requetes_http"),
+            ("asdm_http_duration_seconds_total", "duree"),
+            ("asdm_sql_queries_total", "requetes_sql"),
+            ("asdm_sql_duration_seconds_total", "duree_sql"),
+            ("asdm_serialization_duration_seconds_total", "duree_serialisation"),
+        ]
+        for nom, cle in metriques:
+            lignes.append(f"# TYPE {nom} counter")
+            lignes += [
+                f'{nom}{{vue="{c["vue"]}",methode="{c["methode"]}"}} {c[cle]}'
+                for c in profil["cumuls"]
+            ]
+        lignes.append("# TYPE asdm_http_duration_p95_seconds gauge")
+        lignes += [
+            f'asdm_http_duration_p95_seconds{{vue="{v["vue"]}",methode="{v["methode"]}"}} {v["p95_ms"] / 1000}'
+            for v in profil["vues"]
+        ]
+        return reponse_prometheus(lignes + lignes_cache())
+
+
+class ProfilView(APIView):
+    """Résumé du profilage par vue (latences, SQL, SQL dupliqué), pour la commande profil_api."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(resume())
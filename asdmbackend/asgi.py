@@ -3,6 +3,11 @@ ASGI config for asdmbackend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requise par le flux SSE (/api/evenements/) et les vues async (ASYNC_READ_VIEWS) ;
+en production, derrière le même nginx que l'application WSGI :
+
+    gunicorn asdmbackend.asgi:application -k uvicorn_worker.UvicornWorker -w 4 -b 127.0.0.1:8002
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +17,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "asdmbackend.settings")
+# lu par les réglages (DB_CONN_MAX_AGE : pas de connexions persistantes sous ASGI)
+os.environ.setdefault("SERVEUR_ASGI", "1")
 
 application = get_asgi_application()